@@ -1,6 +1,6 @@
 #wispro_adapter.py
 from copy import deepcopy
-from datetime import datetime
+from procesadores.reloj import ahora
 
 
 class WisproAdapter:
@@ -40,7 +40,7 @@ class WisproAdapter:
     # PERIODO
     # --------------------------------------------------
     def _mapear_periodo(self):
-        hoy = datetime.now()
+        hoy = ahora()
         self.modelo["periodo"]["anio"] = hoy.year
         self.modelo["periodo"]["mes"] = hoy.month
         # Validación mínima inmediata
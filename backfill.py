@@ -0,0 +1,215 @@
+# backfill.py
+"""
+Regeneración histórica (backfill) del pipeline semanal.
+
+Reprocesa cada fecha de corte de un rango como si el pipeline hubiera
+corrido ese día:
+
+  - fechas de corte : las fechas de los exports orders_YYYYMMDD.csv
+                      (fuente de verdad de las instalaciones) en el rango
+  - entradas        : el export más reciente de cada tipo a esa fecha
+                      (procesadores/catalogo_entradas.py)
+  - reloj           : datetime.now()/today() se reemplazan por la fecha
+                      de corte (procesadores/reloj.py)
+  - salidas         : salidas/backfill/YYYY-MM-DD/...
+
+Los pasos que dependen del registro (CsvMerger → cédulas procesadas,
+informe semanal → secuencia de ID CUENTA e índices) corren EN ORDEN
+sobre un registro propio del backfill, reconstruido desde el primer
+export (no toca datos/procesados/modelo_contrato). Al cerrar cada fecha
+se guarda una copia del registro en su carpeta.
+
+PQRS y facturación solo LEEN ese registro: corren en un pool de procesos,
+una fecha por proceso.
+
+Uso:
+    python backfill.py 2026-03-01 2026-04-30 [--procesos 4]
+"""
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: IMPORTS Y CONFIGURACIÓN
+# ------------------------------------------------------------------
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from generadores.informe_semanal             import generar_informe_semanal
+from generadores.reporte_facturacion_clientes import generar_reporte_facturacion
+from procesadores.catalogo_entradas          import obtener_catalogo
+from procesadores.csv_merger                 import CsvMerger
+from procesadores.reloj                      import corte_en
+from procesadores.resolvedor_cuentas         import ResolvedorCuentas
+from procesadores.tickets_merger             import TicketsMerger
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RUTA_BACKFILL = Path("salidas/backfill")
+RUTA_REGISTRO = Path("datos/procesados/modelo_contrato/registro_procesados.json")
+MAX_PROCESOS  = max(1, min(4, os.cpu_count() or 1))
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: FECHAS Y CARPETAS
+# ------------------------------------------------------------------
+def fechas_de_corte(desde=None, hasta=None) -> list:
+    """Fechas (date) de los exports de orders dentro del rango, en orden."""
+    desde = pd.Timestamp(desde).date() if desde else None
+    hasta = pd.Timestamp(hasta).date() if hasta else None
+
+    fechas = []
+    for entrada in obtener_catalogo().archivos("orders", al=hasta):
+        if entrada["fecha"] is None:
+            continue
+        fecha = pd.Timestamp(entrada["fecha"]).date()
+        if desde is None or fecha >= desde:
+            fechas.append(fecha)
+    return sorted(set(fechas))
+
+
+def carpeta_de(fecha, raiz: Path = RUTA_BACKFILL) -> Path:
+    return Path(raiz) / fecha.isoformat()
+
+
+def _registro_inicial(ruta_trabajo: Path):
+    """
+    Registro vacío del backfill: solo conserva los seriales CPE del
+    registro real (no dependen de la fecha de corte).
+    """
+    data = {}
+    if RUTA_REGISTRO.exists():
+        with open(RUTA_REGISTRO, "r", encoding="utf-8") as f:
+            seriales = json.load(f).get("seriales_cpe", {})
+        data["seriales_cpe"] = seriales
+
+    ruta_trabajo.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta_trabajo, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: PASOS EN ORDEN (DEPENDEN DEL REGISTRO)
+# ------------------------------------------------------------------
+def _reproducir_registro(fechas: list, desde, raiz: Path) -> dict:
+    """
+    Pasos 2 y 3 fecha por fecha, desde el primer export de orders hasta
+    la última fecha pedida. Las fechas anteriores a `desde` solo
+    alimentan el registro: su informe semanal se descarta.
+    Retorna {fecha: ruta_registro_de_esa_fecha} para las fechas pedidas.
+    """
+    ruta_trabajo = Path(raiz) / "registro_procesados.json"
+    _registro_inicial(ruta_trabajo)
+
+    registros_por_fecha = {}
+    with tempfile.TemporaryDirectory(prefix="backfill_") as descartes:
+        for fecha in fechas:
+            pedida  = desde is None or fecha >= desde
+            carpeta = carpeta_de(fecha, raiz) if pedida else Path(descartes) / fecha.isoformat()
+
+            with corte_en(fecha):
+                logger.info(f"BACKFILL {fecha} — registro (pasos 2 y 3)")
+                registros = CsvMerger(ruta_registro=ruta_trabajo).procesar()
+                generar_informe_semanal(
+                    registros,
+                    ruta_salida=carpeta / "informes_semanales",
+                    ruta_registro=ruta_trabajo,
+                )
+
+            if pedida:
+                copia = carpeta / "registro_procesados.json"
+                shutil.copyfile(ruta_trabajo, copia)
+                registros_por_fecha[fecha] = copia
+
+    return registros_por_fecha
+
+
+# ------------------------------------------------------------------
+# BLOQUE 4: PASOS INDEPENDIENTES (UN PROCESO POR FECHA)
+# ------------------------------------------------------------------
+def _generar_fecha(fecha, ruta_registro: Path, carpeta: Path) -> dict:
+    """PQRS y facturación de una fecha de corte. Corre en un proceso aparte."""
+    resultado  = {"fecha": fecha, "pqrs": None, "facturacion": None}
+    resolvedor = ResolvedorCuentas.desde_registro(ruta_registro)
+
+    # Almacén de tickets y libro de facturas propios de la fecha: solo
+    # exports hasta el corte
+    with corte_en(fecha), tempfile.TemporaryDirectory(prefix="almacenes_") as almacenes:
+        resultado["pqrs"] = TicketsMerger(
+            ruta_registro=ruta_registro,
+            ruta_salida=carpeta / "pqrs",
+            ruta_almacen=Path(almacenes) / "tickets",
+            resolvedor=resolvedor,
+        ).generar()
+
+        try:
+            resultado["facturacion"] = generar_reporte_facturacion(
+                ruta_registro=ruta_registro,
+                carpeta_salida=carpeta / "informes_facturacion",
+                resolvedor=resolvedor,
+                ruta_libro=Path(almacenes) / "facturacion",
+            )
+        except FileNotFoundError as e:
+            logger.warning(f"BACKFILL {fecha} — facturación no generada: {e}")
+
+    return resultado
+
+
+# ------------------------------------------------------------------
+# BLOQUE 5: ORQUESTADOR
+# ------------------------------------------------------------------
+def ejecutar_backfill(desde=None, hasta=None, procesos: int = MAX_PROCESOS, raiz: Path = RUTA_BACKFILL) -> list:
+    """
+    Regenera las salidas de todas las fechas de corte en [desde, hasta].
+    Retorna una lista de dicts {fecha, pqrs, facturacion} en orden.
+    """
+    desde = pd.Timestamp(desde).date() if desde else None
+    todas = fechas_de_corte(None, hasta)
+    if not todas or (desde and todas[-1] < desde):
+        raise FileNotFoundError(f"No hay exports de orders entre {desde} y {hasta}")
+
+    registros = _reproducir_registro(todas, desde, raiz)
+    fechas = list(registros)
+    logger.info(f"BACKFILL — {len(fechas)} fechas de corte: {fechas[0]} → {fechas[-1]}")
+
+    with ProcessPoolExecutor(max_workers=max(1, min(procesos, len(fechas)))) as pool:
+        futuros = [
+            pool.submit(_generar_fecha, fecha, registros[fecha], carpeta_de(fecha, raiz))
+            for fecha in fechas
+        ]
+        resultados = [futuro.result() for futuro in futuros]
+
+    logger.info(f"BACKFILL completado — salidas en {Path(raiz).resolve()}")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill del pipeline semanal por fechas de corte")
+    parser.add_argument("desde", help="Primera fecha de corte (YYYY-MM-DD)")
+    parser.add_argument("hasta", help="Última fecha de corte (YYYY-MM-DD)")
+    parser.add_argument("--procesos", type=int, default=MAX_PROCESOS)
+    args = parser.parse_args()
+
+    try:
+        resultados = ejecutar_backfill(args.desde, args.hasta, args.procesos)
+    except Exception as e:
+        logger.error(f"BACKFILL FALLIDO: {e}")
+        sys.exit(1)
+
+    print("=" * 50)
+    print("  BACKFILL — COMPLETADO")
+    for r in resultados:
+        print(f"  {r['fecha']}  PQRS: {r['pqrs'] or '-'}  Facturación: {r['facturacion'] or '-'}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
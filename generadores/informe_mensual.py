@@ -1,6 +1,9 @@
 #informe_mensual.py
 from pathlib import Path
 
+from procesadores.reloj import hoy
+from procesadores.tickets_merger import CONTRATO_INICIO, SUBCOLS_LABELS
+
 
 class GeneradorInformeMensual:
     """
@@ -10,15 +13,18 @@ class GeneradorInformeMensual:
     - Recibe una plantilla markdown base.
     - Reemplaza placeholders sección por sección.
     - No realiza validaciones contractuales.
+    - Las secciones 8 y 9 (calidad y PQRS) leen el cubo PQRS
+      (procesadores/cubo_pqrs.py) si se entrega uno.
     """
 
     # ==================================================
     # BLOQUE 1 - INICIALIZACIÓN
     # ==================================================
 
-    def __init__(self, modelo_contrato, plantilla_path):
+    def __init__(self, modelo_contrato, plantilla_path, cubo_pqrs=None):
         self.modelo = modelo_contrato
         self.plantilla_path = Path(plantilla_path)
+        self.cubo_pqrs = cubo_pqrs
 
         if not self.plantilla_path.exists():
             raise FileNotFoundError(
@@ -46,6 +52,11 @@ class GeneradorInformeMensual:
         # ---- Sección 2.1 ----
         contenido = self._generar_tabla_instalaciones(contenido)
 
+        # ---- Secciones 8 y 9 (cubo PQRS) ----
+        if self.cubo_pqrs is not None:
+            contenido = self._generar_indicadores_calidad(contenido)
+            contenido = self._generar_tabla_pqrs(contenido)
+
         # ---- Limpieza final de placeholders no procesados ----
         contenido = self._limpiar_placeholders_restantes(contenido)
 
@@ -70,7 +81,7 @@ class GeneradorInformeMensual:
             "{{departamento}}": proyecto["departamento"],
             "{{numero_informe}}": "1",
             "{{version}}": "1.0",
-            "{{fecha_emision}}": date.today().strftime("%d/%m/%Y")
+            "{{fecha_emision}}": hoy().strftime("%d/%m/%Y")
         }
 
         for clave, valor in reemplazos.items():
@@ -146,7 +157,73 @@ class GeneradorInformeMensual:
         return texto.replace("{{tabla_instalaciones}}", tabla)
 
     # ==================================================
-    # BLOQUE 6 - CONTROL DE PLACEHOLDERS NO PROCESADOS
+    # BLOQUE 6 - SECCIONES 8 Y 9: CALIDAD Y PQRS
+    # ==================================================
+
+    def _mes_contractual(self):
+        """
+        Mes del contrato (1..N) del periodo del informe, o None si el
+        periodo cae fuera del contrato.
+        """
+
+        periodo = self.modelo["periodo"]
+        mes = (
+            (int(periodo["anio"]) - CONTRATO_INICIO.year) * 12
+            + int(periodo["mes"]) - CONTRATO_INICIO.month + 1
+        )
+        return mes if 1 <= mes <= self.cubo_pqrs.meses else None
+
+    def _etiqueta(self, categoria):
+        return " ".join(SUBCOLS_LABELS.get(categoria, categoria).split())
+
+    def _generar_indicadores_calidad(self, texto):
+        """
+        PQRS por cada 1.000 usuarios activos en el mes, por categoría.
+        """
+
+        mes = self._mes_contractual()
+        activos = self.modelo["usuarios"]["activos"]
+
+        if mes is None or not activos:
+            return texto
+
+        tasas = self.cubo_pqrs.tasas_por_mil(activos, mes=mes)
+        filas = [
+            f"- {self._etiqueta(categoria)}: {tasa} por cada 1.000 usuarios activos"
+            for categoria, tasa in tasas.items()
+        ]
+
+        return texto.replace("{{indicadores_calidad}}", "\n".join(filas))
+
+    def _generar_tabla_pqrs(self, texto):
+        """
+        Totales del mes por categoría y cuentas con PQRS en el mes.
+        """
+
+        mes = self._mes_contractual()
+        if mes is None:
+            return texto
+
+        totales = self.cubo_pqrs.por_mes().loc[mes]
+        if not totales.iloc[0]:
+            tabla = "No se registraron PQRS en el periodo reportado."
+        else:
+            filas = [
+                f"- {self._etiqueta(categoria)}: {int(total)}"
+                for categoria, total in totales.items()
+            ]
+
+            cuentas = self.cubo_pqrs.cuentas_sobre_umbral(1, mes=mes)
+            for cuenta, total in cuentas.items():
+                tickets = ", ".join(self.cubo_pqrs.tickets_de(cuenta, mes=mes))
+                filas.append(f"- Usuario: {cuenta} | PQRS: {total} | Tickets: {tickets}")
+
+            tabla = "\n".join(filas)
+
+        return texto.replace("{{tabla_pqrs}}", tabla)
+
+    # ==================================================
+    # BLOQUE 7 - CONTROL DE PLACEHOLDERS NO PROCESADOS
     # ==================================================
 
     def _limpiar_placeholders_restantes(self, texto):
@@ -6,15 +6,23 @@ Genera SOLO los registros nuevos de la semana actual.
 El usuario copia y pega en el repositorio compartido.
 """
 
-import re
 import json
 import logging
-from datetime import datetime
 from pathlib import Path
 
 import openpyxl
 import pandas as pd
 
+from procesadores.normalizacion import (
+    normalizar_cedulas,
+    normalizar_contratos,
+    normalizar_emails,
+    normalizar_telefonos,
+    separar_nombres,
+    texto_valido,
+)
+from procesadores.reloj import ahora
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -78,51 +86,31 @@ class GeneradorInformeSemanal:
     El ID CUENTA es secuencial y continúa desde el último registrado.
     """
 
-    def __init__(self, config_path="config/entorno.yaml"):
+    def __init__(self, config_path="config/entorno.yaml", ruta_salida=None, ruta_registro=None):
         import yaml
         with open(config_path, "r", encoding="utf-8") as f:
             config = yaml.safe_load(f)
 
-        self.ruta_salida = Path("salidas/informes_semanales")
+        self.ruta_salida = Path(ruta_salida or "salidas/informes_semanales")
         self.ruta_salida.mkdir(parents=True, exist_ok=True)
 
         self.ruta_registro = Path(
-            "datos/procesados/modelo_contrato/registro_procesados.json"
+            ruta_registro or "datos/procesados/modelo_contrato/registro_procesados.json"
         )
 
     # ------------------------------------------------------------------
     # BLOQUE 1: SEPARAR NOMBRE Y APELLIDO
-    # Limpia prefijos M-XXXX, luego:
-    # 1 palabra  → Nombre = palabra,  Apellido = ""
-    # 2 palabras → Nombre = [0],      Apellido = [1]
-    # 3 palabras → Nombre = [0][1],   Apellido = [2]
-    # 4+ palabras→ Nombre = [0][1],   Apellido = resto
+    # Vectorizado en procesadores/normalizacion.py (separar_nombres):
+    # limpia prefijos M-XXXX y reparte las palabras en Nombre / Apellido.
     # ------------------------------------------------------------------
-    def _separar_nombre_apellido(self, nombre_completo: str):
-        if not nombre_completo:
-            return "", ""
-
-        limpio = re.sub(r"^M-\d+\s*", "", nombre_completo.strip()).strip()
-        palabras = limpio.split()
-
-        if len(palabras) == 0:
-            return "", ""
-        elif len(palabras) == 1:
-            return palabras[0], ""
-        elif len(palabras) == 2:
-            return palabras[0], palabras[1]
-        elif len(palabras) == 3:
-            return f"{palabras[0]} {palabras[1]}", palabras[2]
-        else:
-            return f"{palabras[0]} {palabras[1]}", " ".join(palabras[2:])
 
     # ------------------------------------------------------------------
     # BLOQUE 2: TRADUCIR ESTADO WISPRO → MINISTERIO
     # ------------------------------------------------------------------
-    def _traducir_estado(self, estado: str) -> str:
-        if not estado:
-            return "OPERATIVO"
-        return ESTADO_TRADUCCION.get(estado.lower().strip(), "OPERATIVO")
+    def _traducir_estados(self, estados: pd.Series) -> pd.Series:
+        """Vacíos y estados desconocidos → OPERATIVO."""
+        clave = estados.astype(str).str.lower().str.strip()
+        return clave.map(ESTADO_TRADUCCION).fillna("OPERATIVO").astype(object)
 
     # ------------------------------------------------------------------
     # BLOQUE 3: CRUCE SERIAL CPE ↔ ID CONTRATO
@@ -169,12 +157,15 @@ class GeneradorInformeSemanal:
     # ------------------------------------------------------------------
     # BLOQUE 5: GUARDAR ÚLTIMO ID EN REGISTRO
     # ------------------------------------------------------------------
-    def _guardar_ultimo_id(self, ultimo: int, df_nuevos: pd.DataFrame):
+    def _guardar_ultimo_id(self, ultimo: int, df_nuevos: pd.DataFrame, id_contratos: pd.Series):
         """
         Persiste en registro_procesados.json:
         - ultimo_id_cuenta  → para continuar secuencia la semana siguiente
         - indice_email      → dict {email: id_cuenta} para cruzar en facturación y tickets
         - indice_cedula     → dict {cedula: id_cuenta} fallback cuando el email no coincide
+        - indice_contrato   → dict {id_contrato: id_cuenta}
+        - indice_telefono   → dict {telefono: id_cuenta} (tickets sin email)
+        Los cuatro índices los consume procesadores/resolvedor_cuentas.py.
         Preserva todas las claves existentes del JSON (ej: seriales_cpe).
         """
         if not self.ruta_registro.exists():
@@ -185,7 +176,7 @@ class GeneradorInformeSemanal:
 
         # Persistir último número secuencial
         data["ultimo_id_cuenta"] = ultimo
-        data["ultima_actualizacion"] = datetime.now().isoformat()
+        data["ultima_actualizacion"] = ahora().isoformat()
 
         # --------------------------------------------------
         # CONSTRUIR Y ACUMULAR ÍNDICE EMAIL → ID CUENTA
@@ -198,24 +189,33 @@ class GeneradorInformeSemanal:
         # email del CSV de facturas no coincida exactamente.
         indice_cedula_actual = data.get("indice_cedula", {})
 
-        for fila in df_nuevos.to_dict(orient="records"):
-            email = str(fila.get("E mail", "")).strip().lower()
-            id_cuenta = str(fila.get("ID CUENTA", "")).strip()
-            cedula = str(fila.get("Número documento de identidad", "")).strip()
+        # Llaves con los mismos kernels que usan facturación y tickets
+        emails    = normalizar_emails(df_nuevos["E mail"])
+        cedulas   = normalizar_cedulas(df_nuevos["Número documento de identidad"])
+        ids       = texto_valido(df_nuevos["ID CUENTA"])
+        con_email = (emails != "") & (ids != "")
+        con_cedula = (cedulas != "") & (ids != "")
+
+        indice_email_actual.update(zip(emails[con_email], ids[con_email]))
 
-            # Limpiar sufijo .0 de la cédula por si pandas la convirtió a float
-            if cedula.endswith(".0"):
-                cedula = cedula[:-2]
+        # ✅ CORRECCIÓN BUG #2 — guardar también por cédula
+        indice_cedula_actual.update(zip(cedulas[con_cedula], ids[con_cedula]))
 
-            if email and email not in ("", "nan", "none") and id_cuenta:
-                indice_email_actual[email] = id_cuenta
+        # Índices por ID CONTRATO y teléfono (mismo orden que df_nuevos)
+        contratos    = normalizar_contratos(pd.Series(id_contratos.to_numpy(), index=df_nuevos.index, dtype=object))
+        telefonos    = normalizar_telefonos(df_nuevos["Teléfono"])
+        con_contrato = (contratos != "") & (ids != "")
+        con_telefono = (telefonos != "") & (ids != "")
 
-            # ✅ CORRECCIÓN BUG #2 — guardar también por cédula
-            if cedula and cedula not in ("", "nan", "none") and id_cuenta:
-                indice_cedula_actual[cedula] = id_cuenta
+        indice_contrato_actual = data.get("indice_contrato", {})
+        indice_telefono_actual = data.get("indice_telefono", {})
+        indice_contrato_actual.update(zip(contratos[con_contrato], ids[con_contrato]))
+        indice_telefono_actual.update(zip(telefonos[con_telefono], ids[con_telefono]))
 
         data["indice_email"] = indice_email_actual
         data["indice_cedula"] = indice_cedula_actual  # ✅ nueva clave en el JSON
+        data["indice_contrato"] = indice_contrato_actual
+        data["indice_telefono"] = indice_telefono_actual
 
         with open(self.ruta_registro, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
@@ -223,6 +223,10 @@ class GeneradorInformeSemanal:
         logger.info(f"Último ID CUENTA guardado: A {str(ultimo).zfill(6)}")
         logger.info(f"Índice email actualizado: {len(indice_email_actual)} entradas")
         logger.info(f"Índice cédula actualizado: {len(indice_cedula_actual)} entradas")  # ✅
+        logger.info(
+            f"Índices contrato / teléfono actualizados: "
+            f"{len(indice_contrato_actual)} / {len(indice_telefono_actual)} entradas"
+        )
 
 
         
@@ -236,56 +240,51 @@ class GeneradorInformeSemanal:
         ultimo_numero: int
     ) -> pd.DataFrame:
 
-        filas = []
-        contador = ultimo_numero
-
-        for reg in registros:
-            contador += 1
-
-            nombre, apellido = self._separar_nombre_apellido(
-                reg.get("nombre_completo", "")
-            )
-
-            id_contrato = str(reg.get("id_contrato_wispro", "")).strip()
-            serial_cpe  = mapa_seriales.get(id_contrato, "PENDIENTE")
-
-            estado = self._traducir_estado(reg.get("estado_servicio", ""))
-
-            causa_suspension = (
-                reg.get("causa_suspension", "")
-                if estado == "SUSPENDIDO" else ""
-            )
-
-            fecha_instalacion = str(reg.get("fecha_instalacion", "")).strip()
-            if " " in fecha_instalacion:
-                fecha_instalacion = fecha_instalacion.split(" ")[0]
-
-            filas.append({
-                "ID CUENTA":                   f"A {str(contador).zfill(6)}",
-                "Código DANE Departamento":    DANE_DPTO,
-                "Departamento":                DEPARTAMENTO,
-                "Código DANE Municipio":       DANE_MPIO,
-                "Municipio":                   MUNICIPIO,
-                "Dirección del predio":        reg.get("direccion", ""),
-                "Barrio":                      reg.get("barrio", ""),
-                "Latitud":                     reg.get("latitud", ""),
-                "Longitud":                    reg.get("longitud", ""),
-                "Estrato":                     reg.get("estrato", "PENDIENTE"),
-                "Nombre":                      nombre,
-                "Apellido":                    apellido,
-                "Nacionalidad":                NACIONALIDAD,
-                "Tipo de documento":           TIPO_DOCUMENTO,
-                "Número documento de identidad": reg.get("documento", ""),
-                "Teléfono":                    reg.get("telefono", ""),
-                "Celular":                     reg.get("telefono", ""),
-                "E mail":                      reg.get("email", ""),
-                "No ha tenido servicio de INTERNET en los últimos seis (6) meses. Registre si presenta declaración juramentada (SI/NO)": DECLARACION_JUR,
-                "Fecha de instalación":        fecha_instalacion,
-                "NÚMERO DE SERIE DEL CPE INSTALADO": serial_cpe,
-                "Fecha de finalización del servicio": reg.get("fecha_finalizacion", ""),
-                "Estado del servicio":         estado,
-                "Si el servicio se encuentra suspendido": causa_suspension,
-            })
+        df = pd.DataFrame(registros)
+
+        def campo(nombre: str, defecto: str = "") -> pd.Series:
+            if nombre not in df.columns:
+                return pd.Series(defecto, index=df.index, dtype=object)
+            return df[nombre].fillna(defecto)
+
+        nombres = separar_nombres(campo("nombre_completo"))
+
+        id_contrato = campo("id_contrato_wispro").astype(str).str.strip()
+        serial_cpe  = id_contrato.map(mapa_seriales).fillna("PENDIENTE")
+
+        estado = self._traducir_estados(campo("estado_servicio"))
+        causa_suspension = campo("causa_suspension").where(estado == "SUSPENDIDO", "")
+
+        fecha_instalacion = campo("fecha_instalacion").astype(str).str.strip().str.split(" ").str[0]
+
+        consecutivos = range(ultimo_numero + 1, ultimo_numero + len(df) + 1)
+
+        filas = {
+            "ID CUENTA":                   [f"A {str(n).zfill(6)}" for n in consecutivos],
+            "Código DANE Departamento":    DANE_DPTO,
+            "Departamento":                DEPARTAMENTO,
+            "Código DANE Municipio":       DANE_MPIO,
+            "Municipio":                   MUNICIPIO,
+            "Dirección del predio":        campo("direccion"),
+            "Barrio":                      campo("barrio"),
+            "Latitud":                     campo("latitud"),
+            "Longitud":                    campo("longitud"),
+            "Estrato":                     campo("estrato", "PENDIENTE"),
+            "Nombre":                      nombres["NOMBRE"],
+            "Apellido":                    nombres["APELLIDO"],
+            "Nacionalidad":                NACIONALIDAD,
+            "Tipo de documento":           TIPO_DOCUMENTO,
+            "Número documento de identidad": campo("documento"),
+            "Teléfono":                    campo("telefono"),
+            "Celular":                     campo("telefono"),
+            "E mail":                      campo("email"),
+            "No ha tenido servicio de INTERNET en los últimos seis (6) meses. Registre si presenta declaración juramentada (SI/NO)": DECLARACION_JUR,
+            "Fecha de instalación":        fecha_instalacion,
+            "NÚMERO DE SERIE DEL CPE INSTALADO": serial_cpe,
+            "Fecha de finalización del servicio": campo("fecha_finalizacion"),
+            "Estado del servicio":         estado,
+            "Si el servicio se encuentra suspendido": causa_suspension,
+        }
 
         return pd.DataFrame(filas, columns=COLUMNAS_OFICIALES)
 
@@ -294,7 +293,7 @@ class GeneradorInformeSemanal:
     # Nombre del archivo incluye la fecha de corte para trazabilidad
     # ------------------------------------------------------------------
     def _guardar_excel(self, df: pd.DataFrame) -> Path:
-        fecha_hoy = datetime.now().strftime("%Y-%m-%d")
+        fecha_hoy = ahora().strftime("%Y-%m-%d")
         nombre_archivo = f"informe_semanal_{fecha_hoy}.xlsx"
         ruta_archivo = self.ruta_salida / nombre_archivo
 
@@ -329,8 +328,9 @@ class GeneradorInformeSemanal:
         df_nuevos     = self._transformar_registros(registros, mapa_seriales, ultimo_numero)
         ruta_excel    = self._guardar_excel(df_nuevos)
 
-        # Persistir último ID e índice email → ID CUENTA
-        self._guardar_ultimo_id(ultimo_numero + len(registros), df_nuevos)
+        # Persistir último ID e índices de llaves → ID CUENTA
+        id_contratos = pd.Series([r.get("id_contrato_wispro", "") for r in registros], dtype=object)
+        self._guardar_ultimo_id(ultimo_numero + len(registros), df_nuevos, id_contratos)
 
         logger.info(
             f"\n{'='*50}\n"
@@ -349,6 +349,6 @@ class GeneradorInformeSemanal:
 # ------------------------------------------------------------------
 # FUNCIÓN DE ENTRADA — llamar desde main.py
 # ------------------------------------------------------------------
-def generar_informe_semanal(registros: list) -> Path:
-    generador = GeneradorInformeSemanal()
+def generar_informe_semanal(registros: list, ruta_salida: Path = None, ruta_registro: Path = None) -> Path:
+    generador = GeneradorInformeSemanal(ruta_salida=ruta_salida, ruta_registro=ruta_registro)
     return generador.generar(registros)
@@ -6,7 +6,8 @@ Objetivo:
 - Consolidar la información por cliente, incluso si tiene varios contratos.
 - Relacionar facturas, contratos y clientes sin alterar el pipeline existente.
 - Mostrar:
-    * ID CUENTA (A 0000#) desde el índice de email del registro procesado
+    * ID CUENTA (A 0000#) desde los índices del registro procesado
+      (email, cédula, ID CONTRATO, teléfono)
     * Datos del cliente
     * Contratos asociados
     * Total de facturas
@@ -20,20 +21,49 @@ Notas:
 - El reporte se guarda en: salidas/informes_facturacion/
 - Este módulo NO modifica el informe semanal.
 - Si una columna cambia de nombre en Wispro, el resolver de columnas intenta ubicarla por alias.
+- Las facturas salen del libro de facturas (procesadores/libro_facturas.py),
+  que acumula todos los exports: el historial de pagos no depende de la
+  ventana del último export.
+- Cada cliente ya agregado queda en caché con la huella de sus facturas
+  (procesadores/cache_facturacion.py): una corrida solo recalcula los
+  clientes con cambios o cuyo estado vence con la fecha de corte.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
 import unicodedata
-from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import DEFAULT_FONT, Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from procesadores.cache_facturacion import CacheFacturacion, huella_por_cliente
+from procesadores.carga_concurrente import cargar_en_paralelo
+from procesadores.catalogo_entradas import obtener_catalogo
+from procesadores.columnas import normalizar_nombre_columna, resolver_alias
+from procesadores.esquemas import (
+    ESQUEMA_CLIENTES,
+    ESQUEMA_CONTRATOS,
+    alinear_claves,
+    es_texto,
+    parsear_fechas,
+    parsear_montos,
+    texto_plano,
+)
+from procesadores import reloj
+from procesadores.lector_csv import detectar_formato, leer_csv
+from procesadores.libro_facturas import COLUMNAS_INTERNAS, RUTA_LIBRO, LibroFacturas
+from procesadores.normalizacion import normalizar_cedulas
+from procesadores.resolvedor_cuentas import ResolvedorCuentas
 
 
 # ------------------------------------------------------------------
@@ -46,6 +76,50 @@ BASE_ENTRADA = Path("datos/entrada/wispro")
 BASE_SALIDA = Path("salidas/informes_facturacion")
 RUTA_REGISTRO = Path("datos/procesados/modelo_contrato/registro_procesados.json")
 
+# Sube si cambia la agregación por cliente: invalida el caché por cliente
+VERSION_AGREGACION = 1
+
+# ------------------------------------------------------------------
+# COLUMNAS QUE CONSUME EL REPORTE {canónica: [alias]}
+# Mismos alias que _asegurar_columna_canonica; el lector solo parsea
+# estas columnas y las entrega ya con el nombre canónico.
+# ------------------------------------------------------------------
+COLUMNAS_CLIENTES = {
+    "ID CLIENTE":        ["ID CLIENTE", "ID_CLIENTE"],
+    "ID PERSONALIZABLE": ["ID PERSONALIZABLE", "ID PERSONALIZABLE_cliente"],
+    "NOMBRE":            ["NOMBRE", "NOMBRE CLIENTE", "NOMBRE COMPLETO"],
+    "EMAIL":             ["EMAIL", "EMAIL_cliente"],
+    "TELÉFONO":          ["TELÉFONO", "TELÉFONO CELULAR", "TELÉFONOS"],
+    "DIRECCIÓN":         ["DIRECCIÓN", "DIRECCIÓN DEL CLIENTE", "DIRRECIÓN DEL CLIENTE"],
+    "DOCUMENTO/CÉDULA":  ["DOCUMENTO/CÉDULA", "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE", "DOCUMENTO O CEDULA DE IDENTIDAD CLIENTE"],
+    "TIPO DE FACTURA":   ["TIPO DE FACTURA"],
+}
+
+COLUMNAS_CONTRATOS = {
+    "ID CONTRATO":       ["ID CONTRATO", "ID"],
+    "ID CLIENTE":        ["ID CLIENTE", "ID CLIENTE_contrato", "ID CLIENTE_cliente"],
+    "ESTADO CONTRATO":   ["ESTADO_contrato", "ESTADO", "ESTADO DEL CONTRATO"],
+    "PLAN":              ["NOMBRE PLAN_contrato", "NOMBRE PLAN", "PLAN"],
+    "FECHA DE ALTA":     ["FECHA DE ALTA", "CREADO EL_contrato", "CREADO EL"],
+}
+
+COLUMNAS_FACTURAS = {
+    "ID CLIENTE":          ["ID CLIENTE", "ID_CLIENTE"],
+    "ID CONTRATO":         ["ID CONTRATO", "ID_CONTRATO"],
+    "NOMBRE CLIENTE":      ["NOMBRE CLIENTE", "NOMBRE CLIENTE_contrato"],
+    "PRIMER VENCIMIENTO":  ["PRIMER VENCIMIENTO"],
+    "SEGUNDO VENCIMIENTO": ["SEGUNDO VENCIMIENTO"],
+    "DETALLES":            ["DETALLES"],
+    "ESTADO FACTURA":      ["ESTADO", "ESTADO FACTURA", "ESTADO_pago"],
+    "MONTO":               ["MONTO", "VALOR", "TOTAL"],
+    "BALANCE":             ["BALANCE"],
+    "FECHA EMISIÓN":       ["FECHA EMISIÓN", "FECHA DE EMISIÓN", "EMITIDA EL", "CREADO EL"],
+    "TIPO FACTURA":        ["TIPO FACTURA"],
+}
+
+# Predicado aplicado mientras se lee el CSV de contratos (ver [C-02])
+FILTROS_CONTRATOS = [("ESTADO CONTRATO", "en", ["HABILITADO"])]
+
 
 # ------------------------------------------------------------------
 # NORMALIZACIÓN Y UTILIDADES DE BÚSQUEDA (VERSIÓN ROBUSTA)
@@ -73,87 +147,48 @@ def _normalizar_texto(valor) -> str:
     return texto
 
 
-def _normalizar_email(valor) -> str:
-    if valor is None:
-        return ""
-    return str(valor).strip().lower()
-
-
-def _normalizar_cedula(valor) -> str:
-    """
-    Normaliza una cédula eliminando el sufijo .0 que pandas genera
-    al leer columnas numéricas como float.
-        '1085896121.0'  →  '1085896121'
-        '1085896121'    →  '1085896121'
-        'nan'           →  ''
+def _buscar_ultimo_archivo(tipo: str) -> Path:
     """
-    if valor is None:
-        return ""
-    s = str(valor).strip()
-    if s.lower() in ("nan", "none", ""):
-        return ""
-    if s.endswith(".0"):
-        s = s[:-2]
-    return s
-
-
-def _buscar_ultimo_archivo(carpeta: Path, patrones: list[str]) -> Path:
-    """
-    Busca el archivo más reciente.
+    Busca el archivo más reciente del tipo en el catálogo de entradas
+    (procesadores/catalogo_entradas.py): el de fecha de snapshot mayor
+    hasta la fecha de corte del reloj.
     Incluye logging para trazabilidad.
     """
-    if not carpeta.exists():
-        raise FileNotFoundError(
-            f"No existe la carpeta de entrada: {carpeta.resolve()}"
-        )
-
-    candidatos: list[Path] = []
-
-    for patron in patrones:
-        encontrados = list(carpeta.glob(patron))
-        if encontrados:
-            logger.info(f"Patrón '{patron}' → {len(encontrados)} archivo(s)")
-        candidatos.extend(encontrados)
-
-    if not candidatos:
-        raise FileNotFoundError(
-            f"No se encontró ningún archivo en {carpeta.resolve()} "
-            f"con patrones: {patrones}"
-        )
-
-    candidatos.sort(key=lambda p: p.stat().st_mtime)
-    seleccionado = candidatos[-1]
+    catalogo = obtener_catalogo(BASE_ENTRADA)
+    candidatos = catalogo.archivos(tipo, al=reloj.fecha_de_corte())
+    logger.info(f"Tipo '{tipo}' → {len(candidatos)} archivo(s)")
 
+    seleccionado = catalogo.ultimo(tipo, al=reloj.fecha_de_corte())
     logger.info(f"Archivo seleccionado: {seleccionado.name}")
 
     return seleccionado
 
 
-def _leer_csv_robusto(ruta: Path) -> pd.DataFrame:
+def _leer_csv_robusto(
+    ruta: Path,
+    columnas: dict | None = None,
+    filtros: list | None = None,
+    esquema: dict | None = None,
+) -> pd.DataFrame:
     """
-    Lee CSV probando múltiples codificaciones.
+    Lee CSV en una sola pasada.
+    La codificación y el separador se detectan sobre una muestra inicial
+    (procesadores/lector_csv.py) en lugar de reintentar el archivo completo
+    con cada codificación. Con `columnas` solo se parsean las declaradas y
+    con `filtros` el archivo se lee por bloques descartando filas.
+    Con `esquema` las columnas declaradas salen tipadas (IDs Int64,
+    estados category, vencimientos datetime); el resto queda como texto.
     """
-    errores = []
-
-    for encoding in ("utf-8-sig", "utf-8", "latin1"):
-        try:
-            df = pd.read_csv(
-                ruta,
-                dtype=str,
-                sep=None,
-                engine="python",
-                encoding=encoding,
-            )
-            logger.info(f"CSV leído correctamente con encoding: {encoding}")
-            return df
-
-        except Exception as exc:
-            errores.append(f"{encoding}: {exc}")
-
-    raise ValueError(
-        f"No fue posible leer el CSV {ruta.resolve()}.\n"
-        f"Intentos realizados:\n- " + "\n- ".join(errores)
-    )
+    try:
+        df = leer_csv(ruta, columnas=columnas, filtros=filtros, esquema=esquema, dtype=str)
+    except Exception as exc:
+        raise ValueError(
+            f"No fue posible leer el CSV {ruta.resolve()}.\n"
+            f"Detalle técnico: {exc}"
+        ) from exc
+
+    logger.info(f"CSV leído correctamente con encoding: {detectar_formato(ruta)['encoding']}")
+    return df
 
 
 def _leer_excel_robusto(ruta: Path) -> pd.DataFrame:
@@ -168,28 +203,32 @@ def _leer_excel_robusto(ruta: Path) -> pd.DataFrame:
         ) from exc
 
 
+@lru_cache(maxsize=None)
+def _informar_resolucion(aliases: tuple, col_encontrada: str | None):
+    """Un solo log por juego de alias y resultado, no uno por búsqueda."""
+    if col_encontrada is None:
+        logger.warning(f"No se encontró columna para aliases: {list(aliases)}")
+    else:
+        logger.info(f"Columna encontrada: {col_encontrada} (alias: {normalizar_nombre_columna(col_encontrada)})")
+
+
 def _resolver_columna(df: pd.DataFrame, aliases: list[str], requerida: bool = False) -> str | None:
     """
     Busca una columna real en el DataFrame usando aliases.
-    Ahora con logging y control.
+    La resolución se memoriza por firma de encabezado (procesadores/columnas.py):
+    los nombres se normalizan una vez por proceso, no en cada llamada.
     """
-    mapa = {_normalizar_texto(col): col for col in df.columns}
-    aliases_norm = [_normalizar_texto(alias) for alias in aliases]
+    aliases = tuple(aliases)
+    col_encontrada = resolver_alias(tuple(df.columns), aliases)
 
-    for alias_norm in aliases_norm:
-        if alias_norm in mapa:
-            col_encontrada = mapa[alias_norm]
-            logger.info(f"Columna encontrada: {col_encontrada} (alias: {alias_norm})")
-            return col_encontrada
-
-    if requerida:
+    if col_encontrada is None and requerida:
         raise KeyError(
-            f"No se encontró columna requerida: {aliases}\n"
+            f"No se encontró columna requerida: {list(aliases)}\n"
             f"Columnas disponibles: {list(df.columns)}"
         )
 
-    logger.warning(f"No se encontró columna para aliases: {aliases}")
-    return None
+    _informar_resolucion(aliases, col_encontrada)
+    return col_encontrada
 
 
 def _asegurar_columna_canonica(
@@ -211,7 +250,9 @@ def _asegurar_columna_canonica(
     if col_real != nombre_canonico:
         df[nombre_canonico] = df[col_real]
 
-    df[nombre_canonico] = df[nombre_canonico].fillna("").astype(str).str.strip()
+    # Columnas tipadas por el esquema (Int64, category, fechas) se conservan
+    if es_texto(df[nombre_canonico]):
+        df[nombre_canonico] = df[nombre_canonico].fillna("").astype(str).str.strip()
 
     return df
 
@@ -219,81 +260,14 @@ def _asegurar_columna_canonica(
 def _limpiar_dataframe_texto(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     for col in df.columns:
-        df[col] = df[col].fillna("").astype(str).str.strip()
+        if es_texto(df[col]):
+            df[col] = df[col].fillna("").astype(str).str.strip()
     return df
 
 
 # ------------------------------------------------------------------
 # FECHAS, MONTO Y ESTADO DE FACTURACIÓN
 # ------------------------------------------------------------------
-def _parse_fecha(valor):
-    """
-    Convierte texto a Timestamp; si falla devuelve NaT.
-    Se usa dayfirst=True porque Wispro y los CSV operativos suelen venir en formato dd/mm/yyyy.
-    """
-    if valor is None:
-        return pd.NaT
-    try:
-        return pd.to_datetime(valor, dayfirst=True, errors="coerce")
-    except Exception:
-        return pd.NaT
-
-
-def _parse_monto(valor):
-    """
-    Convierte montos tipo '$ 12.345,00', '12.345', '12345' o '12345.00' a float.
-    Si no se puede interpretar, devuelve 0.0.
-    """
-    if valor is None:
-        return 0.0
-
-    texto = str(valor).strip()
-    if not texto or texto.lower() in {"nan", "none"}:
-        return 0.0
-
-    # Limpieza de símbolos monetarios y separadores frecuentes.
-    texto = texto.replace("$", "").replace("COP", "").replace(" ", "").strip()
-
-    # Normalización para formatos latinos:
-    # 12.345,67 -> 12345.67
-    # 12,345.67 -> 12345.67 (se deja lo más compatible posible)
-    if texto.count(",") == 1 and texto.count(".") >= 1:
-        # Si hay coma decimal y puntos de miles
-        texto = texto.replace(".", "").replace(",", ".")
-    elif texto.count(",") == 1 and texto.count(".") == 0:
-        # Decimal con coma
-        texto = texto.replace(",", ".")
-    else:
-        # Caso simple o ya viene numérico con punto decimal
-        texto = texto.replace(",", "")
-
-    match = re.search(r"-?\d+(?:\.\d+)?", texto)
-    if not match:
-        return 0.0
-
-    try:
-        return float(match.group(0))
-    except Exception:
-        return 0.0
-
-
-def _extraer_periodo(detalle) -> str | None:
-    """
-    Extrae el período mensual desde el campo DETALLES.
-    Ejemplo:
-        '2026-04-01 - 2026-04-30' -> '2026-04'
-    """
-    if not isinstance(detalle, str):
-        return None
-
-    detalle = detalle.strip()
-    if not detalle:
-        return None
-
-    match = re.search(r"(\d{4}-\d{2})-\d{2}", detalle)
-    return match.group(1) if match else None
-
-
 def _clasificar_estado_factura(valor) -> bool | None:
     """
     Clasifica el estado de una factura:
@@ -319,296 +293,497 @@ def _clasificar_estado_factura(valor) -> bool | None:
     return None
 
 
-def _distancia_a_corte(fecha: pd.Timestamp) -> int:
+def _distancia_a_corte(fechas: pd.Series) -> pd.Series:
     """
-    Distancia en días al día 5 del mes de la fecha recibida.
+    Distancia en días al día 5 del mes de cada fecha (999 si falta).
     Se usa para seleccionar el vencimiento más cercano al corte operativo.
     """
-    if pd.isna(fecha):
-        return 999
+    return (fechas.dt.day - 5).abs().fillna(999)
+
+
+def _seleccionar_fecha_principal(primer_v: pd.Series, segundo_v: pd.Series) -> pd.Series:
+    """
+    Selecciona, fila a fila, la fecha de vencimiento más cercana al corte
+    operativo del día 5. Si una de las fechas es inválida, toma la otra;
+    si ambas lo son, NaT. En empate gana el primer vencimiento.
+    """
+    usar_segundo = primer_v.isna() | (
+        segundo_v.notna() & (_distancia_a_corte(segundo_v) < _distancia_a_corte(primer_v))
+    )
+    return primer_v.where(~usar_segundo, segundo_v)
+
+
+def _texto(serie: pd.Series) -> pd.Series:
+    """Valores como texto sin espacios en los extremos; faltantes → ""."""
+    return serie.astype(object).where(serie.notna(), "").astype(str).str.strip()
 
-    fecha = pd.Timestamp(fecha)
-    fecha_corte = fecha.replace(day=5)
-    return abs((fecha - fecha_corte).days)
 
+def _texto_util(serie: pd.Series) -> pd.Series:
+    """Como _texto, pero "nan" / "none" (cualquier mayúscula) también → ""."""
+    texto = _texto(serie)
+    return texto.where(~texto.str.lower().isin(["nan", "none"]), "")
 
-def _seleccionar_fecha_principal(primer_v, segundo_v):
+
+def _formatear_lista_unica(grupos: pd.Series, valores: pd.Series) -> pd.Series:
     """
-    Selecciona la fecha de vencimiento más cercana al corte operativo del día 5.
-    Si una de las fechas es inválida, toma la otra.
-    Si ambas son inválidas, devuelve NaT.
+    Por grupo: valores únicos en orden de aparición, sin vacíos, unidos
+    con ", ". Retorna una Series indexada por grupo (solo grupos con algún
+    valor).
     """
-    fechas_validas = [f for f in [primer_v, segundo_v] if pd.notna(f)]
-    if not fechas_validas:
-        return pd.NaT
-    if len(fechas_validas) == 1:
-        return fechas_validas[0]
-    return min(fechas_validas, key=_distancia_a_corte)
+    texto   = _texto_util(valores)
+    validos = texto != ""
+    unicos  = pd.DataFrame({"grupo": grupos[validos], "texto": texto[validos]}).drop_duplicates()
+    return (unicos["texto"].astype(object) + ", ").groupby(unicos["grupo"], sort=False).sum().str[:-2]
 
 
-def _formatear_lista_unica(valores) -> str:
+# ------------------------------------------------------------------
+# AGREGACIÓN POR CLIENTE (VECTORIZADA)
+# ------------------------------------------------------------------
+def _estado_general(
+    pagada: pd.Series,
+    primer_v: pd.Series,
+    segundo_v: pd.Series,
+    hoy: pd.Timestamp,
+) -> np.ndarray:
     """
-    Convierte una serie/lista en texto único, conservando el orden de aparición
-    y descartando vacíos.
+    ESTADO GENERAL (AJUSTADO A OPERACIÓN REAL ISP), fila a fila.
+    [C-01] Si Wispro dice PAGADO → AL DÍA, sin importar la fecha.
+    Solo se evalúan fechas cuando la factura más reciente es IMPAGA.
     """
-    vistos = set()
-    salida = []
+    segundo_norm = segundo_v.dt.normalize()
+    primer_norm  = primer_v.dt.normalize()
+    return np.select(
+        [
+            pagada.fillna(False).astype(bool).to_numpy(),
+            (segundo_norm.notna() & (hoy > segundo_norm + pd.Timedelta(days=5))).to_numpy(),
+            (segundo_norm.notna() & (hoy > segundo_norm)).to_numpy(),
+            segundo_norm.notna().to_numpy(),
+            (primer_norm.notna() & (hoy > primer_norm)).to_numpy(),
+            primer_norm.notna().to_numpy(),
+        ],
+        ["AL DÍA", "EN MORA", "ALERTA", "PENDIENTE", "ALERTA", "PENDIENTE"],
+        default="SIN FECHA",
+    )
 
-    for valor in valores:
-        texto = str(valor).strip()
-        if not texto or texto.lower() in {"nan", "none"}:
-            continue
-        if texto not in vistos:
-            vistos.add(texto)
-            salida.append(texto)
 
-    return ", ".join(salida)
+def _agregar_por_cliente(
+    df: pd.DataFrame,
+    resolvedor: ResolvedorCuentas,
+    llaves: dict,
+    hoy: pd.Timestamp,
+) -> pd.DataFrame:
+    """
+    Una fila por ID CLIENTE con los campos del reporte.
+
+    Se ordena una sola vez (cliente, fecha de la factura; sin fecha al
+    final) y todo sale de agregaciones por grupo:
+    - última factura          → nth(-1)
+    - fechas de la última     → last() (último valor válido del grupo)
+    - contratos/estados/planes→ únicos en orden de aparición
+    - pagadas / meses / valor → groupby sobre las facturas con ES_PAGADA
+    - ESTADO GENERAL          → np.select sobre las reglas de vencimiento
+    """
+    df = df.assign(
+        _FECHA_ORDEN=df["_FECHA_REFERENCIA"]
+        .fillna(df["SEGUNDO VENCIMIENTO"])
+        .fillna(df["PRIMER VENCIMIENTO"])
+    )
+    df = df.sort_values(
+        ["ID CLIENTE", "_FECHA_ORDEN"], na_position="last", kind="stable", ignore_index=True
+    )
+
+    grupos   = df.groupby("ID CLIENTE", sort=False)
+    ultimo   = grupos.nth(-1).set_index("ID CLIENTE")
+    clientes = ultimo.index
+
+    def columna_ultimo(col: str) -> pd.Series:
+        if col not in ultimo.columns:
+            return pd.Series("", index=clientes)
+        return _texto(ultimo[col])
+
+    # ----------------------------------------------------------
+    # IDENTIFICACIÓN DE LA CUENTA (A0000#)
+    # Un cruce en lote con el resolvedor: por cliente, la primera llave
+    # que resuelve (email → cédula → ID CONTRATO → teléfono; columnas y
+    # facturas en orden).
+    # ----------------------------------------------------------
+    resuelto  = resolvedor.resolver(df, llaves, por=df["ID CLIENTE"]).reindex(clientes)
+    id_cuenta = resuelto["id_cuenta"]
+    email     = resuelto["valor"].where(resuelto["llave"] == "email", "")
+
+    otras = resuelto["llave"][~resuelto["llave"].isin(["", "email"])]
+    for llave, conteo in otras.value_counts(sort=False).items():
+        logger.info(f"ID CUENTA resuelto por {llave}: {int(conteo)} cliente(s)")
+
+    sin_id = id_cuenta == ""
+    if sin_id.any():
+        logger.warning(
+            f"No se encontró ID CUENTA para {int(sin_id.sum())} cliente(s): "
+            f"{clientes[sin_id.to_numpy()].tolist()}"
+        )
+    id_cuenta = id_cuenta.where(~sin_id, "SIN_ID")
+
+    documento = pd.Series("", index=clientes)
+    for col in reversed([c for c in ("DOCUMENTO/CÉDULA", "DOCUMENTO/CEDULA") if c in ultimo.columns]):
+        candidato = _texto_util(ultimo[col])
+        documento = candidato.where(candidato != "", documento)
+
+    # ----------------------------------------------------------
+    # CONTRATOS ASOCIADOS
+    # ----------------------------------------------------------
+    def lista_unica(col: str) -> pd.Series:
+        if col not in df.columns:
+            return pd.Series("", index=clientes)
+        return _formatear_lista_unica(df["ID CLIENTE"], df[col]).reindex(clientes).fillna("")
+
+    # ----------------------------------------------------------
+    # DATOS DE FACTURA MÁS RECIENTE
+    # Si la última fila no trae fechas válidas, vale la última fecha
+    # válida del grupo: es exactamente groupby().last().
+    # ----------------------------------------------------------
+    fechas    = grupos[["PRIMER VENCIMIENTO", "SEGUNDO VENCIMIENTO", "FECHA EMISIÓN"]].last()
+    primer_v  = fechas["PRIMER VENCIMIENTO"]
+    segundo_v = fechas["SEGUNDO VENCIMIENTO"]
+
+    # ----------------------------------------------------------
+    # FACTURACIÓN
+    # [C-01] Solo facturas donde Wispro confirmó ESTADO="Pagado".
+    # ----------------------------------------------------------
+    pagadas  = df[df["ES_PAGADA"] == True]
+    por_pago = pagadas.groupby("ID CLIENTE", sort=False)
+
+    periodos = pagadas["PERIODO_FACTURADO"]
+    con_periodo = periodos.notna() & (periodos.astype(str).str.strip() != "")
+    meses = pagadas[con_periodo].groupby("ID CLIENTE", sort=False)["PERIODO_FACTURADO"]
+
+    # ----------------------------------------------------------
+    # ESTADO GENERAL (reglas en _estado_general)
+    # ----------------------------------------------------------
+    estado_general = _estado_general(ultimo["ES_PAGADA"], primer_v, segundo_v, hoy)
+
+    # [C-03] DEUDA_TOTAL: suma de BALANCE_NUM de todas las facturas del cliente.
+    if "BALANCE_NUM" in df.columns:
+        deuda_total = grupos["BALANCE_NUM"].sum()
+    else:
+        deuda_total = pd.Series(0.0, index=clientes)
+
+    # [C-06] Morosidad que ya trae Wispro a nivel de cliente (último valor del grupo).
+    if "NÚMERO DE FACTURAS IMPAGAS" in df.columns:
+        num_impagas_cliente = (
+            pd.to_numeric(grupos["NÚMERO DE FACTURAS IMPAGAS"].last(), errors="coerce")
+            .fillna(0).astype(int)
+        )
+    else:
+        num_impagas_cliente = pd.Series(0, index=clientes)
+
+    if "BALANCE DE FACTRAS IMPAGAS" in df.columns:
+        balance_impagas_cliente = parsear_montos(grupos["BALANCE DE FACTRAS IMPAGAS"].last())
+    else:
+        balance_impagas_cliente = pd.Series(0.0, index=clientes)
+
+    resultado = pd.DataFrame({
+        "ID CUENTA":  id_cuenta,
+        "ID CLIENTE": clientes,
+        "NOMBRE":     columna_ultimo("NOMBRE"),
+        "DOCUMENTO":  documento,
+        "EMAIL":      email,
+        "TELÉFONO":   columna_ultimo("TELÉFONO"),
+        "DIRECCIÓN":  columna_ultimo("DIRECCIÓN"),
+
+        "ID CONTRATO PRINCIPAL": columna_ultimo("ID CONTRATO"),
+        "CONTRATOS ASOCIADOS":   lista_unica("ID CONTRATO"),
+        "ESTADOS CONTRATO":      lista_unica("ESTADO CONTRATO"),
+        "PLANES ASOCIADOS":      lista_unica("PLAN"),
+
+        "TOTAL FACTURAS":     grupos.size(),
+        "FACTURAS PAGADAS":   por_pago.size().reindex(clientes, fill_value=0),
+        "MESES PAGADOS":      meses.nunique().reindex(clientes, fill_value=0),
+        "ÚLTIMO MES PAGADO":  meses.max().reindex(clientes).fillna(""),
+        "VALOR TOTAL PAGADO": por_pago["MONTO_NUM"].sum().reindex(clientes, fill_value=0.0).astype(float),
+        "DEUDA_TOTAL":        deuda_total.astype(float),                  # [C-03]
+        "FACTURAS_IMPAGAS_CLIENTE": num_impagas_cliente,                   # [C-06]
+        "BALANCE_IMPAGAS_CLIENTE":  balance_impagas_cliente.astype(float), # [C-06]
+
+        "FECHA EMISIÓN (FACTURA ÚLTIMA)": fechas["FECHA EMISIÓN"],
+        "PRIMER VENCIMIENTO":  primer_v,
+        "SEGUNDO VENCIMIENTO": segundo_v,
+        "PRÓXIMO CORTE":       _seleccionar_fecha_principal(primer_v, segundo_v),
+
+        "ESTADO GENERAL": estado_general,
+    }, index=clientes)
+
+    return resultado.reset_index(drop=True)
+
+
+def _agregar_incremental(
+    df: pd.DataFrame,
+    resolvedor: ResolvedorCuentas,
+    llaves: dict,
+    hoy: pd.Timestamp,
+    ruta_cache: Path,
+) -> pd.DataFrame:
+    """
+    Igual que _agregar_por_cliente, pero solo recalcula:
+    - clientes cuya huella (sus filas de entrada) cambió o que no estaban
+      en el caché
+    - clientes del caché cuyo ESTADO GENERAL cambia con la fecha de corte
+      (p. ej. ALERTA → EN MORA al pasar los 5 días del segundo vencimiento)
+    El resto sale del caché (procesadores/cache_facturacion.py). Mismas
+    filas y mismo orden que la agregación completa.
+    """
+    firma = hashlib.sha256(json.dumps({
+        "version":    VERSION_AGREGACION,
+        "resolvedor": resolvedor.firma(),
+        "llaves":     llaves,
+    }, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    cache   = CacheFacturacion(firma, ruta_cache).cargar()
+    huellas = huella_por_cliente(df)
+
+    vigentes  = cache.vigentes(huellas)
+    cacheados = cache.filas.loc[vigentes]
+    por_fecha = pd.Index([])
+    if len(vigentes):
+        # Solo AL DÍA sale de la factura (pagada); lo demás, de las fechas
+        estado_hoy = _estado_general(
+            cacheados["ESTADO GENERAL"] == "AL DÍA",
+            cacheados["PRIMER VENCIMIENTO"],
+            cacheados["SEGUNDO VENCIMIENTO"],
+            hoy,
+        )
+        por_fecha = cacheados.index[estado_hoy != cacheados["ESTADO GENERAL"].to_numpy()]
+        cacheados = cacheados.drop(index=por_fecha)
+
+    recalcular = df["ID CLIENTE"].isin(huellas.index.difference(cacheados.index))
+    logger.info(
+        f"Facturación incremental: {len(huellas) - len(vigentes)} cliente(s) nuevos o con cambios | "
+        f"{len(por_fecha)} por fecha de corte | {len(cacheados)} desde caché"
+    )
+
+    partes = [cacheados.reset_index(drop=True)]
+    if recalcular.any():
+        partes.append(_agregar_por_cliente(df[recalcular], resolvedor, llaves, hoy))
+    resultado = (
+        pd.concat([p for p in partes if not p.empty], ignore_index=True)
+        .sort_values("ID CLIENTE", kind="stable", ignore_index=True)
+    )
+
+    if recalcular.any() or len(cache.filas) != len(resultado):
+        cache.guardar(resultado, huellas)
+    return resultado
 
 # ------------------------------------------------------------------
-# FORMATO FINAL DE EXCEL (VERSIÓN ROBUSTA Y PROFESIONAL)
+# EXPORTACIÓN A EXCEL (FORMATO AL ESCRIBIR)
 # ------------------------------------------------------------------
-def _aplicar_formato_excel(ruta_xlsx: Path) -> None:
+FORMATO_FECHA  = "DD/MM/YYYY"
+FORMATO_MONEDA = '"$"#,##0.00'
+ANCHO_MAXIMO   = 50
+
+_BORDE_FINO = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+
+# Estilos con nombre compartidos por todas las celdas del mismo tipo
+ESTILOS_FACTURACION = {
+    "fact_encabezado": dict(
+        font=Font(color="FFFFFF", bold=True),
+        fill=PatternFill("solid", fgColor="1F4E78"),
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+        border=_BORDE_FINO,
+    ),
+    "fact_fecha":  dict(font=DEFAULT_FONT, number_format=FORMATO_FECHA, alignment=Alignment(horizontal="center")),
+    "fact_moneda": dict(font=DEFAULT_FONT, number_format=FORMATO_MONEDA, alignment=Alignment(horizontal="right")),
+}
+
+
+def _tipo_columna(encabezado: str) -> str | None:
+    """"fecha", "moneda" o None según el nombre de la columna del reporte."""
+    encabezado = str(encabezado).upper()
+    if "FECHA" in encabezado or "VENCIMIENTO" in encabezado or "CORTE" in encabezado:
+        return "fecha"
+    if "VALOR" in encabezado or "TOTAL PAGADO" in encabezado:
+        return "moneda"
+    return None
+
+
+def _texto_visible(serie: pd.Series, tipo: str | None) -> pd.Series:
+    """Texto que Excel muestra para cada celda no vacía (para el ancho de columna)."""
+    if tipo == "fecha":
+        return pd.to_datetime(serie, errors="coerce").dropna().dt.strftime("%d/%m/%Y")
+    if tipo == "moneda":
+        return pd.to_numeric(serie, errors="coerce").fillna(0.0).map("${:,.2f}".format)
+    valores = serie.dropna()
+    return valores.astype(str)[lambda t: t != ""]
+
+
+def _escribir_excel(df: pd.DataFrame, ruta_xlsx: Path, hoja: str = "Facturacion_Clientes") -> None:
     """
-    Aplica formato profesional al Excel:
-    - encabezado estilizado
-    - autofiltro
-    - congelar primera fila
-    - ajuste automático de columnas
-    - formato de fechas
-    - formato de moneda
+    Escribe el reporte en una sola pasada (openpyxl write-only):
+    - encabezado estilizado, autofiltro y primera fila congelada
+    - anchos de columna desde el texto visible de cada columna del DataFrame
+    - fechas y moneda como valores tipados con su formato (sin re-parsear celdas)
     """
-    try:
-        from openpyxl.utils.datetime import from_excel
-
-        wb = load_workbook(ruta_xlsx)
-
-        if not wb.sheetnames:
-            logger.warning("El archivo Excel no contiene hojas.")
-            return
-
-        ws = wb[wb.sheetnames[0]]
-
-        if ws.max_row < 1 or ws.max_column < 1:
-            logger.warning("La hoja está vacía, no se aplica formato.")
-            return
-
-        # ----------------------------------------------------------
-        # CONGELAR PRIMERA FILA + FILTRO
-        # ----------------------------------------------------------
-        ws.freeze_panes = "A2"
-        ws.auto_filter.ref = ws.dimensions
-
-        # ----------------------------------------------------------
-        # ESTILO ENCABEZADO
-        # ----------------------------------------------------------
-        fill = PatternFill("solid", fgColor="1F4E78")
-        font = Font(color="FFFFFF", bold=True)
-        align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-        for cell in ws[1]:
-            cell.fill = fill
-            cell.font = font
-            cell.alignment = align
-
-        # ----------------------------------------------------------
-        # AJUSTE DE COLUMNAS
-        # ----------------------------------------------------------
-        for col_idx in range(1, ws.max_column + 1):
-            column_letter = ws.cell(row=1, column=col_idx).column_letter
-            max_length = 0
-
-            for row_idx in range(1, ws.max_row + 1):
-                try:
-                    value = ws.cell(row=row_idx, column=col_idx).value
-                    if value not in (None, ""):
-                        max_length = max(max_length, len(str(value)))
-                except Exception:
-                    pass
-
-            ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-
-        # ----------------------------------------------------------
-        # FORMATO DE FECHAS Y MONEDA
-        # ----------------------------------------------------------
-        for col_idx in range(1, ws.max_column + 1):
-            header = str(ws.cell(row=1, column=col_idx).value or "").upper()
-
-            for row_idx in range(2, ws.max_row + 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-
-                if cell.value in (None, ""):
-                    continue
-
-                # ---- FECHAS ----
-                if "FECHA" in header or "VENCIMIENTO" in header or "CORTE" in header:
-                    try:
-                        valor = cell.value
-
-                        # Si ya viene como fecha real
-                        if hasattr(valor, "strftime"):
-                            cell.number_format = "DD/MM/YYYY"
-                            cell.alignment = Alignment(horizontal="center")
-                            continue
-
-                        # Si viene como serial numérico de Excel
-                        if isinstance(valor, (int, float)):
-                            # Seriales pequeños como 96 o 51 suelen ser basura en este contexto.
-                            # Los dejamos vacíos para no mostrar fechas absurdas de 1900.
-                            if float(valor) < 10000:
-                                cell.value = ""
-                                continue
-
-                            fecha = from_excel(float(valor))
-                            cell.value = fecha
-                            cell.number_format = "DD/MM/YYYY"
-                            cell.alignment = Alignment(horizontal="center")
-                            continue
-
-                        # Si viene como texto
-                        if isinstance(valor, str):
-                            texto = valor.strip()
-
-                            # Si el texto es solo número, no lo mostramos como fecha.
-                            if re.fullmatch(r"\d+(\.\d+)?", texto):
-                                cell.value = ""
-                                continue
-
-                            parsed = pd.to_datetime(texto, errors="coerce", dayfirst=True)
-                            if pd.notna(parsed):
-                                cell.value = parsed.to_pydatetime()
-                                cell.number_format = "DD/MM/YYYY"
-                                cell.alignment = Alignment(horizontal="center")
-                            else:
-                                # Si no se puede interpretar como fecha, se limpia
-                                cell.value = ""
-                            continue
-
-                    except Exception:
-                        # Si algo falla en una celda de fecha, la dejamos vacía
-                        cell.value = ""
-
-                # ---- MONEDA ----
-                if "VALOR" in header or "TOTAL PAGADO" in header:
-                    try:
-                        valor = cell.value
-                        if isinstance(valor, str):
-                            texto = valor.replace("$", "").replace("COP", "").replace(" ", "").strip()
-                            if texto.count(",") == 1 and texto.count(".") >= 1:
-                                texto = texto.replace(".", "").replace(",", ".")
-                            elif texto.count(",") == 1 and texto.count(".") == 0:
-                                texto = texto.replace(",", ".")
-                            else:
-                                texto = texto.replace(",", "")
-
-                            match = re.search(r"-?\d+(?:\.\d+)?", texto)
-                            if match:
-                                cell.value = float(match.group(0))
-                            else:
-                                cell.value = 0.0
-
-                        elif isinstance(valor, (int, float)):
-                            cell.value = float(valor)
-                        else:
-                            cell.value = 0.0
-
-                        cell.number_format = '"$"#,##0.00'
-                        cell.alignment = Alignment(horizontal="right")
-                    except Exception:
-                        pass
-
-        # ----------------------------------------------------------
-        # GUARDAR
-        # ----------------------------------------------------------
-        wb.save(ruta_xlsx)
-
-        logger.info("Formato Excel aplicado correctamente.")
+    wb = Workbook(write_only=True)
+    for nombre, atributos in ESTILOS_FACTURACION.items():
+        wb.add_named_style(NamedStyle(name=nombre, **atributos))
+    ws = wb.create_sheet(hoja)
+
+    columnas = list(df.columns)
+    tipos    = [_tipo_columna(col) for col in columnas]
+
+    # ---- Dimensiones, paneles y filtro (antes de escribir filas) ----
+    for j, (col, tipo) in enumerate(zip(columnas, tipos), start=1):
+        largo = _texto_visible(df[col], tipo).str.len().max()
+        largo = max(len(str(col)), 0 if pd.isna(largo) else int(largo))
+        ws.column_dimensions[get_column_letter(j)].width = min(largo + 2, ANCHO_MAXIMO)
+
+    ws.freeze_panes    = "A2"
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(columnas))}{len(df) + 1}"
+
+    def celda(valor, estilo: str) -> WriteOnlyCell:
+        c = WriteOnlyCell(ws, value=valor)
+        c.style = estilo
+        return c
+
+    # ---- Valores por columna, ya tipados ----
+    valores_columnas = []
+    for col, tipo in zip(columnas, tipos):
+        serie = df[col]
+        if tipo == "fecha":
+            fechas = pd.to_datetime(serie, errors="coerce").astype(object)
+            valores = [
+                None if pd.isna(f) else celda(f.to_pydatetime(), "fact_fecha")
+                for f in fechas
+            ]
+        elif tipo == "moneda":
+            montos = pd.to_numeric(serie, errors="coerce").fillna(0.0).astype(float)
+            valores = [celda(m, "fact_moneda") for m in montos.tolist()]
+        else:
+            valores = serie.astype(object).where(serie.notna(), None).tolist()
+        valores_columnas.append(valores)
+
+    ws.append([celda(col, "fact_encabezado") for col in columnas])
+    for fila in zip(*valores_columnas):
+        ws.append(fila)
+
+    wb.save(ruta_xlsx)
+    logger.info("Formato Excel aplicado al escribir.")
 
-    except Exception as exc:
-        logger.warning(f"No fue posible aplicar formato avanzado al Excel: {exc}")
 
-        
 # ------------------------------------------------------------------
 # GENERADOR PRINCIPAL
 # ------------------------------------------------------------------
-def generar_reporte_facturacion() -> Path:
+def lecturas_facturacion() -> dict:
+    """
+    Lecturas que necesita el reporte, para procesadores/carga_concurrente.py.
+    Claves: "facturacion/clientes" y "facturacion/contratos". Contratos
+    puede venir en CSV o en Excel. Las facturas no se leen aquí: salen
+    del libro de facturas (procesadores/libro_facturas.py).
+    """
+    ruta_clientes  = _buscar_ultimo_archivo("clientes")
+    ruta_contratos = _buscar_ultimo_archivo("contratos")
+
+    logger.info(f"Clientes:  {ruta_clientes.name}")
+    logger.info(f"Contratos: {ruta_contratos.name}")
+
+    # -------------------------
+    # CONTRATOS (PUEDE SER CSV O EXCEL)
+    # -------------------------
+    if ruta_contratos.suffix.lower() == ".csv":
+        logger.info(f"Leyendo contratos como CSV: {ruta_contratos.name}")
+        lectura_contratos = partial(
+            _leer_csv_robusto, ruta_contratos, COLUMNAS_CONTRATOS, FILTROS_CONTRATOS, ESQUEMA_CONTRATOS
+        )
+    else:
+        logger.info(f"Leyendo contratos como Excel: {ruta_contratos.name}")
+        lectura_contratos = partial(_leer_excel_robusto, ruta_contratos)
+
+    return {
+        "facturacion/clientes": partial(
+            _leer_csv_robusto, ruta_clientes, COLUMNAS_CLIENTES, esquema=ESQUEMA_CLIENTES
+        ),
+        "facturacion/contratos": lectura_contratos,
+    }
+
+
+def generar_reporte_facturacion(
+    entradas: dict | None = None,
+    ruta_registro: Path | None = None,
+    carpeta_salida: Path | None = None,
+    resolvedor: ResolvedorCuentas | None = None,
+    ruta_libro: Path | None = None,
+) -> Path:
     """
     Genera el reporte de facturación por cliente y lo guarda en:
         salidas/informes_facturacion/reporte_facturacion_YYYY-MM-DD.xlsx
 
+    entradas: paquete ya cargado por carga_concurrente (claves de
+    lecturas_facturacion()); si no se indica, clientes y contratos se
+    leen aquí, a la vez. Las facturas salen del libro de facturas
+    (ruta_libro, por defecto RUTA_LIBRO), que primero ingresa los
+    exports de facturas nuevos hasta la fecha de corte. En la misma
+    carpeta queda el caché por cliente de la agregación.
+
+    ruta_registro / carpeta_salida: por defecto RUTA_REGISTRO y
+    BASE_SALIDA (el backfill pasa las de cada fecha de corte).
+    resolvedor: ResolvedorCuentas de la corrida (compartido con tickets);
+    si no se indica, se construye desde ruta_registro.
+    La fecha del archivo y del estado por vencimiento salen del
+    reloj del pipeline (procesadores/reloj.py).
+
     Retorna:
         Path del archivo generado.
     """
     logger.info("Generando reporte de facturación por clientes...")
 
+    ruta_registro  = Path(ruta_registro) if ruta_registro else RUTA_REGISTRO
+    carpeta_salida = Path(carpeta_salida) if carpeta_salida else BASE_SALIDA
+
     # --------------------------------------------------------------
     # RUTAS DE ENTRADA / SALIDA
     # --------------------------------------------------------------
-    BASE_SALIDA.mkdir(parents=True, exist_ok=True)
+    carpeta_salida.mkdir(parents=True, exist_ok=True)
 
-    ruta_clientes = _buscar_ultimo_archivo(
-        BASE_ENTRADA,
-        ["wispro_clientes_*.csv", "clientes_*.csv"]
-    )
-    ruta_contratos = _buscar_ultimo_archivo(
-        BASE_ENTRADA,
-        ["wispro_contratos_*.xls", "wispro_contratos_*.xlsx", "wispro_contratos_*.csv" ,"contratos_*.xls", "contratos_*.csv","contratos_*.xlsx"]
-    )
-    ruta_facturas = _buscar_ultimo_archivo(
-        BASE_ENTRADA,
-        ["wispro_facturas_*.csv", "facturas_*.csv"]
-    )
-
-    if not RUTA_REGISTRO.exists():
+    if not ruta_registro.exists():
         raise FileNotFoundError(
-            f"No existe el archivo de registro: {RUTA_REGISTRO.resolve()}"
+            f"No existe el archivo de registro: {ruta_registro.resolve()}"
         )
 
-    logger.info(f"Clientes:  {ruta_clientes.name}")
-    logger.info(f"Contratos: {ruta_contratos.name}")
-    logger.info(f"Facturas:  {ruta_facturas.name}")
-
     # --------------------------------------------------------------
     # CARGA DE ARCHIVOS (ROBUSTA — SOPORTA CSV Y EXCEL)
+    # Clientes y contratos se leen en paralelo; las facturas salen del
+    # libro, que acumula todos los exports (solo ingresa los nuevos).
     # --------------------------------------------------------------
-
-    # -------------------------
-    # CLIENTES (SIEMPRE CSV EN TU CASO)
-    # -------------------------
-    df_clientes = _leer_csv_robusto(ruta_clientes)
-
-    # -------------------------
-    # CONTRATOS (PUEDE SER CSV O EXCEL)
-    # -------------------------
-    if ruta_contratos.suffix.lower() == ".csv":
-        logger.info(f"Leyendo contratos como CSV: {ruta_contratos.name}")
-        df_contratos = _leer_csv_robusto(ruta_contratos)
-    else:
-        logger.info(f"Leyendo contratos como Excel: {ruta_contratos.name}")
-        df_contratos = _leer_excel_robusto(ruta_contratos)
-
-    # -------------------------
-    # FACTURAS (CSV)
-    # -------------------------
-    df_facturas = _leer_csv_robusto(ruta_facturas)
+    if entradas is None:
+        entradas = cargar_en_paralelo(lecturas_facturacion())
+
+    df_clientes = entradas["facturacion/clientes"]
+    df_contratos = entradas["facturacion/contratos"]
+
+    libro = LibroFacturas(
+        COLUMNAS_FACTURAS,
+        ruta_entrada=BASE_ENTRADA,
+        ruta_libro=ruta_libro or RUTA_LIBRO,
+    ).cargar()
+    df_facturas = libro.ingerir(al=reloj.fecha_de_corte())
+    if df_facturas.empty:
+        raise FileNotFoundError(f"No hay facturas en el libro ni exports de facturas en {BASE_ENTRADA}")
+    df_facturas = df_facturas.drop(columns=COLUMNAS_INTERNAS)
 
     # -------------------------
     # REGISTRO JSON (ID CUENTA)
     # -------------------------
-    if not RUTA_REGISTRO.exists():
+    if not ruta_registro.exists():
         raise FileNotFoundError(
-            f"No se encontró el archivo de registro: {RUTA_REGISTRO.resolve()}"
+            f"No se encontró el archivo de registro: {ruta_registro.resolve()}"
         )
 
-    with open(RUTA_REGISTRO, "r", encoding="utf-8") as f:
-        registro = json.load(f)
-
-    # Normalización del índice de emails → ID CUENTA
-    indice_email = {
-        _normalizar_email(k): v
-        for k, v in registro.get("indice_email", {}).items()
-    }
-
-    logger.info(f"Índice de emails cargado: {len(indice_email)} registros")
+    # Índices email / cédula / contrato / teléfono → ID CUENTA (uno por corrida)
+    if resolvedor is None:
+        resolvedor = ResolvedorCuentas.desde_registro(ruta_registro)
 
     # --------------------------------------------------------------
     # LIMPIEZA DE DATOS Y NORMALIZACIÓN DE COLUMNAS
@@ -636,6 +811,8 @@ def generar_reporte_facturacion() -> Path:
     # [C-02] Filtrar contratos deshabilitados.
     # Wispro marca contratos suspendidos como "Deshabilitado".
     # Esos contratos no deben entrar al reporte como activos ni generar facturación.
+    # Para CSV el filtro ya se aplicó en la lectura (FILTROS_CONTRATOS);
+    # aquí sigue siendo necesario cuando contratos llega en Excel.
     if "ESTADO CONTRATO" in df_contratos.columns:
         antes_contratos = len(df_contratos)
         df_contratos = df_contratos[
@@ -662,20 +839,17 @@ def generar_reporte_facturacion() -> Path:
     # --------------------------------------------------------------
     # TIPADO Y CAMPOS CALCULADOS
     # --------------------------------------------------------------
-    df_facturas["PRIMER VENCIMIENTO"] = df_facturas["PRIMER VENCIMIENTO"].apply(_parse_fecha)
-    df_facturas["SEGUNDO VENCIMIENTO"] = df_facturas["SEGUNDO VENCIMIENTO"].apply(_parse_fecha)
-    df_facturas["FECHA EMISIÓN"] = df_facturas["FECHA EMISIÓN"].apply(_parse_fecha)
-
-    # Período facturado (mes) a partir del detalle; si no existe, usa fecha de emisión.
-    df_facturas["PERIODO_FACTURADO"] = df_facturas["DETALLES"].apply(_extraer_periodo)
-    mask_sin_periodo = df_facturas["PERIODO_FACTURADO"].isna() | (df_facturas["PERIODO_FACTURADO"].astype(str).str.strip() == "")
-    df_facturas.loc[mask_sin_periodo, "PERIODO_FACTURADO"] = (
-        df_facturas.loc[mask_sin_periodo, "FECHA EMISIÓN"]
-        .dt.strftime("%Y-%m")
-    )
+    # Fechas ya tipadas por el esquema pasan directo; el texto se parsea
+    # por columna con su formato dominante (procesadores/esquemas.py).
+    df_facturas["PRIMER VENCIMIENTO"] = parsear_fechas(df_facturas["PRIMER VENCIMIENTO"])
+    df_facturas["SEGUNDO VENCIMIENTO"] = parsear_fechas(df_facturas["SEGUNDO VENCIMIENTO"])
+    df_facturas["FECHA EMISIÓN"] = parsear_fechas(df_facturas["FECHA EMISIÓN"])
+
+    # PERIODO_FACTURADO viene del libro: mes del detalle o, si no trae,
+    # de la fecha de emisión (procesadores/libro_facturas.py).
 
     # Valor numérico para poder sumar correctamente.
-    df_facturas["MONTO_NUM"] = df_facturas["MONTO"].apply(_parse_monto)
+    df_facturas["MONTO_NUM"] = parsear_montos(df_facturas["MONTO"])
 
     # [C-03] BALANCE_NUM: monto pendiente según Wispro.
     # Wispro ya trae una columna BALANCE que indica deuda de la factura.
@@ -683,7 +857,7 @@ def generar_reporte_facturacion() -> Path:
     #  - > 0.0   → monto pendiente
     # La convertimos a float para poder sumar por cliente.
     if "BALANCE" in df_facturas.columns:
-        df_facturas["BALANCE_NUM"] = df_facturas["BALANCE"].apply(_parse_monto)
+        df_facturas["BALANCE_NUM"] = parsear_montos(df_facturas["BALANCE"])
     else:
         df_facturas["BALANCE_NUM"] = 0.0
         logger.warning("[C-03] No se encontró columna BALANCE en facturas; BALANCE_NUM se deja en 0.0")
@@ -691,6 +865,8 @@ def generar_reporte_facturacion() -> Path:
     # [C-01] Excluir facturas ANULADAS antes de cualquier cálculo.
     # Wispro marca como "Anulado" registros de prueba y reversiones.
     # No representan ni deuda ni pago real — contaminarían totales.
+    # El libro las conserva (pasar a Anulado es una actualización de la
+    # factura), así que se descartan aquí.
     _antes_anulados = len(df_facturas)
     df_facturas = df_facturas[
         df_facturas["ESTADO FACTURA"].str.strip().str.upper() != "ANULADO"
@@ -729,6 +905,11 @@ def generar_reporte_facturacion() -> Path:
     df_contratos = df_contratos.drop_duplicates(subset=["ID CONTRATO"], keep="last")
     df_clientes = df_clientes.drop_duplicates(subset=["ID CLIENTE"], keep="last")
 
+    # Mismo tipo de llave en los tres lados del JOIN (Int64 o, si algún
+    # archivo trae IDs no numéricos o contratos llega en Excel, texto).
+    alinear_claves([df_facturas, df_contratos], "ID CONTRATO")
+    alinear_claves([df_facturas, df_contratos, df_clientes], "ID CLIENTE")
+
     # --------------------------------------------------------------
     # MERGE: FACTURAS + CONTRATOS + CLIENTES
     # --------------------------------------------------------------
@@ -776,16 +957,16 @@ def generar_reporte_facturacion() -> Path:
     col_tipo_facturas = tipo_factura_facturas[0] if len(tipo_factura_facturas) > 0 else None
 
     if col_tipo_facturas and col_tipo_facturas in df.columns:
-        df["TIPO_FACTURACION"] = df[col_tipo_facturas].fillna("").astype(str).str.strip()
+        df["TIPO_FACTURACION"] = texto_plano(df[col_tipo_facturas])
     elif "TIPO DE FACTURA" in df.columns:
-        df["TIPO_FACTURACION"] = df["TIPO DE FACTURA"].fillna("").astype(str).str.strip()
+        df["TIPO_FACTURACION"] = texto_plano(df["TIPO DE FACTURA"])
     else:
         df["TIPO_FACTURACION"] = ""
         logger.warning("[C-05] No se encontró TIPO FACTURA ni TIPO DE FACTURA; TIPO_FACTURACION queda vacío.")
 
     # Normalización de claves para evitar blancos
-    df["ID CLIENTE"] = df["ID CLIENTE"].fillna("").astype(str).str.strip()
-    df["ID CONTRATO"] = df["ID CONTRATO"].fillna("").astype(str).str.strip()
+    df["ID CLIENTE"] = texto_plano(df["ID CLIENTE"])
+    df["ID CONTRATO"] = texto_plano(df["ID CONTRATO"])
 
     df = df[df["ID CLIENTE"] != ""].copy()
 
@@ -804,11 +985,11 @@ def generar_reporte_facturacion() -> Path:
     # la cantidad de cédulas registradas, pero NO filtramos ni cortamos
     # el DataFrame df en este módulo.
     try:
-        cedulas_ya_procesadas = set()
-        with open(RUTA_REGISTRO, "r", encoding="utf-8") as f:
+        with open(ruta_registro, "r", encoding="utf-8") as f:
             _reg = json.load(f)
-        for c in _reg.get("cedulas_procesadas", []):
-            cedulas_ya_procesadas.add(_normalizar_cedula(c))
+        cedulas_ya_procesadas = set(
+            normalizar_cedulas(pd.Series(_reg.get("cedulas_procesadas", []), dtype=object))
+        ) - {""}
         logger.info(
             f"[SNAPSHOT] Registro de cedulas_procesadas cargado "
             f"({len(cedulas_ya_procesadas)} cédulas), "
@@ -826,298 +1007,21 @@ def generar_reporte_facturacion() -> Path:
             "Revisa que los archivos de Wispro tengan coincidentes los campos ID CLIENTE e ID CONTRATO."
         )
     # --------------------------------------------------------------
-    # AGRUPACIÓN POR CLIENTE (VERSIÓN ROBUSTA)
+    # AGRUPACIÓN POR CLIENTE (VECTORIZADA E INCREMENTAL)
+    # Llaves candidatas para el ID CUENTA; el resolvedor las normaliza
+    # con los mismos kernels que usó el informe semanal al guardar.
+    # Solo se agregan los clientes con cambios; el resto sale del caché
+    # por cliente, que vive junto al libro de facturas.
     # --------------------------------------------------------------
-    resultados = []
-
-    def _primer_valor_valido(*valores):
-        """
-        Devuelve el primer valor útil entre varios candidatos.
-        Ignora None, NaN, cadenas vacías y el texto literal 'nan'.
-        """
-        for valor in valores:
-            if valor is None:
-                continue
-            if pd.isna(valor):
-                continue
-
-            texto = str(valor).strip()
-            if not texto or texto.lower() in {"nan", "none"}:
-                continue
-
-            return texto
-        return ""
-
-    for cliente_id, grupo in df.groupby("ID CLIENTE", dropna=False):
-        grupo = grupo.copy()
-
-        # ----------------------------------------------------------
-        # ORDENAMIENTO SEGURO (última factura real)
-        # ----------------------------------------------------------
-        grupo["_FECHA_ORDEN"] = grupo["_FECHA_REFERENCIA"]
-
-        grupo["_FECHA_ORDEN"] = grupo["_FECHA_ORDEN"].fillna(grupo["SEGUNDO VENCIMIENTO"])
-        grupo["_FECHA_ORDEN"] = grupo["_FECHA_ORDEN"].fillna(grupo["PRIMER VENCIMIENTO"])
-
-        grupo = grupo.sort_values(
-            by=["_FECHA_ORDEN"],
-            na_position="last"
-        )
-
-        ultimo = grupo.iloc[-1]
-
-        # ----------------------------------------------------------
-        # IDENTIFICACIÓN DE LA CUENTA (A0000#)
-        # Ruta 1: buscar por email en indice_email
-        # ✅ CORRECCIÓN #2 — Ruta 2 (fallback): buscar por cédula
-        # en indice_cedula si la Ruta 1 no encontró coincidencia.
-        # ----------------------------------------------------------
-
-        # --- Cargar índice de cédulas (una sola vez fuera del loop
-        #     sería más eficiente, pero aquí se mantiene el patrón
-        #     existente del módulo para no alterar más estructura) ---
-        indice_cedula = {
-            str(k).strip(): v
-            for k, v in registro.get("indice_cedula", {}).items()
-        }
-
-        # RUTA 1 — búsqueda por email
-        emails_candidatos = []
-        for col in ("EMAIL", "EMAIL_CLIENTE", "EMAIL_contrato"):
-            if col in grupo.columns:
-                for valor in grupo[col].tolist():
-                    email_limpio = _normalizar_email(valor)
-                    if email_limpio and email_limpio not in {"nan", "none"}:
-                        if email_limpio not in emails_candidatos:
-                            emails_candidatos.append(email_limpio)
-
-        email = ""
-        for candidato in emails_candidatos:
-            if candidato in indice_email:
-                email = candidato
-                break
-
-        # Fallback email: última fila del grupo
-        if not email:
-            email_ultimo = _primer_valor_valido(
-                ultimo.get("EMAIL", None),
-                ultimo.get("EMAIL_CLIENTE", None),
-                ultimo.get("EMAIL_contrato", None),
-            )
-            email_ultimo = _normalizar_email(email_ultimo)
-            if email_ultimo in indice_email:
-                email = email_ultimo
-
-        id_cuenta = indice_email.get(email, "") if email else ""
-
-        # ✅ CORRECCIÓN BUG #2 — RUTA 2: fallback por cédula
-        if not id_cuenta:
-            documento_raw = _primer_valor_valido(
-                ultimo.get("DOCUMENTO/CÉDULA", None),
-                ultimo.get("DOCUMENTO/CEDULA", None),
-            )
-            cedula_norm = _normalizar_cedula(documento_raw)
-
-            # Buscar en todas las cédulas del grupo, no solo la última fila
-            cedulas_grupo = []
-            for col in ("DOCUMENTO/CÉDULA", "DOCUMENTO/CEDULA"):
-                if col in grupo.columns:
-                    for val in grupo[col].tolist():
-                        c = _normalizar_cedula(val)
-                        if c and c not in {"nan", "none"} and c not in cedulas_grupo:
-                            cedulas_grupo.append(c)
-
-            for cedula_candidata in cedulas_grupo:
-                if cedula_candidata in indice_cedula:
-                    id_cuenta = indice_cedula[cedula_candidata]
-                    logger.info(
-                        f"ID CUENTA resuelto por cédula ({cedula_candidata}): {id_cuenta}"
-                    )
-                    break
-
-        # Si ninguna ruta encontró el ID, marcar como SIN_ID
-        if not id_cuenta:
-            id_cuenta = "SIN_ID"
-            logger.warning(
-                f"No se encontró ID CUENTA para cliente {cliente_id}. "
-                f"Emails intentados: {emails_candidatos}. "
-                f"Cédulas intentadas: {cedulas_grupo if 'cedulas_grupo' in dir() else '—'}"
-            )
-
-        documento = _primer_valor_valido(
-            ultimo.get("DOCUMENTO/CÉDULA", None),
-            ultimo.get("DOCUMENTO/CEDULA", None),
-        )
-
-        # ----------------------------------------------------------
-        # CONTRATOS ASOCIADOS
-        # ----------------------------------------------------------
-        contratos_asociados = _formatear_lista_unica(grupo["ID CONTRATO"].tolist())
-
-        estados_contrato = _formatear_lista_unica(
-            grupo.get("ESTADO CONTRATO", pd.Series(dtype=str)).tolist()
-        )
-
-        planes_asociados = _formatear_lista_unica(
-            grupo.get("PLAN", pd.Series(dtype=str)).tolist()
-        )
-
-        # ----------------------------------------------------------
-        # DATOS DE FACTURA MÁS RECIENTE
-        # ----------------------------------------------------------
-        primer_v = ultimo.get("PRIMER VENCIMIENTO", pd.NaT)
-        segundo_v = ultimo.get("SEGUNDO VENCIMIENTO", pd.NaT)
-        fecha_emision_ultima = ultimo.get("FECHA EMISIÓN", pd.NaT)
-
-        # Si la última fila no trae fechas válidas, se toma la última fecha válida del grupo.
-        if pd.isna(primer_v) and "PRIMER VENCIMIENTO" in grupo.columns:
-            validos_primer = grupo["PRIMER VENCIMIENTO"].dropna()
-            if not validos_primer.empty:
-                primer_v = validos_primer.iloc[-1]
-
-        if pd.isna(segundo_v) and "SEGUNDO VENCIMIENTO" in grupo.columns:
-            validos_segundo = grupo["SEGUNDO VENCIMIENTO"].dropna()
-            if not validos_segundo.empty:
-                segundo_v = validos_segundo.iloc[-1]
-
-        if pd.isna(fecha_emision_ultima) and "FECHA EMISIÓN" in grupo.columns:
-            validos_emision = grupo["FECHA EMISIÓN"].dropna()
-            if not validos_emision.empty:
-                fecha_emision_ultima = validos_emision.iloc[-1]
-
-        proximo_corte = _seleccionar_fecha_principal(primer_v, segundo_v)
-
-        # ----------------------------------------------------------
-        # FACTURACIÓN (ROBUSTA)
-        # ----------------------------------------------------------
-        # [C-01] Solo facturas donde Wispro confirmó ESTADO="Pagado".
-        # Se eliminó el OR con MONTO_NUM > 0 porque las facturas IMPAGAS
-        # también tienen monto > 0, lo que inflaba FACTURAS PAGADAS
-        # y VALOR TOTAL PAGADO con deudas reales del cliente.
-        grupo_pagado = grupo[grupo["ES_PAGADA"] == True].copy()
-
-        facturas_pagadas = len(grupo_pagado)
-        facturas_total = len(grupo)
-
-        meses_pagados = sorted(
-            set(
-                x for x in grupo_pagado["PERIODO_FACTURADO"].tolist()
-                if isinstance(x, str) and x.strip()
-            )
-        )
-
-        ultimo_mes_pagado = meses_pagados[-1] if meses_pagados else ""
-
-        total_pagado = float(
-            grupo_pagado["MONTO_NUM"].fillna(0).sum()
-        ) if facturas_pagadas else 0.0
-
-        # ----------------------------------------------------------
-        # ESTADO GENERAL (AJUSTADO A OPERACIÓN REAL ISP)
-        # ----------------------------------------------------------
-        # [C-01] El estado se determina primero por ES_PAGADA (Wispro).
-        # Antes un cliente que pagó a tiempo pero con fecha de vencimiento
-        # ya superada aparecía como "EN MORA" — incorrecto.
-        # Ahora: si Wispro dice PAGADO → AL DÍA, sin importar la fecha.
-        # Solo se evalúan fechas cuando la factura más reciente es IMPAGA.
-        hoy = pd.Timestamp.today().normalize()
-        es_pagada_ultimo = bool(ultimo.get("ES_PAGADA", False))
-
-        if es_pagada_ultimo:
-            estado_general = "AL DÍA"
-
-        elif pd.notna(segundo_v):
-            segundo_v_norm = pd.Timestamp(segundo_v).normalize()
-            fecha_corte_real = segundo_v_norm + pd.Timedelta(days=5)
-
-            if hoy > fecha_corte_real:
-                estado_general = "EN MORA"
-            elif hoy > segundo_v_norm:
-                estado_general = "ALERTA"
-            else:
-                estado_general = "PENDIENTE"
-
-        elif pd.notna(primer_v):
-            primer_v_norm = pd.Timestamp(primer_v).normalize()
-
-            if hoy > primer_v_norm:
-                estado_general = "ALERTA"
-            else:
-                estado_general = "PENDIENTE"
-
-        else:
-            estado_general = "SIN FECHA"
-
-
-        # ----------------------------------------------------------
-        # RESULTADO FINAL POR CLIENTE
-        # ----------------------------------------------------------
-        # [C-03] Se agrega DEUDA_TOTAL basada en BALANCE_NUM de Wispro.
-        # BALANCE_NUM es la suma de saldos pendientes de todas las facturas
-        # del cliente (después de excluir ANULADAS).
-        deuda_total = float(
-            grupo["BALANCE_NUM"].fillna(0).sum()
-        ) if "BALANCE_NUM" in grupo.columns else 0.0
-
-        # [C-06] Datos de morosidad que ya trae Wispro a nivel de cliente.
-        # NÚMERO DE FACTURAS IMPAGAS y BALANCE DE FACTRAS IMPAGAS
-        # vienen de wispro_clientes.csv. Si faltan, se asumen 0.
-        num_impagas_cliente = 0
-        balance_impagas_cliente = 0.0
-
-        if "NÚMERO DE FACTURAS IMPAGAS" in grupo.columns:
-            try:
-                # Tomamos el valor de la última fila no vacía del grupo
-                serie_num = grupo["NÚMERO DE FACTURAS IMPAGAS"].dropna()
-                if not serie_num.empty:
-                    num_impagas_cliente = int(float(serie_num.iloc[-1]))  # maneja "12.0"
-            except Exception:
-                num_impagas_cliente = 0
-
-        if "BALANCE DE FACTRAS IMPAGAS" in grupo.columns:
-            try:
-                serie_bal = grupo["BALANCE DE FACTRAS IMPAGAS"].dropna()
-                if not serie_bal.empty:
-                    balance_impagas_cliente = float(_parse_monto(serie_bal.iloc[-1]))
-            except Exception:
-                balance_impagas_cliente = 0.0
-
-        resultados.append({
-            "ID CUENTA": id_cuenta,
-            "ID CLIENTE": cliente_id,
-            "NOMBRE": str(ultimo.get("NOMBRE", "")).strip(),
-            "DOCUMENTO": documento,
-            "EMAIL": email,
-            "TELÉFONO": str(ultimo.get("TELÉFONO", "")).strip(),
-            "DIRECCIÓN": str(ultimo.get("DIRECCIÓN", "")).strip(),
-
-            "ID CONTRATO PRINCIPAL": str(ultimo.get("ID CONTRATO", "")).strip(),
-            "CONTRATOS ASOCIADOS": contratos_asociados,
-            "ESTADOS CONTRATO": estados_contrato,
-            "PLANES ASOCIADOS": planes_asociados,
-
-            "TOTAL FACTURAS": facturas_total,
-            "FACTURAS PAGADAS": facturas_pagadas,
-            "MESES PAGADOS": len(meses_pagados),
-            "ÚLTIMO MES PAGADO": ultimo_mes_pagado,
-            "VALOR TOTAL PAGADO": total_pagado,
-            "DEUDA_TOTAL": deuda_total,                  # [C-03] saldo pendiente según Wispro (facturas)
-            "FACTURAS_IMPAGAS_CLIENTE": num_impagas_cliente,      # [C-06]
-            "BALANCE_IMPAGAS_CLIENTE": balance_impagas_cliente,   # [C-06]
-
-            "FECHA EMISIÓN (FACTURA ÚLTIMA)": fecha_emision_ultima,
-            "PRIMER VENCIMIENTO": primer_v,
-            "SEGUNDO VENCIMIENTO": segundo_v,
-            "PRÓXIMO CORTE": proximo_corte,
-
-            "ESTADO GENERAL": estado_general,
-        })
-
-
-    # --------------------------------------------------------------
-    # DATAFRAME FINAL Y EXPORTACIÓN (CORREGIDO Y ROBUSTO)
-    # --------------------------------------------------------------
-    df_final = pd.DataFrame(resultados)
+    llaves = {
+        "email":    [c for c in ("EMAIL", "EMAIL_CLIENTE", "EMAIL_contrato") if c in df.columns],
+        "cedula":   [c for c in ("DOCUMENTO/CÉDULA", "DOCUMENTO/CEDULA") if c in df.columns],
+        "contrato": ["ID CONTRATO"],
+        "telefono": [c for c in ("TELÉFONO",) if c in df.columns],
+    }
+    df_final = _agregar_incremental(
+        df, resolvedor, llaves, hoy=reloj.hoy(), ruta_cache=ruta_libro or RUTA_LIBRO
+    )
 
     # ---------------------------
     # VALIDACIÓN
@@ -1209,13 +1113,10 @@ def generar_reporte_facturacion() -> Path:
     # ---------------------------
     # EXPORTACIÓN
     # ---------------------------
-    fecha_salida = datetime.now().strftime("%Y-%m-%d")
-    ruta_salida = BASE_SALIDA / f"reporte_facturacion_{fecha_salida}.xlsx"
-
-    with pd.ExcelWriter(ruta_salida, engine="openpyxl") as writer:
-        df_final.to_excel(writer, index=False, sheet_name="Facturacion_Clientes")
+    fecha_salida = reloj.ahora().strftime("%Y-%m-%d")
+    ruta_salida = carpeta_salida / f"reporte_facturacion_{fecha_salida}.xlsx"
 
-    _aplicar_formato_excel(ruta_salida)
+    _escribir_excel(df_final, ruta_salida)
 
     logger.info(f"Reporte generado correctamente: {ruta_salida.resolve()}")
     logger.info(f"Total clientes: {len(df_final)}")
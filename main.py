@@ -5,6 +5,7 @@ Orquestador principal del pipeline semanal de informes ISP.
 Flujo de ejecución:
   1. Playwright     → extrae seriales CPE desde inventario Wispro
                       persiste dict {id_contrato: serial} en registro_procesados.json
+  1.5 Carga        → lee a la vez todos los CSV de Wispro (pasos 2 y 5)
   2. CsvMerger      → fusiona orders + contratos + clientes
                       detecta solo los registros nuevos de la semana
   3. InformeSemanal → genera Excel oficial con seriales ya disponibles
@@ -26,12 +27,14 @@ from pathlib import Path
 
 from playwright.async_api               import async_playwright
 from extractores.playwright_extractor   import WisproPlaywrightExtractor
-from procesadores.csv_merger            import procesar_csvs
+from procesadores.csv_merger            import CsvMerger, procesar_csvs
+from procesadores.carga_concurrente     import cargar_en_paralelo
 from generadores.informe_semanal        import generar_informe_semanal
 from procesadores.tickets_merger        import TicketsMerger
+from procesadores.resolvedor_cuentas    import ResolvedorCuentas
 
 # 🔴 NUEVO IMPORT (FACTURACIÓN)
-from generadores.reporte_facturacion_clientes import generar_reporte_facturacion
+from generadores.reporte_facturacion_clientes import generar_reporte_facturacion, lecturas_facturacion
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -96,10 +99,40 @@ async def extraer_seriales(extractor: WisproPlaywrightExtractor):
             await browser.close()
 
 
+# ------------------------------------------------------------------
+# BLOQUE 2.5: CARGA CONCURRENTE DE LOS EXPORTS
+# ------------------------------------------------------------------
+def cargar_entradas() -> dict:
+    """
+    Lee en paralelo todos los CSV que consumen el PASO 2 (CsvMerger)
+    y el PASO 5 (facturación). Retorna {nombre: DataFrame}; cada paso
+    toma sus claves ("semanal/...", "facturacion/...").
+    Las lecturas de facturación son opcionales: si falta algún archivo o
+    alguno no se puede leer, solo quedan las del PASO 2 y el PASO 5 lee
+    sus entradas por su cuenta (y reporta el error en su paso, después
+    de que los pasos 2-4 terminaron).
+    """
+    logger.info("Cargando exports de Wispro en paralelo...")
+
+    lecturas = CsvMerger().lecturas()
+    try:
+        facturacion = lecturas_facturacion()
+    except Exception as e:
+        logger.warning(f"Facturación no se precarga: {e}")
+        facturacion = {}
+    lecturas.update(facturacion)
+
+    entradas = cargar_en_paralelo(lecturas, opcionales=set(facturacion))
+    if not all(nombre in entradas for nombre in facturacion):
+        for nombre in facturacion:
+            entradas.pop(nombre, None)
+    return entradas
+
+
 # ------------------------------------------------------------------
 # BLOQUE 3: PASO 2 — FUSIÓN CSV Y DETECCIÓN DE NUEVOS
 # ------------------------------------------------------------------
-def fusionar_csvs():
+def fusionar_csvs(entradas: dict = None):
     """
     Carga los 3 CSVs exportados de Wispro:
       - orders     (fuente de verdad → instalaciones exitosas)
@@ -110,7 +143,7 @@ def fusionar_csvs():
     """
     logger.info("PASO 2 — Fusionando CSVs y detectando registros nuevos...")
 
-    registros = procesar_csvs()
+    registros = procesar_csvs(entradas=entradas)
 
     if not registros:
         logger.warning("PASO 2 — No hay registros nuevos esta semana.")
@@ -145,14 +178,14 @@ def generar_excel(registros: list):
 # ------------------------------------------------------------------
 # BLOQUE 5: PASO 4 — GENERACIÓN DEL EXCEL PQRS (CONDICIONAL)
 # ------------------------------------------------------------------
-def generar_pqrs():
+def generar_pqrs(resolvedor: ResolvedorCuentas = None):
     """
     Genera el Excel contractual de PQRS solo si hay CSV de tickets.
     Si no existe el CSV o está vacío, retorna None sin error.
     """
     logger.info("PASO 4 — Verificando tickets PQRS...")
 
-    ruta = TicketsMerger().generar()
+    ruta = TicketsMerger(resolvedor=resolvedor).generar()
 
     if ruta:
         logger.info(f"PASO 4 completado — PQRS generado en: {ruta}")
@@ -191,26 +224,40 @@ def main():
                 "El Excel se generará con PENDIENTE en esa columna."
             )
 
+        # --------------------------------------------------
+        # CARGA DE EXPORTS (UNA SOLA VEZ, EN PARALELO)
+        # --------------------------------------------------
+        entradas = cargar_entradas()
+
         # --------------------------------------------------
         # PASO 2: FUSIÓN CSV
         # --------------------------------------------------
-        registros = fusionar_csvs()
+        registros = fusionar_csvs(entradas)
 
         # --------------------------------------------------
         # PASO 3: EXCEL SEMANAL
         # --------------------------------------------------
         ruta_excel = generar_excel(registros)
 
+        # --------------------------------------------------
+        # ÍNDICES DE ID CUENTA (UNA VEZ, PARA PASOS 4 Y 5)
+        # Se leen después del PASO 3, que agrega las cuentas nuevas.
+        # --------------------------------------------------
+        resolvedor = ResolvedorCuentas.desde_registro()
+
         # --------------------------------------------------
         # PASO 4: PQRS
         # --------------------------------------------------
-        ruta_pqrs = generar_pqrs()
+        ruta_pqrs = generar_pqrs(resolvedor)
 
         # --------------------------------------------------
         # 🔴 PASO 5: REPORTE DE FACTURACIÓN (NUEVO)
         # --------------------------------------------------
         logger.info("PASO 5 — Generando reporte de facturación por clientes...")
-        generar_reporte_facturacion()
+        generar_reporte_facturacion(
+            entradas if "facturacion/clientes" in entradas else None,
+            resolvedor=resolvedor,
+        )
         logger.info("PASO 5 completado — Reporte de facturación generado")
 
         # --------------------------------------------------
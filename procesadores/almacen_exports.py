@@ -0,0 +1,262 @@
+# procesadores/almacen_exports.py
+"""
+Almacén por llave de los exports de Wispro que llegan por ventanas.
+
+Los exports de tickets y de facturas traen solo una ventana de filas que
+se solapa con la anterior: lo que sale de la ventana se pierde si se usa
+solo el último export. El almacén guarda UNA fila por llave con la
+versión más nueva vista y se alimenta de todos los exports del catálogo:
+
+  - solo se leen los exports nuevos o modificados (por sha256)
+  - de cada export solo se procesan las filas nuevas o cambiadas
+    (hash de la fila frente al guardado)
+  - manda la fecha del export, no el orden de ingreso: una fila solo se
+    reemplaza con la de un export de fecha >= a la de la versión guardada
+    (reingresar un export viejo corregido no pisa lo más nuevo)
+  - ingerir(al=...) retorna la foto a esa fecha: si el almacén ya tiene
+    versiones de exports posteriores, la vista se reconstruye en memoria
+    con los exports <= al (lo guardado no se toca)
+  - las columnas derivadas (opcionales) se calculan al ingresar y se
+    guardan con la fila; si cambia su firma se recalculan sobre toda la
+    tabla, sin releer los CSV
+
+Cada subclase fija el tipo de export, el nombre de los archivos y cómo
+se prepara un export leído (procesadores/almacen_tickets.py,
+procesadores/libro_facturas.py). La tabla vive en su carpeta (Parquet o
+pickle) junto con <archivo>_exports.json (procesadores/persistencia.py).
+"""
+
+import copy
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.catalogo_entradas import obtener_catalogo
+from procesadores.cdc_snapshots import hash_filas
+from procesadores.lector_csv import leer_csv
+from procesadores.persistencia import guardar_tabla, leer_meta, leer_tabla, ruta_tabla
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+HASH   = "HASH_FILA"
+EXPORT = "EXPORT"            # archivo del que viene la versión guardada
+FECHA  = "FECHA_EXPORT"      # fecha (ISO) de ese export; "" si el nombre no la trae
+
+# Cambia si cambia la forma de la tabla o de la meta: se reconstruye
+VERSION_ALMACEN = 3
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: ALMACÉN
+# ------------------------------------------------------------------
+class AlmacenExports:
+    """
+    Base de AlmacenTickets y LibroFacturas. Las subclases definen:
+        TIPO        tipo de export en el catálogo ("tickets", "facturas")
+        ARCHIVO     nombre de la tabla y de la meta ("tickets" → tickets.parquet)
+        DESCRIPCION texto de los logs ("Almacén de tickets")
+        VERSION     versión propia (p. ej. de la llave); si cambia, se reconstruye
+        _preparar(df, ruta) → df con la columna llave lista
+
+    `columnas` es {canónica: [alias]}; `derivar(df)` (opcional) retorna un
+    DataFrame con las columnas derivadas para esas filas.
+    """
+
+    TIPO        = ""
+    ARCHIVO     = ""
+    DESCRIPCION = "Almacén"
+    VERSION     = 0
+
+    def __init__(
+        self,
+        columnas: dict,
+        llave: str,
+        ruta_entrada: Path,
+        ruta_almacen: Path,
+        derivar=None,
+        firma_derivados: str = "",
+    ):
+        self.columnas        = columnas
+        self.llave           = llave
+        self.ruta_entrada    = Path(ruta_entrada)
+        self.ruta_almacen    = Path(ruta_almacen)
+        self.derivar         = derivar
+        self.firma_derivados = firma_derivados
+
+        self.tabla   = self._tabla_vacia()
+        self.exports = {}            # archivo → sha256 ya ingresado
+
+    def _tabla_vacia(self) -> pd.DataFrame:
+        # La llave puede no venir del export (se arma en _preparar)
+        columnas = list(dict.fromkeys([self.llave, *self.columnas, EXPORT, FECHA]))
+        tabla = pd.DataFrame(columns=columnas, dtype=object)
+        tabla[HASH] = pd.Series(dtype="uint64")
+        return tabla
+
+    # -- persistencia ----------------------------------------------
+    @property
+    def _ruta_tabla(self) -> Path:
+        return ruta_tabla(self.ruta_almacen, self.ARCHIVO)
+
+    @property
+    def _ruta_meta(self) -> Path:
+        return self.ruta_almacen / f"{self.ARCHIVO}_exports.json"
+
+    def _version(self) -> list:
+        return [VERSION_ALMACEN, self.VERSION]
+
+    def cargar(self):
+        """Lee la tabla guardada; si no existe, es ilegible o cambió su forma, queda vacía."""
+        if not (self._ruta_tabla.exists() and self._ruta_meta.exists()):
+            return self
+        try:
+            meta = leer_meta(self._ruta_meta)
+            if meta.get("columnas") != list(self.columnas) or meta.get("version") != self._version():
+                logger.info(f"{self.DESCRIPCION}: cambiaron las columnas o el formato, se reconstruye")
+                return self
+            tabla = leer_tabla(self._ruta_tabla, meta)
+        except Exception as e:
+            logger.warning(f"{self.DESCRIPCION} ilegible ({e}), se reconstruye")
+            return self
+
+        self.tabla   = tabla
+        self.exports = meta["exports"]
+
+        if self.derivar and meta.get("firma_derivados") != self.firma_derivados and not tabla.empty:
+            logger.info(f"{self.DESCRIPCION}: cambió la firma de las derivadas, se recalculan")
+            derivadas = self.derivar(tabla[list(self.columnas)])
+            self.tabla = tabla.assign(**{c: derivadas[c] for c in derivadas.columns})
+            self._guardar()
+        return self
+
+    def _guardar(self):
+        meta = {
+            "columnas":        list(self.columnas),
+            "version":         self._version(),
+            "firma_derivados": self.firma_derivados,
+            "exports":         self.exports,
+        }
+        guardar_tabla(self.tabla, self._ruta_tabla, meta, self._ruta_meta)
+
+    # -- ingreso ------------------------------------------------------
+    def _pendientes(self, al=None) -> list:
+        """Exports del catálogo (fecha <= al) que no están ingresados tal cual."""
+        if not self.ruta_entrada.exists():
+            return []
+        catalogo = obtener_catalogo(self.ruta_entrada)
+        return [
+            (catalogo.ruta(e), e["sha256"], e["fecha"] or "")
+            for e in catalogo.archivos(self.TIPO, al=al)
+            if self.exports.get(e["nombre"]) != e["sha256"]
+        ]
+
+    def _preparar(self, df: pd.DataFrame, ruta: Path) -> pd.DataFrame:
+        """Por defecto: llave sin espacios; las filas sin llave se omiten."""
+        df[self.llave] = df[self.llave].astype(str).str.strip().astype(object)
+
+        sin_llave = df[self.llave] == ""
+        if sin_llave.any():
+            logger.warning(f"{ruta.name}: {int(sin_llave.sum())} fila(s) sin {self.llave}, se omiten")
+            df = df[~sin_llave]
+        return df
+
+    def _leer_export(self, ruta: Path) -> pd.DataFrame:
+        df = leer_csv(ruta, columnas=self.columnas, dtype=str)
+        df = df.reindex(columns=list(self.columnas)).fillna("").astype(object)
+        df = self._preparar(df, ruta)
+        # _preparar puede reordenar para elegir qué duplicado gana
+        return df.drop_duplicates(self.llave, keep="last").sort_index()
+
+    def _ingerir_export(self, ruta: Path, fecha: str) -> tuple:
+        """
+        Upsert de un export de fecha `fecha`: las filas cambiadas se
+        reemplazan en su posición (solo si la versión guardada no viene
+        de un export más nuevo) y las nuevas se agregan al final.
+        Retorna (nuevas, cambiadas).
+        """
+        llave = self.llave
+        df = self._leer_export(ruta)
+        df[HASH] = hash_filas(df[list(self.columnas)]).to_numpy()
+
+        existe   = df[llave].isin(self.tabla[llave])
+        es_nueva = ~existe
+        cambiada = pd.Series(False, index=df.index)
+        if existe.any():
+            previas = self.tabla.set_index(llave).loc[df.loc[existe, llave], [HASH, FECHA]]
+            cambiada[existe] = (
+                (previas[HASH].to_numpy() != df.loc[existe, HASH].to_numpy())
+                & (previas[FECHA].to_numpy(dtype=object) <= fecha)
+            )
+
+        filas = df[es_nueva | cambiada]
+        if filas.empty:
+            return 0, 0
+
+        tipos = {HASH: "uint64"}
+        if self.derivar:
+            derivadas = self.derivar(filas[list(self.columnas)])
+            filas = filas.join(derivadas)
+            tipos.update(derivadas.dtypes.to_dict())
+        filas = filas.assign(**{EXPORT: ruta.name, FECHA: fecha})
+
+        orden     = pd.concat([self.tabla[llave], df.loc[es_nueva, llave]], ignore_index=True)
+        restantes = self.tabla[~self.tabla[llave].isin(filas[llave])]
+        # Una tabla vacía no entra al concat: las columnas que le faltan
+        # (derivadas) pasarían por float64 y el hash uint64 se redondearía
+        if restantes.empty:
+            partes = [filas[restantes.columns.union(filas.columns, sort=False)]]
+        else:
+            partes = [restantes, filas]
+        self.tabla = (
+            pd.concat(partes, ignore_index=True)
+            .set_index(llave)
+            .loc[orden]
+            .reset_index()
+            .astype(tipos)
+        )
+        return int(es_nueva.sum()), int(cambiada.sum())
+
+    def ingerir(self, al=None) -> pd.DataFrame:
+        """
+        Ingresa los exports pendientes con fecha <= al (en orden de fecha)
+        y guarda el almacén. Retorna la tabla tal como estaba a la fecha
+        `al` (sin `al`, la tabla completa).
+        """
+        pendientes = self._pendientes(al)
+        for ruta, sha256, fecha in pendientes:
+            nuevas, cambiadas = self._ingerir_export(ruta, fecha)
+            self.exports[ruta.name] = sha256
+            logger.info(f"{self.DESCRIPCION} {ruta.name}: {nuevas} nuevas | {cambiadas} con cambios")
+
+        if pendientes:
+            self._guardar()
+
+        posteriores = al is not None and (
+            self.tabla[FECHA] > pd.Timestamp(al).date().isoformat()
+        ).any()
+        if posteriores:
+            return self._vista_al(al)
+        logger.info(f"{self.DESCRIPCION}: {len(self.tabla)} filas de {len(self.exports)} export(s)")
+        return self.tabla
+
+    def _vista_al(self, al) -> pd.DataFrame:
+        """
+        El almacén ya tiene versiones de exports posteriores a `al`: la
+        foto a esa fecha se arma en memoria con los exports <= al.
+        """
+        vista = copy.copy(self)
+        vista.tabla   = self._tabla_vacia()
+        vista.exports = {}
+        for ruta, _, fecha in vista._pendientes(al):
+            vista._ingerir_export(ruta, fecha)
+        logger.info(
+            f"{self.DESCRIPCION}: corte {pd.Timestamp(al).date()} anterior a exports ya ingresados, "
+            f"vista reconstruida con {len(vista.tabla)} filas"
+        )
+        return vista.tabla
@@ -0,0 +1,78 @@
+# procesadores/almacen_tickets.py
+"""
+Almacén local de tickets de la mesa de ayuda de Wispro.
+
+Cada export wispro_tickets_*.csv trae solo una ventana de tickets: si el
+PQRS se arma con el último export, los tickets que ya no aparecen en él
+se pierden. El almacén guarda UNA fila por "Número del ticket" con la
+versión más nueva vista y se alimenta de todos los exports del catálogo
+(reglas de ingreso y de fecha en procesadores/almacen_exports.py).
+
+Las columnas derivadas (mes del contrato, categoría contractual) se
+calculan al ingresar y se guardan con la fila. La tabla vive en
+datos/procesados/tickets/ (Parquet o pickle) junto con
+tickets_exports.json (exports aplicados y firma de las derivadas). Si la
+firma cambia (otro inicio de contrato u otro mapa de categorías) las
+derivadas se recalculan sobre toda la tabla, sin releer los CSV.
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.almacen_exports import AlmacenExports
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_ENTRADA = Path("datos/entrada/wispro")
+RUTA_ALMACEN = Path("datos/procesados/tickets")
+
+LLAVE = "Número del ticket"
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: ALMACÉN
+# ------------------------------------------------------------------
+class AlmacenTickets(AlmacenExports):
+    """
+    Uso:
+        almacen = AlmacenTickets(COLUMNAS_TICKETS, derivar, firma).cargar()
+        almacen.ingerir(al="2026-04-30")   # tickets a esa fecha
+        almacen.tickets                    # DataFrame, una fila por ticket
+
+    `columnas` es {canónica: [alias]} (debe incluir LLAVE); `derivar(df)`
+    retorna un DataFrame con las columnas derivadas para esas filas.
+    """
+
+    TIPO        = "tickets"
+    ARCHIVO     = "tickets"
+    DESCRIPCION = "Almacén de tickets"
+
+    def __init__(
+        self,
+        columnas: dict,
+        derivar,
+        firma_derivados: str = "",
+        ruta_entrada: Path = RUTA_ENTRADA,
+        ruta_almacen: Path = RUTA_ALMACEN,
+    ):
+        if LLAVE not in columnas:
+            raise ValueError(f"Las columnas del almacén deben incluir la llave '{LLAVE}'")
+        super().__init__(
+            columnas,
+            LLAVE,
+            ruta_entrada=ruta_entrada,
+            ruta_almacen=ruta_almacen,
+            derivar=derivar,
+            firma_derivados=firma_derivados,
+        )
+
+    @property
+    def tickets(self) -> pd.DataFrame:
+        return self.tabla
@@ -0,0 +1,236 @@
+# procesadores/archivo_snapshots.py
+"""
+Archivo deduplicado por contenido de los exports de Wispro.
+
+Cada semana llegan 4-5 exports completos casi idénticos a los anteriores.
+En vez de guardar cada CSV entero, el archivo guarda:
+
+- filas.bin              : cada línea distinta UNA sola vez, direccionada
+                           por su hash (blake2b de 16 bytes)
+- manifiestos/<csv>.json : tamaño, sha256 y número de líneas del snapshot
+- manifiestos/<csv>.hashes : la secuencia de hashes de sus líneas (16 B c/u)
+
+El espacio y el tiempo de backup crecen con las filas que CAMBIAN, no con
+el número de snapshots. La unidad es la línea física con su fin de línea
+(bytes tal cual), así que reconstruir es concatenar: el resultado es
+byte a byte el archivo original y se verifica contra su sha256.
+
+Formato de filas.bin (solo se agrega al final):
+    [hash 16 B][largo uint32 little-endian][bytes de la línea]
+Un registro incompleto al final (corte a mitad de escritura) se ignora.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+from pathlib import Path
+
+from procesadores.cache_columnar import hash_contenido
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_ENTRADA = Path("datos/entrada/wispro")
+RUTA_ARCHIVO = Path("datos/archivo")
+
+TAMANO_HASH     = 16
+CABECERA        = struct.Struct(f"<{TAMANO_HASH}sI")
+LINEAS_POR_LOTE = 4096
+
+
+def hash_linea(linea: bytes) -> bytes:
+    return hashlib.blake2b(linea, digest_size=TAMANO_HASH).digest()
+
+
+def _escribir_atomico(ruta: Path, contenido: bytes):
+    """Escribe en un temporal y lo renombra: nunca queda un manifiesto a medias."""
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: ARCHIVO
+# ------------------------------------------------------------------
+class ArchivoSnapshots:
+    """
+    Uso:
+        archivo = ArchivoSnapshots()
+        archivo.archivar_directorio()                     # idempotente
+        for bloque in archivo.iterar_snapshot("wispro_clientes_2026-04-27.csv"):
+            ...
+        archivo.restaurar("wispro_clientes_2026-04-27.csv", Path("/tmp"))
+    """
+
+    def __init__(self, ruta_archivo: Path = RUTA_ARCHIVO):
+        self.ruta_archivo    = Path(ruta_archivo)
+        self.ruta_filas      = self.ruta_archivo / "filas.bin"
+        self.ruta_manifiestos = self.ruta_archivo / "manifiestos"
+        self._indice = None          # hash → (offset de los bytes, largo)
+
+    # -- índice de filas -------------------------------------------
+    def _cargar_indice(self) -> dict:
+        """
+        Recorre solo las cabeceras de filas.bin (saltando el contenido).
+        Si el último registro está incompleto, se trunca el archivo ahí.
+        """
+        if self._indice is not None:
+            return self._indice
+
+        indice = {}
+        if self.ruta_filas.exists():
+            tamano = self.ruta_filas.stat().st_size
+            with open(self.ruta_filas, "rb") as f:
+                posicion = 0
+                while posicion + CABECERA.size <= tamano:
+                    digest, largo = CABECERA.unpack(f.read(CABECERA.size))
+                    inicio = posicion + CABECERA.size
+                    if inicio + largo > tamano:
+                        break
+                    indice[digest] = (inicio, largo)
+                    posicion = inicio + largo
+                    f.seek(posicion)
+
+            if posicion != tamano:
+                logger.warning(f"Archivo: registro incompleto al final de {self.ruta_filas}, se descarta")
+                with open(self.ruta_filas, "r+b") as f:
+                    f.truncate(posicion)
+
+        self._indice = indice
+        return indice
+
+    # -- escritura --------------------------------------------------
+    def _ruta_manifiesto(self, nombre: str) -> Path:
+        return self.ruta_manifiestos / f"{nombre}.json"
+
+    def _ruta_hashes(self, nombre: str) -> Path:
+        return self.ruta_manifiestos / f"{nombre}.hashes"
+
+    def archivar(self, ruta_csv: Path) -> dict:
+        """
+        Agrega un snapshot. Si ya está archivado con el mismo contenido no
+        se hace nada. Retorna el manifiesto con las líneas nuevas agregadas.
+        """
+        ruta_csv = Path(ruta_csv)
+        sha256   = hash_contenido(ruta_csv)
+        nombre   = ruta_csv.name
+
+        existente = self.manifiesto(nombre)
+        if existente is not None and existente["sha256"] == sha256:
+            logger.info(f"Archivo: {nombre} ya archivado")
+            return dict(existente, nuevas=0)
+
+        self.ruta_manifiestos.mkdir(parents=True, exist_ok=True)
+        indice = self._cargar_indice()
+
+        hashes = bytearray()
+        lineas = nuevas = 0
+        with open(ruta_csv, "rb") as origen, open(self.ruta_filas, "ab") as filas:
+            posicion = filas.tell()
+            for linea in origen:
+                digest = hash_linea(linea)
+                hashes += digest
+                lineas += 1
+                if digest in indice:
+                    continue
+                filas.write(CABECERA.pack(digest, len(linea)))
+                filas.write(linea)
+                indice[digest] = (posicion + CABECERA.size, len(linea))
+                posicion += CABECERA.size + len(linea)
+                nuevas += 1
+            filas.flush()
+            os.fsync(filas.fileno())
+
+        manifiesto = {
+            "archivo": nombre,
+            "sha256":  sha256,
+            "tamano":  ruta_csv.stat().st_size,
+            "lineas":  lineas,
+        }
+        _escribir_atomico(self._ruta_hashes(nombre), bytes(hashes))
+        _escribir_atomico(
+            self._ruta_manifiesto(nombre),
+            json.dumps(manifiesto, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+
+        logger.info(f"Archivo: {nombre} → {lineas} líneas, {nuevas} nuevas")
+        return dict(manifiesto, nuevas=nuevas)
+
+    def archivar_directorio(self, ruta_entrada: Path = RUTA_ENTRADA, patron: str = "*.csv") -> list:
+        """Archiva todos los CSV del directorio, en orden de nombre."""
+        return [self.archivar(ruta) for ruta in sorted(Path(ruta_entrada).glob(patron))]
+
+    # -- lectura ------------------------------------------------------
+    def manifiesto(self, nombre: str):
+        ruta = self._ruta_manifiesto(nombre)
+        if not ruta.exists():
+            return None
+        return json.loads(ruta.read_text(encoding="utf-8"))
+
+    def snapshots(self) -> list:
+        """Nombres de los snapshots archivados."""
+        if not self.ruta_manifiestos.exists():
+            return []
+        return sorted(p.name[:-len(".json")] for p in self.ruta_manifiestos.glob("*.json"))
+
+    def iterar_snapshot(self, nombre: str, lineas_por_lote: int = LINEAS_POR_LOTE):
+        """
+        Reconstruye un snapshot en streaming: genera bloques de bytes de
+        hasta `lineas_por_lote` líneas. Al final verifica el sha256 y lanza
+        ValueError si no coincide con el original.
+        """
+        manifiesto = self.manifiesto(nombre)
+        if manifiesto is None:
+            raise FileNotFoundError(f"Snapshot no archivado: {nombre}")
+
+        indice   = self._cargar_indice()
+        verifica = hashlib.sha256()
+        paso     = TAMANO_HASH * lineas_por_lote
+
+        with open(self._ruta_hashes(nombre), "rb") as hashes, open(self.ruta_filas, "rb") as filas:
+            for lote in iter(lambda: hashes.read(paso), b""):
+                bloque = bytearray()
+                for i in range(0, len(lote), TAMANO_HASH):
+                    digest = lote[i:i + TAMANO_HASH]
+                    if digest not in indice:
+                        raise ValueError(f"Archivo dañado: falta una línea de {nombre}")
+                    inicio, largo = indice[digest]
+                    filas.seek(inicio)
+                    bloque += filas.read(largo)
+                verifica.update(bloque)
+                yield bytes(bloque)
+
+        if verifica.hexdigest() != manifiesto["sha256"]:
+            raise ValueError(f"Archivo dañado: {nombre} no coincide con su sha256")
+
+    def restaurar(self, nombre: str, destino: Path) -> Path:
+        """Escribe el snapshot reconstruido en el directorio destino."""
+        destino = Path(destino)
+        destino.mkdir(parents=True, exist_ok=True)
+        ruta = destino / nombre
+        temporal = ruta.with_name(ruta.name + ".tmp")
+        with open(temporal, "wb") as f:
+            for bloque in self.iterar_snapshot(nombre):
+                f.write(bloque)
+        os.replace(temporal, ruta)
+        logger.info(f"Archivo: {nombre} restaurado en {destino}")
+        return ruta
+
+    def estadisticas(self) -> dict:
+        """Bytes originales vs. bytes guardados (filas + manifiestos)."""
+        manifiestos = [self.manifiesto(n) for n in self.snapshots()]
+        guardado = self.ruta_filas.stat().st_size if self.ruta_filas.exists() else 0
+        guardado += sum(p.stat().st_size for p in self.ruta_manifiestos.glob("*")) if self.ruta_manifiestos.exists() else 0
+        return {
+            "snapshots":         len(manifiestos),
+            "bytes_originales":  sum(m["tamano"] for m in manifiestos),
+            "bytes_archivo":     guardado,
+            "lineas_totales":    sum(m["lineas"] for m in manifiestos),
+            "lineas_unicas":     len(self._cargar_indice()),
+        }
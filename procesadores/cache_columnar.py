@@ -0,0 +1,157 @@
+# procesadores/cache_columnar.py
+"""
+Caché columnar de los CSVs de Wispro ya parseados.
+
+Cada lectura se guarda como Parquet en datos/procesados/cache/, con una
+clave formada por el hash del CONTENIDO del CSV, la versión del parseo
+(VERSION_PARSEO y la versión mayor de pandas) y las opciones de lectura.
+Si el archivo fuente o el parseo cambian, cambia la clave y la entrada
+vieja se descarta sola. Requiere pyarrow; si no está instalado, el caché se desactiva y los
+módulos siguen leyendo el CSV como siempre.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_CACHE         = Path("datos/procesados/cache")
+PARQUET_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+TAMANO_BLOQUE_HASH = 1024 * 1024
+
+# Versión del parseo que produce lo cacheado (lector_csv._proyectar,
+# esquemas.aplicar_esquema y sus kernels). SUBIRLA cada vez que cambie
+# cómo se parsea: las entradas de la versión anterior dejan de servirse.
+# También cuenta la versión mayor de pandas (cambian tipos y faltantes).
+VERSION_PARSEO = 1
+VERSION_CACHE  = f"v{VERSION_PARSEO}pd{pd.__version__.split('.')[0]}"
+
+# Huella del archivo → hash de contenido (evita re-hashear en la misma corrida)
+_CACHE_HASH: dict = {}
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: HUELLA Y HASH DE CONTENIDO
+# ------------------------------------------------------------------
+def huella_archivo(ruta: Path) -> tuple:
+    """
+    Identifica una versión concreta del archivo sin leer su contenido.
+    Si el archivo se reescribe, cambia el tamaño o el mtime y la huella.
+    """
+    ruta = Path(ruta)
+    info = ruta.stat()
+    return (str(ruta.resolve()), info.st_size, info.st_mtime_ns)
+
+
+def hash_contenido(ruta: Path) -> str:
+    """
+    SHA-256 del contenido del archivo, leído por bloques.
+    Se memoriza por huella: mientras el archivo no cambie no se re-lee.
+    """
+    clave = huella_archivo(ruta)
+    if clave in _CACHE_HASH:
+        return _CACHE_HASH[clave]
+
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE_HASH), b""):
+            h.update(bloque)
+
+    digest = h.hexdigest()
+    _CACHE_HASH[clave] = digest
+    return digest
+
+
+def _firma_opciones(opciones: dict) -> str:
+    """Hash corto y estable de las opciones de lectura (dtype, usecols, ...)."""
+    texto = repr(sorted((k, repr(v)) for k, v in opciones.items()))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:8]
+
+
+def _ruta_entrada(ruta: Path, opciones: dict) -> Path:
+    """<nombre>__<hash contenido>__<versión del parseo>__<opciones>.parquet"""
+    digest = hash_contenido(ruta)[:16]
+    return RUTA_CACHE / f"{Path(ruta).stem}__{digest}__{VERSION_CACHE}__{_firma_opciones(opciones)}.parquet"
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: LECTURA Y ESCRITURA DEL CACHÉ
+# ------------------------------------------------------------------
+def leer_desde_cache(ruta: Path, opciones: dict) -> pd.DataFrame | None:
+    """
+    Retorna el DataFrame cacheado para (contenido de ruta, opciones)
+    o None si no existe o no se puede leer.
+    """
+    if not PARQUET_DISPONIBLE:
+        return None
+
+    ruta_cache = _ruta_entrada(ruta, opciones)
+    if not ruta_cache.exists():
+        return None
+
+    try:
+        df = pd.read_parquet(ruta_cache)
+    except Exception as exc:
+        logger.warning(f"Caché ilegible {ruta_cache.name}, se re-parsea el CSV: {exc}")
+        return None
+
+    # Parquet devuelve None en columnas de texto; el resto del pipeline
+    # espera NaN como valor faltante (igual que pd.read_csv).
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+
+    logger.info(f"Caché columnar: {Path(ruta).name} ← {ruta_cache.name}")
+    return df
+
+
+def guardar_en_cache(ruta: Path, opciones: dict, df: pd.DataFrame) -> None:
+    """
+    Guarda el DataFrame parseado como Parquet y elimina las entradas
+    de versiones anteriores del mismo archivo (contenido ya obsoleto).
+    Un fallo aquí nunca interrumpe el pipeline: solo se pierde el caché.
+    """
+    if not PARQUET_DISPONIBLE:
+        return
+
+    ruta_cache = _ruta_entrada(ruta, opciones)
+    digest     = ruta_cache.stem.split("__")[-3]
+
+    # Temporal único por escritor: en el backfill varios procesos cachean
+    # el mismo CSV a la vez y ninguno debe pisar el temporal de otro
+    temporal = None
+    try:
+        RUTA_CACHE.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=RUTA_CACHE, prefix=f"{ruta_cache.stem}.", suffix=".tmp", delete=False
+        ) as archivo:
+            temporal = Path(archivo.name)
+        df.to_parquet(temporal)
+        os.replace(temporal, ruta_cache)
+    except Exception as exc:
+        logger.warning(f"No fue posible cachear {Path(ruta).name}: {exc}")
+        if temporal is not None:
+            temporal.unlink(missing_ok=True)
+        return
+
+    # Entradas de una versión anterior del archivo (otro hash) o del
+    # parseo (otra VERSION_CACHE), con cualquier combinación de opciones.
+    # Las del mismo hash y versión (de este u otro proceso) no se tocan.
+    for vieja in RUTA_CACHE.glob(f"{Path(ruta).stem}__*.parquet"):
+        partes = vieja.stem.split("__")
+        if len(partes) < 4 or partes[-3] != digest or partes[-2] != VERSION_CACHE:
+            try:
+                vieja.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning(f"No fue posible borrar la entrada vieja {vieja.name}: {exc}")
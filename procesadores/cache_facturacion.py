@@ -0,0 +1,130 @@
+# procesadores/cache_facturacion.py
+"""
+Caché por cliente del reporte de facturación.
+
+Entre una corrida y la siguiente cambian pocas facturas, pero el reporte
+agregaba a todos los clientes desde cero. Este caché guarda la fila ya
+agregada de cada cliente junto con su HUELLA: un hash de sus filas de
+entrada (facturas cruzadas con contrato y cliente, en orden). En la
+corrida siguiente solo se recalculan los clientes cuya huella cambió o
+que no estaban; el resto sale del caché tal cual.
+
+Lo que no depende de las filas del cliente va en la FIRMA del caché
+(versión de la agregación, índices de ID CUENTA, llaves): si la firma
+cambia, el caché se descarta entero. Lo que depende de la fecha de
+corte (ESTADO GENERAL por vencimiento) lo resuelve el reporte.
+
+La tabla vive junto al libro de facturas, en datos/procesados/facturacion/
+(Parquet o pickle), con clientes_meta.json (procesadores/persistencia.py).
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.cdc_snapshots import hash_filas
+from procesadores.persistencia import guardar_tabla, leer_meta, leer_tabla, ruta_tabla
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_CACHE = Path("datos/procesados/facturacion")
+
+LLAVE  = "ID CLIENTE"
+HUELLA = "HUELLA_CLIENTE"
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: HUELLA POR CLIENTE
+# ------------------------------------------------------------------
+def huella_por_cliente(df: pd.DataFrame, llave: str = LLAVE) -> pd.Series:
+    """
+    Hash uint64 de todas las filas de cada cliente (todas las columnas de
+    df). Cuenta el orden de las filas dentro del cliente: la "última
+    factura" y los empates dependen de él. Retorna Series llave → huella.
+    """
+    filas    = hash_filas(df).to_numpy()
+    posicion = df.groupby(llave, sort=False).cumcount().to_numpy()
+    mezcla   = hash_filas(pd.DataFrame({"fila": filas, "posicion": posicion}))
+    # La suma uint64 da la vuelta (módulo 2**64): no pierde información
+    return mezcla.groupby(df[llave].to_numpy(), sort=False).sum().rename(HUELLA)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: CACHÉ
+# ------------------------------------------------------------------
+class CacheFacturacion:
+    """
+    Uso:
+        cache = CacheFacturacion(firma, ruta_cache).cargar()
+        vigentes = cache.vigentes(huellas)    # clientes con la misma huella
+        cache.filas.loc[vigentes]             # sus filas ya agregadas
+        cache.guardar(resultado, huellas)
+
+    `firma` es un texto que identifica todo lo que no está en las filas
+    de cada cliente; si no coincide con la guardada, el caché queda vacío.
+    """
+
+    def __init__(self, firma: str, ruta_cache: Path = RUTA_CACHE):
+        self.firma      = firma
+        self.ruta_cache = Path(ruta_cache)
+
+        self.filas   = pd.DataFrame()          # índice: ID CLIENTE
+        self.huellas = pd.Series(dtype="uint64", name=HUELLA)
+
+    # -- persistencia ----------------------------------------------
+    @property
+    def _ruta_tabla(self) -> Path:
+        return ruta_tabla(self.ruta_cache, "clientes")
+
+    @property
+    def _ruta_meta(self) -> Path:
+        return self.ruta_cache / "clientes_meta.json"
+
+    def cargar(self) -> "CacheFacturacion":
+        """Lee el caché guardado; si no existe, es ilegible o cambió la firma, queda vacío."""
+        if not (self._ruta_tabla.exists() and self._ruta_meta.exists()):
+            return self
+        try:
+            meta = leer_meta(self._ruta_meta)
+            if meta.get("firma") != self.firma:
+                logger.info("Caché de facturación: cambió la firma, se recalculan todos los clientes")
+                return self
+            tabla = leer_tabla(self._ruta_tabla, meta)
+        except Exception as e:
+            logger.warning(f"Caché de facturación ilegible ({e}), se recalculan todos los clientes")
+            return self
+
+        # Parquet devuelve el texto como str de Arrow: se deja como salió
+        # de la agregación (object) para que el merge con lo recalculado
+        # tenga los mismos tipos
+        texto = [c for c in tabla.columns if pd.api.types.is_string_dtype(tabla[c])]
+        tabla = tabla.astype({c: object for c in texto}).set_index(LLAVE, drop=False)
+        tabla.index.name = None
+
+        self.huellas = tabla.pop(HUELLA)
+        self.filas   = tabla
+        return self
+
+    def guardar(self, resultado: pd.DataFrame, huellas: pd.Series):
+        """Guarda las filas agregadas (una por cliente, con columna ID CLIENTE) y sus huellas."""
+        tabla = resultado.reset_index(drop=True)
+        tabla[HUELLA] = huellas.reindex(tabla[LLAVE]).to_numpy()
+
+        meta = {"firma": self.firma, "clientes": len(tabla)}
+        guardar_tabla(tabla, self._ruta_tabla, meta, self._ruta_meta)
+
+    # -- consulta -----------------------------------------------------
+    def vigentes(self, huellas: pd.Series) -> pd.Index:
+        """Clientes de `huellas` que están en el caché con la misma huella."""
+        existe = huellas.index.isin(self.huellas.index)
+        igual  = pd.Series(False, index=huellas.index)
+        if existe.any():
+            guardadas = self.huellas.loc[huellas.index[existe]].to_numpy()
+            igual[existe] = guardadas == huellas[existe].to_numpy()
+        return huellas.index[igual.to_numpy()]
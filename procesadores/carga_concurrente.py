@@ -0,0 +1,75 @@
+# procesadores/carga_concurrente.py
+"""
+Carga concurrente de los exports de Wispro.
+
+Cada etapa declara sus lecturas como {nombre: función_sin_argumentos}
+(ver CsvMerger.lecturas y lecturas_facturacion). Este módulo las ejecuta
+todas a la vez en un pool de hilos: el parser C de pandas y pyarrow
+liberan el GIL mientras parsean, así el tiempo total queda cerca del
+archivo más pesado y no de la suma.
+
+Retorna un dict {nombre: DataFrame} del que cada etapa toma lo suyo.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+MAX_HILOS = 6
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: CARGA
+# ------------------------------------------------------------------
+def _medir(nombre: str, lectura):
+    inicio = time.perf_counter()
+    df = lectura()
+    logger.info(f"Carga '{nombre}': {len(df)} filas en {time.perf_counter() - inicio:.2f}s")
+    return df
+
+
+def cargar_en_paralelo(lecturas: dict, max_hilos: int = MAX_HILOS, opcionales=()) -> dict:
+    """
+    Ejecuta todas las lecturas en paralelo y retorna {nombre: DataFrame}.
+    Si alguna falla se propaga su excepción (la primera en el orden
+    declarado), igual que en la carga secuencial.
+
+    opcionales: nombres cuya falla NO corta la carga: se registra y el
+    nombre queda fuera del resultado (la etapa que lo usa lo lee sola
+    y reporta el error en su propio paso).
+    """
+    if not lecturas:
+        return {}
+
+    inicio = time.perf_counter()
+    hilos  = max(1, min(max_hilos, len(lecturas)))
+
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="carga") as pool:
+        futuros = {
+            nombre: pool.submit(_medir, nombre, lectura)
+            for nombre, lectura in lecturas.items()
+        }
+
+        entradas = {}
+        for nombre, futuro in futuros.items():
+            try:
+                entradas[nombre] = futuro.result()
+            except Exception as e:
+                if nombre in opcionales:
+                    logger.warning(f"Falló la carga opcional de '{nombre}': {e}")
+                    continue
+                logger.error(f"Falló la carga de '{nombre}'")
+                raise
+
+    logger.info(
+        f"Carga concurrente: {len(entradas)} archivos en "
+        f"{time.perf_counter() - inicio:.2f}s ({hilos} hilos)"
+    )
+    return entradas
@@ -0,0 +1,211 @@
+# procesadores/catalogo_entradas.py
+"""
+Catálogo único de los exports de Wispro en datos/entrada/wispro.
+
+Antes cada etapa elegía su archivo a su manera (orden por nombre, por
+mtime o por nombre invertido) y volvía a recorrer el directorio. Aquí
+cada archivo queda indexado por:
+
+- tipo           : clientes | contratos | orders | facturas | tickets
+- fecha          : fecha del snapshot según el nombre
+                   (orders_YYYYMMDD.csv y *_YYYY-MM-DD.csv)
+- tamaño, mtime  : para refrescar de forma incremental
+- sha256         : hash de contenido (llave estable para caché y backfill)
+
+El índice se guarda en datos/procesados/catalogo/entradas.json. Al
+refrescar solo se re-hashean los archivos cuyo tamaño o mtime cambió.
+
+Consulta principal: ultimo(tipo, al=fecha) → el snapshot más reciente
+del tipo con fecha <= al (sin `al`, el más reciente de todos).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.cache_columnar import hash_contenido
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_ENTRADA  = Path("datos/entrada/wispro")
+RUTA_CATALOGO = Path("datos/procesados/catalogo/entradas.json")
+
+# Tipo → patrón del nombre. El orden importa: gana el primero que coincide.
+TIPOS = {
+    "clientes":  re.compile(r"^(?:wispro_)?clientes_.*\.csv$", re.IGNORECASE),
+    "contratos": re.compile(r"^(?:wispro_)?contratos_.*\.(?:csv|xlsx?)$", re.IGNORECASE),
+    "orders":    re.compile(r"^orders_.*\.csv$", re.IGNORECASE),
+    "facturas":  re.compile(r"^(?:wispro_)?facturas_.*\.csv$", re.IGNORECASE),
+    "tickets":   re.compile(r"^wispro_tickets(?:_.*)?\.csv$", re.IGNORECASE),
+}
+
+_PATRON_FECHA = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")
+
+
+def fecha_en_nombre(nombre: str):
+    """Fecha del snapshot según el nombre del archivo, o None si no tiene."""
+    encontrada = _PATRON_FECHA.search(Path(nombre).stem)
+    if not encontrada:
+        return None
+    try:
+        return date(*(int(g) for g in encontrada.groups()))
+    except ValueError:
+        return None
+
+
+def tipo_de_archivo(nombre: str):
+    for tipo, patron in TIPOS.items():
+        if patron.match(nombre):
+            return tipo
+    return None
+
+
+def _a_fecha(valor):
+    """str 'YYYY-MM-DD' / date / Timestamp → date (None se conserva)."""
+    if valor is None:
+        return None
+    return pd.Timestamp(valor).date()
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: CATÁLOGO
+# ------------------------------------------------------------------
+class CatalogoEntradas:
+    """
+    Uso:
+        catalogo = obtener_catalogo()
+        catalogo.ultimo("clientes")                    # Path
+        catalogo.ultimo("facturas", al="2026-04-15")    # Path
+        catalogo.archivos("contratos")                 # [entrada, ...] por fecha
+    """
+
+    def __init__(self, ruta_entrada: Path = RUTA_ENTRADA, ruta_catalogo: Path = RUTA_CATALOGO):
+        self.ruta_entrada  = Path(ruta_entrada)
+        self.ruta_catalogo = Path(ruta_catalogo)
+        self.entradas  = {}          # nombre → {tipo, fecha, tamano, mtime_ns, sha256}
+        self._por_tipo = {}          # tipo → [entrada, ...] ordenadas por (fecha, nombre)
+        self._leer_guardado()
+
+    # -- persistencia ----------------------------------------------
+    def _leer_guardado(self):
+        if not self.ruta_catalogo.exists():
+            return
+        try:
+            guardado = json.loads(self.ruta_catalogo.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Catálogo ilegible ({e}), se reconstruye")
+            return
+        if guardado.get("ruta_entrada") == str(self.ruta_entrada.resolve()):
+            self.entradas = guardado.get("archivos", {})
+
+    def _guardar(self):
+        self.ruta_catalogo.parent.mkdir(parents=True, exist_ok=True)
+        contenido = {"ruta_entrada": str(self.ruta_entrada.resolve()), "archivos": self.entradas}
+        temporal = self.ruta_catalogo.with_name(self.ruta_catalogo.name + ".tmp")
+        temporal.write_text(json.dumps(contenido, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temporal, self.ruta_catalogo)
+
+    # -- refresco incremental --------------------------------------
+    def refrescar(self) -> "CatalogoEntradas":
+        """
+        Recorre el directorio una vez. Solo los archivos nuevos o con
+        tamaño/mtime distinto se vuelven a hashear.
+        """
+        if not self.ruta_entrada.exists():
+            raise FileNotFoundError(f"No existe la carpeta de entrada: {self.ruta_entrada.resolve()}")
+
+        vistos = {}
+        nuevos = 0
+        with os.scandir(self.ruta_entrada) as it:
+            for item in it:
+                if not item.is_file():
+                    continue
+                tipo = tipo_de_archivo(item.name)
+                if tipo is None:
+                    continue
+
+                info  = item.stat()
+                previa = self.entradas.get(item.name)
+                if previa and previa["tamano"] == info.st_size and previa["mtime_ns"] == info.st_mtime_ns:
+                    vistos[item.name] = previa
+                    continue
+
+                fecha = fecha_en_nombre(item.name)
+                vistos[item.name] = {
+                    "tipo":     tipo,
+                    "fecha":    fecha.isoformat() if fecha else None,
+                    "tamano":   info.st_size,
+                    "mtime_ns": info.st_mtime_ns,
+                    "sha256":   hash_contenido(Path(item.path)),
+                }
+                nuevos += 1
+
+        eliminados = len(set(self.entradas) - set(vistos))
+        self.entradas = vistos
+        if nuevos or eliminados or not self.ruta_catalogo.exists():
+            self._guardar()
+            logger.info(f"Catálogo: {len(vistos)} archivos ({nuevos} nuevos o modificados, {eliminados} eliminados)")
+
+        por_tipo = {tipo: [] for tipo in TIPOS}
+        for nombre, entrada in vistos.items():
+            por_tipo[entrada["tipo"]].append(dict(entrada, nombre=nombre))
+        for lista in por_tipo.values():
+            lista.sort(key=lambda e: (e["fecha"] or "", e["nombre"]))
+        self._por_tipo = por_tipo
+        return self
+
+    # -- consultas ---------------------------------------------------
+    def ruta(self, entrada: dict) -> Path:
+        return self.ruta_entrada / entrada["nombre"]
+
+    def archivos(self, tipo: str, al=None) -> list:
+        """Entradas del tipo ordenadas por fecha; con `al`, solo las de fecha <= al."""
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de export desconocido: {tipo}. Opciones: {list(TIPOS)}")
+        lista = self._por_tipo.get(tipo, [])
+        if al is None:
+            return list(lista)
+        limite = _a_fecha(al).isoformat()
+        return [e for e in lista if (e["fecha"] or "") <= limite]
+
+    def ultimo(self, tipo: str, al=None) -> Path:
+        """Snapshot más reciente del tipo con fecha <= al (FileNotFoundError si no hay)."""
+        candidatos = self.archivos(tipo, al)
+        if not candidatos:
+            condicion = f" con fecha <= {_a_fecha(al)}" if al is not None else ""
+            raise FileNotFoundError(
+                f"No se encontró ningún archivo de {tipo}{condicion} en {self.ruta_entrada.resolve()}"
+            )
+        return self.ruta(candidatos[-1])
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: INSTANCIA COMPARTIDA
+# ------------------------------------------------------------------
+_CATALOGOS: dict = {}
+
+
+def obtener_catalogo(ruta_entrada: Path = RUTA_ENTRADA) -> CatalogoEntradas:
+    """
+    Catálogo de la carpeta, compartido por todos los módulos del proceso.
+    Cada llamada lo refresca (un scandir; solo se hashea lo que cambió).
+    """
+    clave = str(Path(ruta_entrada).resolve())
+    if clave not in _CATALOGOS:
+        ruta_catalogo = RUTA_CATALOGO
+        if Path(ruta_entrada).resolve() != RUTA_ENTRADA.resolve():
+            digest = hashlib.sha256(clave.encode("utf-8")).hexdigest()[:8]
+            ruta_catalogo = RUTA_CATALOGO.with_name(f"entradas_{digest}.json")
+        _CATALOGOS[clave] = CatalogoEntradas(ruta_entrada, ruta_catalogo)
+    return _CATALOGOS[clave].refrescar()
@@ -0,0 +1,196 @@
+# procesadores/cdc_snapshots.py
+"""
+Captura de cambios (CDC) entre dos snapshots consecutivos de Wispro.
+
+Cada export semanal (contratos, clientes, orders) es una foto completa.
+En vez de reprocesar todos los registros, se calcula un hash por fila
+indexado por la llave primaria y se comparan las dos fotos en una sola
+pasada vectorizada:
+
+- insertados : llaves que solo están en el snapshot nuevo
+- eliminados : llaves que solo están en el snapshot anterior
+- cambios    : una fila por (llave, campo) que cambió, con antes/después
+               p. ej. ID CONTRATO 32 · ESTADO · Habilitado → Deshabilitado
+
+Con eso las suspensiones, cambios de plan y de dirección para los
+informes semanal y mensual salen en O(n).
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.catalogo_entradas import obtener_catalogo
+from procesadores.lector_csv import leer_csv
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN POR TIPO DE EXPORT
+# ------------------------------------------------------------------
+RUTA_ENTRADA = Path("datos/entrada/wispro")
+
+LLAVES = {
+    "contratos": "ID CONTRATO",
+    "clientes":  "ID CLIENTE",
+    "orders":    "ID ORDEN",
+}
+
+PATRONES = {
+    "contratos": "wispro_contratos_*.csv",
+    "clientes":  "wispro_clientes_*.csv",
+    "orders":    "orders_*.csv",
+}
+
+# Campos de contratos que consumen los informes
+CAMPO_ESTADO    = "ESTADO"
+CAMPO_PLAN      = "NOMBRE PLAN"
+CAMPO_DIRECCION = "DIRRECIÓN DEL CONTRATO"
+ESTADO_SUSPENDIDO = "Deshabilitado"
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: PREPARACIÓN Y HASH POR FILA
+# ------------------------------------------------------------------
+def preparar_snapshot(df: pd.DataFrame, llave: str, columnas: list) -> pd.DataFrame:
+    """
+    Texto sin espacios, vacíos como "" e índice por la llave primaria.
+    Si la llave se repite se conserva la última fila (igual que el
+    drop_duplicates del reporte de facturación).
+    """
+    if llave not in df.columns:
+        raise KeyError(f"El snapshot no tiene la llave primaria '{llave}'")
+
+    df = df[[llave] + columnas].astype("string").fillna("")
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+
+    df = df[df[llave] != ""]
+    duplicadas = df[llave].duplicated(keep="last")
+    if duplicadas.any():
+        logger.warning(f"CDC: {int(duplicadas.sum())} filas con {llave} repetido, se usa la última")
+        df = df[~duplicadas]
+
+    return df.set_index(llave)
+
+
+def hash_filas(df: pd.DataFrame) -> pd.Series:
+    """Hash uint64 del contenido de cada fila (sin el índice)."""
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: COMPARACIÓN DE SNAPSHOTS
+# ------------------------------------------------------------------
+def comparar_snapshots(
+    df_anterior: pd.DataFrame,
+    df_actual: pd.DataFrame,
+    llave: str,
+    columnas: list = None,
+) -> dict:
+    """
+    Compara dos fotos del mismo export por llave primaria.
+
+    columnas: campos a comparar. Por defecto, las columnas presentes en
+    ambos snapshots (Wispro agrega columnas entre versiones).
+
+    Retorna:
+        {
+          "insertados": DataFrame (filas del snapshot actual),
+          "eliminados": DataFrame (filas del snapshot anterior),
+          "cambios":    DataFrame [llave, "CAMPO", "ANTES", "DESPUÉS"],
+        }
+    """
+    if columnas is None:
+        columnas = [c for c in df_actual.columns if c in set(df_anterior.columns) and c != llave]
+
+    anterior = preparar_snapshot(df_anterior, llave, columnas)
+    actual   = preparar_snapshot(df_actual, llave, columnas)
+
+    solo_actual   = actual.index.difference(anterior.index, sort=False)
+    solo_anterior = anterior.index.difference(actual.index, sort=False)
+    comunes       = actual.index.intersection(anterior.index, sort=False)
+
+    # Hash por fila: solo las llaves con hash distinto se comparan campo a campo
+    a = anterior.loc[comunes]
+    b = actual.loc[comunes]
+    distintas = hash_filas(a).to_numpy() != hash_filas(b).to_numpy()
+    a = a[distintas]
+    b = b[distintas]
+
+    difiere = a.ne(b).stack()
+    difiere = difiere[difiere]
+    cambios = pd.DataFrame({
+        "ANTES":   a.stack().loc[difiere.index],
+        "DESPUÉS": b.stack().loc[difiere.index],
+    }, index=difiere.index)
+    cambios.index.names = [llave, "CAMPO"]
+    cambios = cambios.reset_index()
+
+    resultado = {
+        "insertados": actual.loc[solo_actual].reset_index(),
+        "eliminados": anterior.loc[solo_anterior].reset_index(),
+        "cambios":    cambios,
+    }
+
+    logger.info(
+        f"CDC por {llave}: {len(resultado['insertados'])} insertados | "
+        f"{len(resultado['eliminados'])} eliminados | "
+        f"{int(distintas.sum())} modificados ({len(cambios)} campos)"
+    )
+    return resultado
+
+
+def comparar_archivos(ruta_anterior: Path, ruta_actual: Path, tipo: str, columnas: list = None) -> dict:
+    """CDC entre dos archivos del mismo tipo ("contratos", "clientes", "orders")."""
+    if tipo not in LLAVES:
+        raise ValueError(f"Tipo de export desconocido: {tipo}. Opciones: {list(LLAVES)}")
+
+    logger.info(f"CDC {tipo}: {Path(ruta_anterior).name} → {Path(ruta_actual).name}")
+    df_anterior = leer_csv(ruta_anterior, dtype=str)
+    df_actual   = leer_csv(ruta_actual, dtype=str)
+    return comparar_snapshots(df_anterior, df_actual, LLAVES[tipo], columnas)
+
+
+def comparar_ultimos(tipo: str, ruta_entrada: Path = RUTA_ENTRADA, columnas: list = None) -> dict:
+    """CDC entre los dos snapshots más recientes de un tipo (según el catálogo)."""
+    catalogo = obtener_catalogo(ruta_entrada)
+    archivos = [catalogo.ruta(e) for e in catalogo.archivos(tipo)]
+    if len(archivos) < 2:
+        raise FileNotFoundError(
+            f"Se necesitan al menos dos snapshots con patrón {PATRONES[tipo]} en {ruta_entrada}"
+        )
+    return comparar_archivos(archivos[-2], archivos[-1], tipo, columnas)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 4: CONSULTAS PARA LOS INFORMES
+# ------------------------------------------------------------------
+def cambios_de_campo(resultado: dict, campo: str, antes: str = None, despues: str = None) -> pd.DataFrame:
+    """
+    Filtra los cambios de un campo; antes/despues opcionales, sin
+    distinguir mayúsculas (p. ej. ESTADO, despues="Deshabilitado").
+    """
+    cambios = resultado["cambios"]
+    mascara = cambios["CAMPO"] == campo
+    if antes is not None:
+        mascara &= cambios["ANTES"].str.lower() == antes.lower()
+    if despues is not None:
+        mascara &= cambios["DESPUÉS"].str.lower() == despues.lower()
+    return cambios[mascara].reset_index(drop=True)
+
+
+def suspensiones(resultado: dict) -> pd.DataFrame:
+    """Contratos que pasaron a Deshabilitado entre los dos snapshots."""
+    return cambios_de_campo(resultado, CAMPO_ESTADO, despues=ESTADO_SUSPENDIDO)
+
+
+def cambios_de_plan(resultado: dict) -> pd.DataFrame:
+    return cambios_de_campo(resultado, CAMPO_PLAN)
+
+
+def cambios_de_direccion(resultado: dict) -> pd.DataFrame:
+    return cambios_de_campo(resultado, CAMPO_DIRECCION)
@@ -0,0 +1,144 @@
+# procesadores/columnas.py
+"""
+Resolución de columnas por alias sobre encabezados de Wispro.
+
+Cada etapa declara las columnas canónicas que necesita junto con sus
+alias (mismo criterio que _asegurar_columna_canonica en facturación).
+El lector de CSV resuelve esos alias contra el encabezado del archivo
+y parsea SOLO las columnas encontradas.
+
+Todo se memoriza: cada nombre (alias o columna) se normaliza una sola vez
+por proceso y la resolución se guarda por firma de encabezado (la tupla
+de columnas) y juego de alias. Los cambios de esquema entre versiones de
+un mismo export (columnas nuevas o desaparecidas) se registran una vez
+por archivo, no en cada búsqueda.
+"""
+
+import logging
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: NORMALIZACIÓN DE NOMBRES
+# ------------------------------------------------------------------
+_NO_ALFANUMERICO = re.compile(r"[^A-Z0-9]+")
+_ESPACIOS        = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=None)
+def normalizar_nombre_columna(valor) -> str:
+    """
+    Convierte un nombre de columna a texto comparable:
+    sin tildes, en mayúsculas, sin caracteres especiales y con
+    espacios compactados. 'TELÉFONO_cliente' → 'TELEFONO CLIENTE'.
+    """
+    if valor is None:
+        return ""
+
+    texto = str(valor).strip()
+    if not texto:
+        return ""
+
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = texto.encode("ascii", "ignore").decode("ascii")
+    texto = texto.upper()
+    texto = _NO_ALFANUMERICO.sub(" ", texto)
+    texto = _ESPACIOS.sub(" ", texto).strip()
+    return texto
+
+
+def compilar_alias(aliases) -> tuple:
+    """Alias normalizados, sin repetidos y en el orden declarado."""
+    return tuple(dict.fromkeys(normalizar_nombre_columna(alias) for alias in aliases))
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: RESOLUCIÓN CONTRA EL ENCABEZADO (MEMORIZADA)
+# ------------------------------------------------------------------
+@lru_cache(maxsize=256)
+def mapa_encabezado(encabezado: tuple) -> dict:
+    """{nombre_normalizado: columna_real}; ante duplicados gana la primera."""
+    mapa = {}
+    for col in encabezado:
+        mapa.setdefault(normalizar_nombre_columna(col), col)
+    return mapa
+
+
+@lru_cache(maxsize=1024)
+def resolver_alias(encabezado: tuple, aliases: tuple):
+    """Primera columna real que coincide con algún alias, o None."""
+    mapa = mapa_encabezado(encabezado)
+    for alias_norm in compilar_alias(aliases):
+        if alias_norm in mapa:
+            return mapa[alias_norm]
+    return None
+
+
+@lru_cache(maxsize=256)
+def _resolver_compiladas(encabezado: tuple, columnas: tuple) -> tuple:
+    resueltas = []
+    faltantes = []
+    for canonica, aliases in columnas:
+        col_real = resolver_alias(encabezado, aliases)
+        if col_real is None:
+            faltantes.append(canonica)
+        else:
+            resueltas.append((canonica, col_real))
+
+    if faltantes:
+        logger.info(f"Columnas declaradas sin coincidencia en el archivo: {faltantes}")
+
+    return tuple(resueltas)
+
+
+def resolver_columnas(encabezado: list, columnas: dict) -> dict:
+    """
+    Recibe el encabezado real del archivo y un dict
+    {nombre_canonico: [alias, ...]}.
+    Retorna {nombre_canonico: columna_real} solo para las columnas
+    encontradas; para cada canónica gana el primer alias presente.
+    Misma firma de encabezado + mismos alias → resultado memorizado.
+    """
+    firma = tuple((canonica, tuple(aliases)) for canonica, aliases in columnas.items())
+    return dict(_resolver_compiladas(tuple(encabezado), firma))
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: CAMBIOS DE ESQUEMA ENTRE VERSIONES DE UN EXPORT
+# ------------------------------------------------------------------
+_PATRON_FECHA_NOMBRE = re.compile(r"[_-]?\d{4}-?\d{2}-?\d{2}")
+_ULTIMO_ENCABEZADO: dict = {}
+_LOCK_ENCABEZADOS = threading.Lock()
+
+
+def registrar_encabezado(nombre_archivo: str, encabezado: list):
+    """
+    Compara el encabezado con el último visto para el mismo tipo de
+    export (nombre sin fecha) y registra columnas nuevas o desaparecidas.
+    Se llama una vez por versión de archivo (ver detectar_formato).
+    """
+    tipo   = _PATRON_FECHA_NOMBRE.sub("", Path(nombre_archivo).stem)
+    actual = tuple(encabezado)
+
+    with _LOCK_ENCABEZADOS:
+        anterior = _ULTIMO_ENCABEZADO.get(tipo)
+        _ULTIMO_ENCABEZADO[tipo] = actual
+
+    if anterior is None or anterior == actual:
+        return
+
+    previas, vigentes = set(anterior), set(actual)
+    nuevas        = [c for c in actual if c not in previas]
+    desaparecidas = [c for c in anterior if c not in vigentes]
+    if nuevas or desaparecidas:
+        logger.info(
+            f"Cambio de esquema en {nombre_archivo}: "
+            f"nuevas={nuevas} | desaparecidas={desaparecidas}"
+        )
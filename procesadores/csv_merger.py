@@ -8,8 +8,21 @@ Genera el modelo de datos listo para el adaptador y el informe.
 import pandas as pd
 import json
 import logging
+from functools import partial
 from pathlib import Path
-from datetime import datetime
+
+from procesadores.carga_concurrente import cargar_en_paralelo
+from procesadores.catalogo_entradas import obtener_catalogo
+from procesadores.esquemas import (
+    DTYPE_TEXTO,
+    ESQUEMA_CLIENTES,
+    ESQUEMA_CONTRATOS,
+    ESQUEMA_ORDERS,
+    alinear_claves,
+)
+from procesadores.lector_csv import TAMANO_BLOQUE, iterar_csv, leer_csv
+from procesadores.normalizacion import normalizar_cedulas, normalizar_telefonos, texto_valido
+from procesadores.reloj import ahora, fecha_de_corte
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,17 +37,75 @@ class CsvMerger:
     4. Devolver lista limpia lista para el pipeline
     """
 
+    # ------------------------------------------------------------------
+    # COLUMNAS QUE CONSUME ESTA ETAPA {canónica: [alias]}
+    # Solo estas se leen del CSV. Los nombres canónicos son los de Wispro,
+    # así los sufijos _order/_contrato/_cliente del JOIN no cambian.
+    # ------------------------------------------------------------------
+    COLUMNAS_ORDERS = {
+        "ID CLIENTE":                  ["ID CLIENTE", "ID_CLIENTE"],
+        "ID CONTRATO":                 ["ID CONTRATO", "ID_CONTRATO"],
+        "ID PERSONALIZABLE":           ["ID PERSONALIZABLE"],
+        "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE": [
+            "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE",
+            "DOCUMENTO O CEDULA DE IDENTIDAD CLIENTE",
+        ],
+        "NOMBRE CLIENTE":              ["NOMBRE CLIENTE"],
+        "TIPO":                        ["TIPO"],
+        "ESTADO":                      ["ESTADO"],
+        "RESULTADO":                   ["RESULTADO"],
+        "LATITUD (CONTRATO)":          ["LATITUD (CONTRATO)"],
+        "LONGITUD (CONTRATO)":         ["LONGITUD (CONTRATO)"],
+        "DIRECCIÓN (CONTRATO)":        ["DIRECCIÓN (CONTRATO)"],
+        "NOMBRE PLAN":                 ["NOMBRE PLAN"],
+        "FINALIZADA EL":               ["FINALIZADA EL"],
+    }
+
+    COLUMNAS_CONTRATOS = {
+        "ID CONTRATO":                 ["ID CONTRATO", "ID_CONTRATO"],
+        "ID CLIENTE":                  ["ID CLIENTE", "ID_CLIENTE"],
+        "IDENTIFICADOR NACIONAL":      ["IDENTIFICADOR NACIONAL", "DOCUMENTO/CÉDULA"],
+        "NOMBRE CLIENTE":              ["NOMBRE CLIENTE"],
+        "EMAIL":                       ["EMAIL"],
+        "TELÉFONOS":                   ["TELÉFONOS"],
+        "ESTADO":                      ["ESTADO", "ESTADO DEL CONTRATO"],
+        "MAC-ADDRESS":                 ["MAC-ADDRESS", "MAC ADDRESS"],
+        "NOMBRE PLAN":                 ["NOMBRE PLAN", "PLAN"],
+        "USUARIO PPPOE":               ["USUARIO PPPOE"],
+        "DIRRECIÓN DEL CONTRATO":      ["DIRRECIÓN DEL CONTRATO", "DIRECCIÓN DEL CONTRATO"],
+        "ESTRATO SOCIAL":              ["ESTRATO SOCIAL", "ESTRATO"],
+    }
+
+    COLUMNAS_CLIENTES = {
+        "ID CLIENTE":                  ["ID CLIENTE", "ID_CLIENTE"],
+        "DOCUMENTO/CÉDULA":            ["DOCUMENTO/CÉDULA", "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"],
+        "NOMBRE":                      ["NOMBRE", "NOMBRE COMPLETO"],
+        "EMAIL":                       ["EMAIL"],
+        "TELÉFONO":                    ["TELÉFONO"],
+        "TELÉFONO CELULAR":            ["TELÉFONO CELULAR"],
+        "BARRIO":                      ["BARRIO"],
+        "ZONA":                        ["ZONA"],
+        "DATO ADICIONAL":              ["DATO ADICIONAL"],
+    }
+
+    # Predicados aplicados MIENTRAS se lee orders (ver _filtrar_exitosas)
+    FILTROS_ORDERS = [
+        ("TIPO",      "en", ["Instalación"]),
+        ("ESTADO",    "en", ["Cerrado"]),
+        ("RESULTADO", "en", ["Exitosa"]),
+    ]
+
     # ------------------------------------------------------------------
     # BLOQUE 1: INICIALIZACIÓN Y RUTAS
     # ------------------------------------------------------------------
-    def __init__(self, config_path="config/entorno.yaml"):
+    def __init__(self, config_path="config/entorno.yaml", ruta_registro=None):
         import yaml
         with open(config_path, "r", encoding="utf-8") as f:
             config = yaml.safe_load(f)
 
         self.ruta_entrada = Path("datos/entrada/wispro")
         self.ruta_procesados = Path("datos/procesados/modelo_contrato")
-        self.ruta_registro = self.ruta_procesados / "registro_procesados.json"
+        self.ruta_registro = Path(ruta_registro or self.ruta_procesados / "registro_procesados.json")
 
         # Crear carpetas si no existen
         self.ruta_procesados.mkdir(parents=True, exist_ok=True)
@@ -42,11 +113,25 @@ class CsvMerger:
     # ------------------------------------------------------------------
     # BLOQUE 2: CARGA DE ARCHIVOS CSV
     # ------------------------------------------------------------------
-    def _cargar_csvs(self, archivo_clientes: str, archivo_contratos: str, archivo_orders: str):
+    def lecturas(
+        self,
+        archivo_clientes:  str  = None,
+        archivo_contratos: str  = None,
+        archivo_orders:    str  = None,
+        incluir_orders:    bool = True,
+    ) -> dict:
         """
-        Carga los tres CSVs exportados desde Wispro.
-        Soporta separador ; o , detectándolo automáticamente.
+        Lecturas que necesita esta etapa, para procesadores/carga_concurrente.py.
+        Claves: "semanal/clientes", "semanal/contratos" y "semanal/orders".
+        Sin nombre de archivo se toma el más reciente de cada tipo.
+        Solo se parsean las columnas declaradas en COLUMNAS_*, con los
+        tipos del esquema declarado (procesadores/esquemas.py).
+        Orders se lee por bloques aplicando FILTROS_ORDERS: solo las
+        instalaciones exitosas llegan a memoria.
         """
+        archivo_clientes, archivo_contratos, archivo_orders = self._detectar_archivos(
+            archivo_clientes, archivo_contratos, archivo_orders
+        )
         ruta_cli = self.ruta_entrada / archivo_clientes
         ruta_con = self.ruta_entrada / archivo_contratos
         ruta_ord = self.ruta_entrada / archivo_orders
@@ -58,13 +143,67 @@ class CsvMerger:
         if not ruta_ord.exists():
             raise FileNotFoundError(f"No encontrado: {ruta_ord}")
 
-        df_clientes  = pd.read_csv(ruta_cli, sep=None, engine="python", encoding="utf-8")
-        df_contratos = pd.read_csv(ruta_con, sep=None, engine="python", encoding="utf-8")
-        df_orders    = pd.read_csv(ruta_ord, sep=None, engine="python", encoding="utf-8")
+        lecturas = {
+            "semanal/clientes": partial(
+                leer_csv, ruta_cli, columnas=self.COLUMNAS_CLIENTES, esquema=ESQUEMA_CLIENTES
+            ),
+            "semanal/contratos": partial(
+                leer_csv, ruta_con, columnas=self.COLUMNAS_CONTRATOS, esquema=ESQUEMA_CONTRATOS
+            ),
+        }
+        if incluir_orders:
+            lecturas["semanal/orders"] = partial(
+                leer_csv,
+                ruta_ord,
+                columnas=self.COLUMNAS_ORDERS,
+                filtros=self.FILTROS_ORDERS,
+                esquema=ESQUEMA_ORDERS,
+            )
+        return lecturas
+
+    def _detectar_archivos(self, archivo_clientes: str, archivo_contratos: str, archivo_orders: str) -> tuple:
+        """
+        Completa los nombres no indicados con el export más reciente
+        de cada tipo según el catálogo (procesadores/catalogo_entradas.py),
+        a la fecha de corte del reloj (procesadores/reloj.py).
+        """
+        catalogo = obtener_catalogo(self.ruta_entrada)
+
+        def detectar(tipo):
+            nombre = catalogo.ultimo(tipo, al=fecha_de_corte()).name
+            logger.info(f"Archivo detectado automáticamente: {nombre}")
+            return nombre
+
+        if archivo_clientes  is None:
+            archivo_clientes  = detectar("clientes")
+        if archivo_contratos is None:
+            archivo_contratos = detectar("contratos")
+        if archivo_orders    is None:
+            archivo_orders    = detectar("orders")
+
+        return archivo_clientes, archivo_contratos, archivo_orders
+
+    def _cargar_csvs(self, archivo_clientes: str, archivo_contratos: str, archivo_orders: str):
+        """
+        Carga los tres CSVs exportados desde Wispro, los tres a la vez
+        (ver lecturas() y procesadores/carga_concurrente.py).
+        Soporta separador ; o , detectándolo automáticamente
+        (sobre una muestra inicial, ver procesadores/lector_csv.py).
+        """
+        entradas = cargar_en_paralelo(
+            self.lecturas(archivo_clientes, archivo_contratos, archivo_orders)
+        )
+        return self._tomar_entradas(entradas)
+
+    def _tomar_entradas(self, entradas: dict) -> tuple:
+        """Toma los DataFrames de esta etapa del paquete de entradas."""
+        df_clientes  = entradas["semanal/clientes"]
+        df_contratos = entradas["semanal/contratos"]
+        df_orders    = entradas["semanal/orders"]
 
         logger.info(f"Clientes cargados:  {len(df_clientes)} registros")
         logger.info(f"Contratos cargados: {len(df_contratos)} registros")
-        logger.info(f"Orders cargadas:    {len(df_orders)} registros")
+        logger.info(f"Orders cargadas:    {len(df_orders)} registros (ya filtradas)")
 
         return df_clientes, df_contratos, df_orders
 
@@ -77,29 +216,44 @@ class CsvMerger:
         Normaliza columnas, limpia espacios y unifica tipos
         para garantizar los JOINs correctos entre los tres DataFrames.
         """
-        for df in [df_clientes, df_contratos, df_orders]:
+        df_clientes, df_contratos = self._normalizar_dimensiones(df_clientes, df_contratos)
+        df_orders = self._normalizar_orders(df_orders)
+
+        # --- LLAVES DE JOIN ---
+        # Int64 en los tres DataFrames (esquema declarado); si algún export
+        # trae IDs no numéricos, las tres columnas pasan a texto.
+        alinear_claves([df_clientes, df_contratos, df_orders], "ID CLIENTE")
+        alinear_claves([df_contratos, df_orders], "ID CONTRATO")
+
+        return df_clientes, df_contratos, df_orders
+
+    def _normalizar_dimensiones(self, df_clientes: pd.DataFrame, df_contratos: pd.DataFrame):
+        for df in [df_clientes, df_contratos]:
             df.columns = df.columns.str.strip()
 
         # --- CONTRATOS ---
         df_contratos = df_contratos.rename(columns={
             "IDENTIFICADOR NACIONAL": "DOCUMENTO/CÉDULA"
         })
-        df_contratos["ID CLIENTE"]       = df_contratos["ID CLIENTE"].astype(str).str.strip()
-        df_contratos["ID CONTRATO"]      = df_contratos["ID CONTRATO"].astype(str).str.strip()
-        df_contratos["DOCUMENTO/CÉDULA"] = df_contratos["DOCUMENTO/CÉDULA"].astype(str).str.strip()
+        df_contratos["DOCUMENTO/CÉDULA"] = self._cedulas(df_contratos["DOCUMENTO/CÉDULA"])
 
         # --- CLIENTES ---
-        df_clientes["ID CLIENTE"]        = df_clientes["ID CLIENTE"].astype(str).str.strip()
-        df_clientes["DOCUMENTO/CÉDULA"]  = df_clientes["DOCUMENTO/CÉDULA"].astype(str).str.strip()
-
-        # --- ORDERS ---
-        df_orders["ID CLIENTE"]   = df_orders["ID CLIENTE"].astype(str).str.strip()
-        df_orders["ID CONTRATO"]  = df_orders["ID CONTRATO"].astype(str).str.strip()
-        df_orders["DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"] = (
-            df_orders["DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"].astype(str).str.strip()
+        df_clientes["DOCUMENTO/CÉDULA"]  = self._cedulas(df_clientes["DOCUMENTO/CÉDULA"])
+
+        return df_clientes, df_contratos
+
+    def _normalizar_orders(self, df_orders: pd.DataFrame) -> pd.DataFrame:
+        df_orders.columns = df_orders.columns.str.strip()
+
+        df_orders["DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"] = self._cedulas(
+            df_orders["DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"]
         )
+        return df_orders
 
-        return df_clientes, df_contratos, df_orders
+    def _cedulas(self, serie: pd.Series) -> pd.Series:
+        """Cédula normalizada (normalizar_cedulas); los faltantes siguen como NaN."""
+        cedulas = normalizar_cedulas(serie)
+        return cedulas.where(cedulas != "").astype(DTYPE_TEXTO)
 
     # ------------------------------------------------------------------
     # BLOQUE 3.5: FILTRO DE ÓRDENES EXITOSAS
@@ -109,6 +263,8 @@ class CsvMerger:
         Fuente de verdad: solo instalaciones con
         TIPO=Instalación, ESTADO=Cerrado, RESULTADO=Exitosa.
         Estas son las 23 instalaciones reales del período.
+        El mismo criterio ya se aplicó en la lectura (FILTROS_ORDERS);
+        aquí se mantiene como garantía si orders llega por otra vía.
         """
         mask = (
             (df_orders["TIPO"].str.strip().str.lower()      == "instalación") &
@@ -157,22 +313,113 @@ class CsvMerger:
 
         df_merged = df_merged.drop(columns=["_id_cliente_join"])
 
-        logger.info(f"Columnas disponibles post-merge: {list(df_merged.columns)}")
-        logger.info(f"Registros fusionados: {len(df_merged)}")
+        logger.debug(f"Columnas disponibles post-merge: {list(df_merged.columns)}")
+        logger.info(
+            f"Registros fusionados: {len(df_merged)} "
+            f"({len(df_merged.columns)} columnas)"
+        )
         return df_merged
 
+    # ------------------------------------------------------------------
+    # BLOQUE 4.5: JOIN POR BLOQUES (EXPORTS QUE NO CABEN EN MEMORIA)
+    # Contratos y clientes (dimensiones) quedan indexados por su llave;
+    # orders (tabla de hechos) se lee en bloques de tamaño fijo y cada
+    # bloque se une contra los índices y pasa a la siguiente etapa.
+    # Mismas columnas y sufijos que _fusionar.
+    # ------------------------------------------------------------------
+    def _indexar_dimensiones(self, df_clientes: pd.DataFrame, df_contratos: pd.DataFrame) -> tuple:
+        """
+        Índices hash de las dimensiones:
+        - contratos por ID CONTRATO (la llave no se repite en el resultado)
+        - clientes  por ID CLIENTE  (la llave se conserva como columna,
+          igual que en el JOIN 2 de _fusionar)
+        """
+        indice_contratos = df_contratos.set_index("ID CONTRATO")
+        indice_clientes  = df_clientes.set_index("ID CLIENTE", drop=False)
+        return indice_contratos, indice_clientes
 
+    def _unir_bloque(
+        self,
+        df_bloque: pd.DataFrame,
+        indice_contratos: pd.DataFrame,
+        indice_clientes: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """JOIN 1 y JOIN 2 de _fusionar sobre un bloque de orders."""
+        df_step1 = df_bloque.join(
+            indice_contratos,
+            on="ID CONTRATO",
+            how="left",
+            lsuffix="_order",
+            rsuffix="_contrato",
+        )
+        df_step1["_id_cliente_join"] = df_step1["ID CLIENTE_order"]
+
+        df_unido = df_step1.join(
+            indice_clientes,
+            on="_id_cliente_join",
+            how="left",
+            rsuffix="_cliente",
+        )
+        return df_unido.drop(columns=["_id_cliente_join"])
+
+    def _alinear_con_indice(self, df_bloque: pd.DataFrame, indice: pd.DataFrame, columna: str):
+        """
+        Misma regla que alinear_claves entre un bloque y un índice ya
+        construido: si alguno de los dos no es entero, ambos pasan a texto.
+        El índice se convierte una sola vez y queda así para los bloques
+        siguientes.
+        """
+        if pd.api.types.is_integer_dtype(indice.index) and \
+                pd.api.types.is_integer_dtype(df_bloque[columna]):
+            return
+
+        df_bloque[columna] = df_bloque[columna].astype(DTYPE_TEXTO).str.strip()
+        if pd.api.types.is_integer_dtype(indice.index):
+            indice.index = indice.index.astype(DTYPE_TEXTO)
+            if columna in indice.columns:
+                indice[columna] = indice[columna].astype(DTYPE_TEXTO)
+
+    def _fusionar_por_bloques(
+        self,
+        df_clientes: pd.DataFrame,
+        df_contratos: pd.DataFrame,
+        ruta_orders: Path,
+        tamano_bloque: int = TAMANO_BLOQUE,
+    ):
+        """
+        Genera bloques ya fusionados. En memoria solo quedan las dos
+        dimensiones indexadas y un bloque de orders a la vez.
+        """
+        alinear_claves([df_clientes, df_contratos], "ID CLIENTE")
+        indice_contratos, indice_clientes = self._indexar_dimensiones(df_clientes, df_contratos)
+
+        bloques = iterar_csv(
+            ruta_orders,
+            columnas=self.COLUMNAS_ORDERS,
+            filtros=self.FILTROS_ORDERS,
+            esquema=ESQUEMA_ORDERS,
+            tamano_bloque=tamano_bloque,
+        )
+        for df_bloque in bloques:
+            df_bloque = self._normalizar_orders(self._filtrar_exitosas(df_bloque))
+
+            self._alinear_con_indice(df_bloque, indice_contratos, "ID CONTRATO")
+            self._alinear_con_indice(df_bloque, indice_clientes, "ID CLIENTE")
+
+            yield self._unir_bloque(df_bloque, indice_contratos, indice_clientes)
 
 
     # ------------------------------------------------------------------
     # BLOQUE 5: DETECCIÓN DE REGISTROS NUEVOS
     # ------------------------------------------------------------------
-    def _filtrar_nuevos(self, df_merged: pd.DataFrame):
+    def _filtrar_nuevos(self, df_merged: pd.DataFrame, cedulas_procesadas: set = None):
         """
         Compara contra registro_procesados.json.
         Llave única: cédula del CSV de órdenes.
+        En modo por bloques el registro se carga una vez y se recibe aquí.
         """
-        cedulas_procesadas = self._cargar_registro()
+        if cedulas_procesadas is None:
+            cedulas_procesadas = self._cargar_registro()
 
         col_cedula = "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"
         mascara_nuevos = ~df_merged[col_cedula].isin(cedulas_procesadas)
@@ -191,7 +438,9 @@ class CsvMerger:
     # ------------------------------------------------------------------
     def _cargar_registro(self) -> set:
         """
-        Carga el set de cédulas ya procesadas.
+        Carga el set de cédulas ya procesadas, normalizadas igual que las
+        de las órdenes: los registros anteriores guardaban el texto tal
+        cual ("1085896121.0", "1.085.896.121").
         Si no existe el archivo, retorna set vacío (primera ejecución).
         """
         if not self.ruta_registro.exists():
@@ -201,7 +450,8 @@ class CsvMerger:
         with open(self.ruta_registro, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        return set(data.get("cedulas_procesadas", []))
+        cedulas = normalizar_cedulas(pd.Series(data.get("cedulas_procesadas", []), dtype=object))
+        return set(cedulas[cedulas != ""])
 
     def _actualizar_registro(self, df_nuevos: pd.DataFrame):
         """
@@ -212,7 +462,7 @@ class CsvMerger:
         cedulas_actuales = self._cargar_registro()
 
         col_cedula      = "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"
-        cedulas_nuevas  = set(df_nuevos[col_cedula].astype(str).tolist())
+        cedulas_nuevas  = set(df_nuevos[col_cedula].dropna().astype(str).tolist())
         cedulas_totales = cedulas_actuales | cedulas_nuevas
 
         # Leer el JSON completo para no perder claves como seriales_cpe
@@ -223,7 +473,7 @@ class CsvMerger:
 
         # Actualizar solo las claves propias del merger
         data["cedulas_procesadas"]   = sorted(list(cedulas_totales))
-        data["ultima_actualizacion"] = datetime.now().isoformat()
+        data["ultima_actualizacion"] = ahora().isoformat()
         data["total_procesados"]     = len(cedulas_totales)
 
         with open(self.ruta_registro, "w", encoding="utf-8") as f:
@@ -236,33 +486,26 @@ class CsvMerger:
 
 
     # ------------------------------------------------------------------
-    # BLOQUE 6.5: HELPER — LIMPIEZA DE TELÉFONOS
+    # BLOQUE 6.5: HELPERS VECTORIZADOS — COALESCE
+    # (texto, teléfonos y cédulas: procesadores/normalizacion.py)
     # ------------------------------------------------------------------
-    def _limpiar_telefono(self, valor) -> str:
+    def _coalescer(self, df: pd.DataFrame, *cols) -> pd.Series:
         """
-        Normaliza teléfonos colombianos:
-        573152158424.0  →  3152158424
-        57 315 215 8424 →  3152158424
-        3152158424.0    →  3152158424
+        Primer valor no vacío entre varias columnas, fila a fila,
+        evaluado columna por columna (sin iterar filas).
+        Las columnas que no existen en el DataFrame se ignoran.
         """
-        if not valor or str(valor).strip() in ("", "nan", "None"):
-            return ""
+        resultado = pd.Series("", index=df.index, dtype=object)
 
-        tel = str(valor).strip()
-
-        # Quitar .0 si viene como float de pandas
-        if tel.endswith(".0"):
-            tel = tel[:-2]
-
-        # Quitar espacios, guiones y paréntesis
-        tel = tel.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-
-        # Quitar prefijo 57 solo si el resultado tiene 12 dígitos (57 + 10)
-        if tel.startswith("57") and len(tel) == 12 and tel.isdigit():
-            tel = tel[2:]
-
-        return tel
+        for col in cols:
+            if col not in df.columns:
+                continue
+            pendientes = resultado == ""
+            if not pendientes.any():
+                break
+            resultado = resultado.where(~pendientes, texto_valido(df[col]))
 
+        return resultado.astype(object)
 
     # ------------------------------------------------------------------
     # BLOQUE 7: CONVERSIÓN AL MODELO DEL PIPELINE
@@ -271,6 +514,8 @@ class CsvMerger:
         """
         Convierte el DataFrame fusionado al formato de lista de dicts
         que consume generadores/informe_semanal.py.
+        Cada campo se resuelve para todas las filas a la vez: primer
+        valor no vacío entre las columnas candidatas (_coalescer).
 
         Fuentes por campo:
         - fecha_instalacion  : FINALIZADA EL              (orders)
@@ -281,89 +526,74 @@ class CsvMerger:
         - telefono/celular   : TELÉFONO/TELÉFONO CELULAR   (clientes)
                                TELÉFONOS como fallback     (contratos)
         """
-        logger.info(f"Columnas disponibles post-merge: {list(df_nuevos.columns)}")
-
-        registros = []
-
-        for _, row in df_nuevos.iterrows():
-
-            def get_val(*cols):
-                for col in cols:
-                    val = row.get(col, "")
-                    if val and str(val).strip() not in ("", "nan", "None"):
-                        return str(val).strip()
-                return ""
-
-            # --------------------------------------------------
-            # FECHA DE INSTALACIÓN — desde FINALIZADA EL (orders)
-            # Limpiar timezone: "2026-02-24 17:40:43 -0500" → "2026-02-24 17:40:43"
-            # --------------------------------------------------
-            fecha_raw = get_val("FINALIZADA EL")
-            if " -0500" in fecha_raw:
-                fecha_raw = fecha_raw.replace(" -0500", "").strip()
-
-            # --------------------------------------------------
-            # TELÉFONOS — limpiar prefijo 57 y sufijo .0
-            # Prioridad: campos individuales de clientes,
-            # fallback TELÉFONOS de contratos
-            # --------------------------------------------------
-            telefono = self._limpiar_telefono(
-                get_val("TELÉFONO", "TELÉFONOS")
-            )
-            celular = self._limpiar_telefono(
-                get_val("TELÉFONO CELULAR", "TELÉFONOS")
-            )
-            if not telefono and celular:
-                telefono = celular
-            if not celular and telefono:
-                celular = telefono
-
-            registro = {
-                # ------ IDENTIFICACIÓN ------
-                "id_cliente_wispro":     get_val("ID CLIENTE_order"),
-                "id_contrato_wispro":    get_val("ID CONTRATO"),
-                "id_personalizable":     get_val("ID PERSONALIZABLE_order",
-                                                  "USUARIO PPPOE"),
-                "documento":             get_val("DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"),
-
-                # ------ DATOS PERSONALES ------
-                "nombre_completo":       get_val("NOMBRE CLIENTE_order",
-                                                  "NOMBRE CLIENTE_contrato",
-                                                  "NOMBRE"),
-                "email":                 get_val("EMAIL_cliente", "EMAIL"),
-                "telefono":              telefono,
-                "celular":               celular,
-
-                # ------ UBICACIÓN ------
-                "direccion":             get_val("DIRECCIÓN (CONTRATO)",
-                                                  "DIRRECIÓN DEL CONTRATO"),
-                "complemento_direccion": get_val("DATO ADICIONAL"),
-                "barrio":                get_val("BARRIO"),
-                "zona":                  get_val("ZONA"),
-                "municipio":             "Ipiales",
-                "departamento":          "Nariño",
-                "latitud":               get_val("LATITUD (CONTRATO)",
-                                                  "LATITUD_contrato"),
-                "longitud":              get_val("LONGITUD (CONTRATO)",
-                                                  "LONGITUD_contrato"),
-
-                # ------ SERVICIO ------
-                "fecha_instalacion":     fecha_raw,
-                "estado_servicio":       get_val("ESTADO_contrato"),
-                "mac_address":           get_val("MAC-ADDRESS"),
-                "plan":                  get_val("NOMBRE PLAN_order",
-                                                  "NOMBRE PLAN_contrato"),
-
-                # ------ PENDIENTES ------
-                "estrato":               get_val("ESTRATO SOCIAL") or "PENDIENTE",
-                "serial_cpe":            "PENDIENTE_SCRAPING",
-
-                # ------ PARA EL INFORME MENSUAL ------
-                "fecha_finalizacion":    "",
-                "causa_suspension":      "",
-            }
-
-            registros.append(registro)
+        logger.debug(f"Columnas disponibles post-merge: {list(df_nuevos.columns)}")
+
+        val = lambda *cols: self._coalescer(df_nuevos, *cols)
+
+        # --------------------------------------------------
+        # FECHA DE INSTALACIÓN — desde FINALIZADA EL (orders)
+        # Limpiar timezone: "2026-02-24 17:40:43 -0500" → "2026-02-24 17:40:43"
+        # --------------------------------------------------
+        fecha_raw = val("FINALIZADA EL").str.replace(" -0500", "", regex=False).str.strip()
+
+        # --------------------------------------------------
+        # TELÉFONOS — limpiar prefijo 57 y sufijo .0
+        # Prioridad: campos individuales de clientes,
+        # fallback TELÉFONOS de contratos
+        # --------------------------------------------------
+        telefono = normalizar_telefonos(val("TELÉFONO", "TELÉFONOS"))
+        celular  = normalizar_telefonos(val("TELÉFONO CELULAR", "TELÉFONOS"))
+        telefono = telefono.where((telefono != "") | (celular == ""), celular)
+        celular  = celular.where((celular != "") | (telefono == ""), telefono)
+
+        estrato = val("ESTRATO SOCIAL")
+
+        modelo = pd.DataFrame({
+            # ------ IDENTIFICACIÓN ------
+            "id_cliente_wispro":     val("ID CLIENTE_order"),
+            "id_contrato_wispro":    val("ID CONTRATO"),
+            "id_personalizable":     val("ID PERSONALIZABLE_order",
+                                         "USUARIO PPPOE"),
+            "documento":             val("DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"),
+
+            # ------ DATOS PERSONALES ------
+            "nombre_completo":       val("NOMBRE CLIENTE_order",
+                                         "NOMBRE CLIENTE_contrato",
+                                         "NOMBRE"),
+            "email":                 val("EMAIL_cliente", "EMAIL"),
+            "telefono":              telefono,
+            "celular":               celular,
+
+            # ------ UBICACIÓN ------
+            "direccion":             val("DIRECCIÓN (CONTRATO)",
+                                         "DIRRECIÓN DEL CONTRATO"),
+            "complemento_direccion": val("DATO ADICIONAL"),
+            "barrio":                val("BARRIO"),
+            "zona":                  val("ZONA"),
+            "municipio":             "Ipiales",
+            "departamento":          "Nariño",
+            "latitud":               val("LATITUD (CONTRATO)",
+                                         "LATITUD_contrato"),
+            "longitud":              val("LONGITUD (CONTRATO)",
+                                         "LONGITUD_contrato"),
+
+            # ------ SERVICIO ------
+            "fecha_instalacion":     fecha_raw,
+            "estado_servicio":       val("ESTADO_contrato"),
+            "mac_address":           val("MAC-ADDRESS"),
+            "plan":                  val("NOMBRE PLAN_order",
+                                         "NOMBRE PLAN_contrato"),
+
+            # ------ PENDIENTES ------
+            "estrato":               estrato.where(estrato != "", "PENDIENTE"),
+            "serial_cpe":            "PENDIENTE_SCRAPING",
+
+            # ------ PARA EL INFORME MENSUAL ------
+            "fecha_finalizacion":    "",
+            "causa_suspension":      "",
+        }, index=df_nuevos.index)
+
+        registros = modelo.astype(object).to_dict(orient="records")
 
         logger.info(f"Modelo generado con {len(registros)} registros nuevos")
         return registros
@@ -378,7 +608,10 @@ class CsvMerger:
         archivo_clientes:  str  = None,
         archivo_contratos: str  = None,
         archivo_orders:    str  = None,
-        actualizar_registro: bool = True
+        actualizar_registro: bool = True,
+        por_bloques:       bool = False,
+        tamano_bloque:     int  = TAMANO_BLOQUE,
+        entradas:          dict = None,
     ) -> list:
         """
         Orquesta el proceso completo:
@@ -389,28 +622,27 @@ class CsvMerger:
         5. Filtra solo nuevos (no procesados antes)
         6. Actualiza registro histórico
         7. Retorna lista lista para el generador del informe semanal
-        """
-        def detectar(patron):
-            archivos = sorted(self.ruta_entrada.glob(patron))
-            if not archivos:
-                raise FileNotFoundError(
-                    f"No se encontró ningún archivo con patrón: {patron}"
-                )
-            nombre = archivos[-1].name
-            logger.info(f"Archivo detectado automáticamente: {nombre}")
-            return nombre
 
-        if archivo_clientes  is None:
-            archivo_clientes  = detectar("wispro_clientes_*.csv")
-        if archivo_contratos is None:
-            archivo_contratos = detectar("wispro_contratos_*.csv")
-        if archivo_orders    is None:
-            archivo_orders    = detectar("orders_*.csv")
+        entradas: paquete ya cargado por carga_concurrente (claves de
+        lecturas()); si se indica, no se vuelven a leer los CSVs.
+
+        Con por_bloques=True los pasos 2-5 se hacen sobre bloques de
+        `tamano_bloque` órdenes (ver _procesar_por_bloques): la memoria
+        pico depende del bloque y no del tamaño del export.
+        """
+        if por_bloques:
+            return self._procesar_por_bloques(
+                archivo_clientes, archivo_contratos, archivo_orders,
+                actualizar_registro, tamano_bloque,
+            )
 
         # Pipeline
-        df_clientes, df_contratos, df_orders = self._cargar_csvs(
-            archivo_clientes, archivo_contratos, archivo_orders
-        )
+        if entradas is not None:
+            df_clientes, df_contratos, df_orders = self._tomar_entradas(entradas)
+        else:
+            df_clientes, df_contratos, df_orders = self._cargar_csvs(
+                archivo_clientes, archivo_contratos, archivo_orders
+            )
         df_orders                            = self._filtrar_exitosas(df_orders)
         df_clientes, df_contratos, df_orders = self._normalizar(
             df_clientes, df_contratos, df_orders
@@ -427,6 +659,55 @@ class CsvMerger:
 
         return self._convertir_a_modelo(df_nuevos)
 
+    def _procesar_por_bloques(
+        self,
+        archivo_clientes:  str,
+        archivo_contratos: str,
+        archivo_orders:    str,
+        actualizar_registro: bool,
+        tamano_bloque:     int,
+    ) -> list:
+        """
+        Mismo pipeline que procesar() pero orders nunca se carga completo:
+        cada bloque fusionado pasa directo a _filtrar_nuevos y
+        _convertir_a_modelo. Solo se acumulan los registros del modelo
+        y las cédulas nuevas para el registro histórico.
+        """
+        archivo_clientes, archivo_contratos, archivo_orders = self._detectar_archivos(
+            archivo_clientes, archivo_contratos, archivo_orders
+        )
+        ruta_ord = self.ruta_entrada / archivo_orders
+
+        # Solo las dimensiones se cargan completas (a la vez); orders va por bloques
+        entradas = cargar_en_paralelo(
+            self.lecturas(archivo_clientes, archivo_contratos, archivo_orders, incluir_orders=False)
+        )
+        df_clientes  = entradas["semanal/clientes"]
+        df_contratos = entradas["semanal/contratos"]
+        df_clientes, df_contratos = self._normalizar_dimensiones(df_clientes, df_contratos)
+
+        cedulas_procesadas = self._cargar_registro()
+        col_cedula         = "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"
+        registros          = []
+        cedulas_nuevas     = []
+
+        bloques = self._fusionar_por_bloques(df_clientes, df_contratos, ruta_ord, tamano_bloque)
+        for df_bloque in bloques:
+            df_nuevos = self._filtrar_nuevos(df_bloque, cedulas_procesadas)
+            if df_nuevos.empty:
+                continue
+            cedulas_nuevas.append(df_nuevos[[col_cedula]])
+            registros.extend(self._convertir_a_modelo(df_nuevos))
+
+        if not registros:
+            logger.warning("No hay registros nuevos esta semana.")
+            return []
+
+        if actualizar_registro:
+            self._actualizar_registro(pd.concat(cedulas_nuevas))
+
+        return registros
+
 
 # ------------------------------------------------------------------
 # FUNCIÓN DE ENTRADA (para llamar desde main.py)
@@ -434,11 +715,17 @@ class CsvMerger:
 def procesar_csvs(
     archivo_clientes:  str = None,
     archivo_contratos: str = None,
-    archivo_orders:    str = None
+    archivo_orders:    str = None,
+    por_bloques:       bool = False,
+    entradas:          dict = None,
 ) -> list:
     """
     Función síncrona para usar desde main.py o cualquier módulo del pipeline.
     """
     merger = CsvMerger()
-    return merger.procesar(archivo_clientes, archivo_contratos, archivo_orders)
+    return merger.procesar(
+        archivo_clientes, archivo_contratos, archivo_orders,
+        por_bloques=por_bloques,
+        entradas=entradas,
+    )
 
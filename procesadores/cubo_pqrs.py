@@ -0,0 +1,216 @@
+# procesadores/cubo_pqrs.py
+"""
+Cubo PQRS persistido: conteo de tickets por
+(cuenta, mes del contrato 1..24, categoría 0..4).
+
+La matriz del Excel se arma y se descarta en cada corrida. El cubo guarda
+lo mismo en forma compacta para que otras etapas (informe mensual,
+indicadores de calidad) lo consulten sin volver a leer CSV:
+
+- conteos en formato COO disperso: arreglos paralelos
+  cuenta (int32, índice en `cuentas`), mes (int8), categoria (int8),
+  conteo (int32); solo las celdas con tickets
+- tabla lateral de tickets: número de ticket + su (cuenta, mes, categoría)
+
+La categoría 0 es el total ("pqr"): cada ticket cuenta ahí y en su
+subcategoría, igual que en la hoja PQRS. Se guarda como un único .npz
+(sin pickle) junto al almacén de tickets.
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_CUBO = Path("datos/procesados/tickets/cubo_pqrs.npz")
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: CUBO
+# ------------------------------------------------------------------
+class CuboPQRS:
+    """
+    Uso:
+        cubo = CuboPQRS.desde_tickets(df, SUBCOLS, CONTRATO_MESES)
+        cubo.guardar()
+        cubo = CuboPQRS.cargar()
+        cubo.por_mes()                               # DataFrame mes × categoría
+        cubo.tasas_por_mil(usuarios=850, mes=5)      # {categoría: tasa}
+        cubo.cuentas_sobre_umbral(3, "disponibilidad")
+    """
+
+    def __init__(self, cuentas, categorias, meses: int, coo: dict, tickets: dict):
+        self.cuentas    = np.asarray(cuentas, dtype=str)
+        self.categorias = [str(c) for c in categorias]
+        self.meses      = int(meses)
+
+        self.cuenta    = np.asarray(coo["cuenta"], dtype=np.int32)
+        self.mes       = np.asarray(coo["mes"], dtype=np.int8)
+        self.categoria = np.asarray(coo["categoria"], dtype=np.int8)
+        self.conteo    = np.asarray(coo["conteo"], dtype=np.int32)
+
+        self.tickets = {
+            "ticket":    np.asarray(tickets["ticket"], dtype=str),
+            "cuenta":    np.asarray(tickets["cuenta"], dtype=np.int32),
+            "mes":       np.asarray(tickets["mes"], dtype=np.int8),
+            "categoria": np.asarray(tickets["categoria"], dtype=np.int8),
+        }
+        self._posicion = {cuenta: i for i, cuenta in enumerate(self.cuentas)}
+
+    # -- construcción ------------------------------------------------
+    @classmethod
+    def desde_tickets(cls, df: pd.DataFrame, categorias: list, meses: int) -> "CuboPQRS":
+        """
+        df con columnas id_cuenta, mes_numero, categoria y "Número del ticket"
+        (salida de TicketsMerger._enriquecer). Tickets sin cuenta o fuera
+        del contrato no entran. categorias[0] es el total.
+        """
+        validos = df[(df["id_cuenta"] != "") & (df["mes_numero"] > 0)]
+
+        codigos, cuentas = pd.factorize(validos["id_cuenta"], sort=True)
+        mes       = validos["mes_numero"].to_numpy(dtype=np.int64)
+        categoria = pd.Categorical(validos["categoria"], categories=categorias).codes.astype(np.int64)
+        n_cat     = len(categorias)
+
+        # Índice lineal de celda: una entrada por ticket en su subcategoría y otra en el total
+        base   = (codigos.astype(np.int64) * meses + (mes - 1)) * n_cat
+        celdas = np.concatenate([base, base + categoria])
+        unicas, conteo = np.unique(celdas, return_counts=True)
+
+        coo = {
+            "cuenta":    unicas // (meses * n_cat),
+            "mes":       (unicas // n_cat) % meses + 1,
+            "categoria": unicas % n_cat,
+            "conteo":    conteo,
+        }
+        tickets = {
+            "ticket":    validos["Número del ticket"].astype(str).str.strip().to_numpy(),
+            "cuenta":    codigos,
+            "mes":       mes,
+            "categoria": categoria,
+        }
+
+        cubo = cls(np.asarray(cuentas), categorias, meses, coo, tickets)
+        logger.info(
+            f"Cubo PQRS: {len(cubo.cuentas)} cuentas | {len(cubo.conteo)} celdas | "
+            f"{len(cubo.tickets['ticket'])} tickets"
+        )
+        return cubo
+
+    # -- persistencia ----------------------------------------------
+    def guardar(self, ruta: Path = RUTA_CUBO) -> Path:
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            ruta,
+            cuentas=self.cuentas,
+            categorias=np.asarray(self.categorias, dtype=str),
+            meses=np.int32(self.meses),
+            cuenta=self.cuenta,
+            mes=self.mes,
+            categoria=self.categoria,
+            conteo=self.conteo,
+            ticket=self.tickets["ticket"],
+            ticket_cuenta=self.tickets["cuenta"],
+            ticket_mes=self.tickets["mes"],
+            ticket_categoria=self.tickets["categoria"],
+        )
+        logger.info(f"Cubo PQRS guardado: {ruta}")
+        return ruta
+
+    @classmethod
+    def cargar(cls, ruta: Path = RUTA_CUBO) -> "CuboPQRS":
+        ruta = Path(ruta)
+        if not ruta.exists():
+            raise FileNotFoundError(f"No existe el cubo PQRS: {ruta} (se genera con TicketsMerger)")
+
+        with np.load(ruta, allow_pickle=False) as datos:
+            return cls(
+                datos["cuentas"],
+                datos["categorias"].tolist(),
+                int(datos["meses"]),
+                {c: datos[c] for c in ("cuenta", "mes", "categoria", "conteo")},
+                {
+                    "ticket":    datos["ticket"],
+                    "cuenta":    datos["ticket_cuenta"],
+                    "mes":       datos["ticket_mes"],
+                    "categoria": datos["ticket_categoria"],
+                },
+            )
+
+    # -- consultas ---------------------------------------------------
+    def _codigo_categoria(self, categoria) -> int:
+        if isinstance(categoria, (int, np.integer)):
+            return int(categoria)
+        if categoria not in self.categorias:
+            raise ValueError(f"Categoría desconocida: {categoria}. Opciones: {self.categorias}")
+        return self.categorias.index(categoria)
+
+    def _filtro(self, mes=None, categoria=None) -> np.ndarray:
+        filtro = np.ones(len(self.conteo), dtype=bool)
+        if mes is not None:
+            filtro &= self.mes == int(mes)
+        if categoria is not None:
+            filtro &= self.categoria == self._codigo_categoria(categoria)
+        return filtro
+
+    def denso(self) -> np.ndarray:
+        """Arreglo (cuentas, meses, categorías) con ceros donde no hay tickets."""
+        cubo = np.zeros((len(self.cuentas), self.meses, len(self.categorias)), dtype=np.int32)
+        cubo[self.cuenta, self.mes - 1, self.categoria] = self.conteo
+        return cubo
+
+    def por_mes(self) -> pd.DataFrame:
+        """Totales por mes del contrato (filas 1..meses) y categoría (columnas)."""
+        celda = (self.mes.astype(np.int64) - 1) * len(self.categorias) + self.categoria
+        totales = np.bincount(celda, weights=self.conteo, minlength=self.meses * len(self.categorias))
+        return pd.DataFrame(
+            totales.reshape(self.meses, len(self.categorias)).astype(np.int64),
+            index=pd.RangeIndex(1, self.meses + 1, name="mes"),
+            columns=self.categorias,
+        )
+
+    def totales_por_mes(self, categoria=0) -> np.ndarray:
+        """Tickets por mes (posición 0 = MES 1) de una categoría (por defecto el total)."""
+        filtro = self._filtro(categoria=categoria)
+        return np.bincount(self.mes[filtro] - 1, weights=self.conteo[filtro], minlength=self.meses).astype(np.int64)
+
+    def tasas_por_mil(self, usuarios: int, mes=None) -> dict:
+        """Tickets por cada 1.000 usuarios, por categoría (en un mes o en todo el contrato)."""
+        if not usuarios:
+            return {categoria: 0.0 for categoria in self.categorias}
+        filtro  = self._filtro(mes=mes)
+        totales = np.bincount(self.categoria[filtro], weights=self.conteo[filtro], minlength=len(self.categorias))
+        return {
+            categoria: round(float(total) * 1000 / usuarios, 2)
+            for categoria, total in zip(self.categorias, totales)
+        }
+
+    def cuentas_sobre_umbral(self, umbral: int, categoria=0, mes=None) -> pd.Series:
+        """Cuentas con al menos `umbral` tickets (en el mes o en todo el contrato), de mayor a menor."""
+        filtro  = self._filtro(mes=mes, categoria=categoria)
+        totales = np.bincount(self.cuenta[filtro], weights=self.conteo[filtro], minlength=len(self.cuentas))
+        sobre   = np.flatnonzero(totales >= umbral)
+        serie   = pd.Series(totales[sobre].astype(np.int64), index=pd.Index(self.cuentas[sobre], name="id_cuenta"))
+        return serie.sort_values(ascending=False, kind="stable")
+
+    def tickets_de(self, cuenta: str, mes=None, categoria=None) -> list:
+        """Números de ticket de una cuenta (opcionalmente de un mes / categoría)."""
+        if cuenta not in self._posicion:
+            return []
+        filtro = self.tickets["cuenta"] == self._posicion[cuenta]
+        if mes is not None:
+            filtro &= self.tickets["mes"] == int(mes)
+        if categoria is not None:
+            codigo = self._codigo_categoria(categoria)
+            if codigo != 0:
+                filtro &= self.tickets["categoria"] == codigo
+        return self.tickets["ticket"][filtro].tolist()
@@ -0,0 +1,347 @@
+# procesadores/esquemas.py
+"""
+Esquema de tipos declarado para cada export de Wispro.
+
+En lugar de cargar todo como strings de Python (objeto por celda):
+- campos de baja cardinalidad (TIPO, ESTADO, PLAN, ZONA, ...) → category
+- texto libre                                                → string Arrow
+- IDs                                                        → Int64, si están limpios
+- fechas                                                     → datetime64
+
+Las claves son los nombres REALES del encabezado de Wispro; el lector
+(procesadores/lector_csv.py) las traduce a los nombres canónicos de cada
+etapa. Columnas que no figuran aquí se leen como antes.
+"""
+
+import importlib.util
+import logging
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: TIPOS BASE
+# ------------------------------------------------------------------
+PYARROW_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+FECHA      = "%d/%m/%Y"
+FECHA_HORA = "%d/%m/%Y %H:%M:%S"
+
+# Candidatos para detectar el formato dominante de una columna de fechas
+# (todos con el día antes del mes, igual que dayfirst=True)
+FORMATOS_FECHA = (
+    FECHA,
+    FECHA_HORA,
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+)
+
+_NUMERO = r"(-?\d+(?:\.\d+)?)"
+
+
+def _dtype_texto():
+    """
+    String respaldado por Arrow con NaN como faltante (mismo comportamiento
+    que las columnas object que el pipeline ya espera). Sin pyarrow → object.
+    """
+    if not PYARROW_DISPONIBLE:
+        return object
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)       # pandas >= 2.3
+    except TypeError:
+        try:
+            return pd.api.types.pandas_dtype("string[pyarrow_numpy]")   # pandas 2.1 / 2.2
+        except TypeError:
+            return object
+
+
+DTYPE_TEXTO = _dtype_texto()
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: ESQUEMAS POR EXPORT
+# Tipos: "categoria" | "texto" | "entero" | ("fecha", formato)
+# LATITUD/LONGITUD no se declaran: se conservan como float inferido.
+# FINALIZADA EL se conserva como texto: el informe semanal usa el texto
+# original sin la zona horaria.
+# ------------------------------------------------------------------
+ESQUEMA_CLIENTES = {
+    "ID CLIENTE":                  "entero",
+    "ID PERSONALIZABLE":           "texto",
+    "NOMBRE":                      "texto",
+    "OBSERVACIONES":               "texto",
+    "EMAIL":                       "texto",
+    "TELÉFONO":                    "texto",
+    "TELÉFONO CELULAR":            "texto",
+    "DIRECCIÓN":                   "texto",
+    "BARRIO":                      "categoria",
+    "ZONA":                        "categoria",
+    "DATO ADICIONAL":              "texto",
+    "DOCUMENTO/CÉDULA":            "texto",
+    "CIUDAD":                      "categoria",
+    "PROVINCIA/ESTADO/REGION":     "categoria",
+    "FACTURACIÓN HABILITADA":      "categoria",
+    "TIPO DE FACTURA":             "categoria",
+    "CONDICIÓN IMPOSITIVA":        "categoria",
+    "NÚMERO DE FACTURAS IMPAGAS":  "texto",
+    "CREADO EL":                   ("fecha", FECHA_HORA),
+    "ULTIMA MODIFICACION":         ("fecha", FECHA_HORA),
+}
+
+ESQUEMA_CONTRATOS = {
+    "ID CONTRATO":                 "entero",
+    "ID CLIENTE":                  "entero",
+    "MAC-ADDRESS":                 "texto",
+    "NOMBRE PLAN":                 "categoria",
+    "NOMBRE CLIENTE":              "texto",
+    "EMAIL":                       "texto",
+    "IDENTIFICADOR NACIONAL":      "texto",
+    "DIRECCIÓN DEL CLIENTE":       "texto",
+    "TELÉFONOS":                   "texto",
+    "USUARIO PPPOE":               "texto",
+    "SERVIDOR":                    "categoria",
+    "ESTADO":                      "categoria",
+    "DIRRECIÓN DEL CONTRATO":      "texto",
+    "ESTADO DE FACTURACIÓN":       "categoria",
+    "ESTRATO SOCIAL":              "categoria",
+    "CREADO EL":                   ("fecha", FECHA_HORA),
+    "ULTIMA MODIFICACION":         ("fecha", FECHA_HORA),
+    "FECHA DE ALTA":               ("fecha", FECHA),
+}
+
+ESQUEMA_ORDERS = {
+    "ID ORDEN":                    "entero",
+    "TIPO":                        "categoria",
+    "ESTADO":                      "categoria",
+    "RESULTADO":                   "categoria",
+    "ID CLIENTE":                  "entero",
+    "ID PERSONALIZABLE":           "texto",
+    "NOMBRE CLIENTE":              "texto",
+    "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE": "texto",
+    "ID CONTRATO":                 "entero",
+    "TIPO DE CONTRATO":            "categoria",
+    "DIRECCIÓN (CONTRATO)":        "texto",
+    "NOMBRE PLAN":                 "categoria",
+    "NOMBRE EMPLEADO":             "categoria",
+    "FINALIZADA EL":               "texto",
+}
+
+ESQUEMA_FACTURAS = {
+    "TIPO FACTURA":                "categoria",
+    "NÚMERO FACTURA":              "texto",
+    "CREADA EL":                   ("fecha", FECHA_HORA),
+    "EMITIDA EL":                  ("fecha", FECHA_HORA),
+    "ID CLIENTE":                  "entero",
+    "NOMBRE CLIENTE":              "texto",
+    "EMAIL CLIENTE":               "texto",
+    "ID CONTRATO":                 "entero",
+    "PRIMER VENCIMIENTO":          ("fecha", FECHA),
+    "SEGUNDO VENCIMIENTO":         ("fecha", FECHA),
+    "DETALLES":                    "categoria",
+    "MONTO":                       "texto",
+    "BALANCE":                     "texto",
+    "ESTADO":                      "categoria",
+    "ZONA":                        "categoria",
+}
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: CONVERSIÓN
+# ------------------------------------------------------------------
+def _a_entero(serie: pd.Series) -> pd.Series:
+    """
+    Int64 solo si TODOS los valores no vacíos son enteros limpios
+    (sin ceros a la izquierda, sin '.0', sin letras). Si no, texto.
+    """
+    texto  = serie.astype(DTYPE_TEXTO).str.strip()
+    texto  = texto.where(texto != "", np.nan)
+    numero = pd.to_numeric(texto, errors="coerce")
+
+    presentes = texto.notna()
+    limpio = numero[presentes].notna().all()
+    if limpio and presentes.any():
+        limpio = bool((numero[presentes] % 1 == 0).all())
+    if limpio and presentes.any():
+        entero = numero.astype("Int64")
+        limpio = bool((entero[presentes].astype(str) == texto[presentes]).all())
+
+    if not limpio:
+        logger.debug(f"Columna '{serie.name}' con IDs no numéricos, se conserva como texto")
+        return texto
+    return numero.astype("Int64")
+
+
+def detectar_formato_fecha(texto: pd.Series, preferido: str | None = None, muestra: int = 500) -> str | None:
+    """
+    Formato dominante de una columna de fechas: el candidato que parsea
+    más valores de una muestra. `preferido` (el del esquema) gana los empates.
+    """
+    valores = texto.dropna()
+    valores = valores[valores != ""].drop_duplicates().head(muestra)
+    if valores.empty:
+        return preferido
+
+    candidatos = [preferido] if preferido else []
+    candidatos += [f for f in FORMATOS_FECHA if f != preferido]
+
+    mejor, aciertos_mejor = None, 0
+    for formato in candidatos:
+        aciertos = int(pd.to_datetime(valores, format=formato, errors="coerce").notna().sum())
+        if aciertos > aciertos_mejor:
+            mejor, aciertos_mejor = formato, aciertos
+        if aciertos == len(valores):
+            break
+    return mejor
+
+
+def _fecha_flexible(valor) -> pd.Timestamp:
+    """Parseo libre con dayfirst=True de un valor suelto (NaT si falla)."""
+    fecha = pd.to_datetime(valor, dayfirst=True, errors="coerce")
+    if fecha is not pd.NaT and fecha.tzinfo is not None:
+        fecha = fecha.tz_localize(None)
+    return fecha
+
+
+def parsear_fechas(serie: pd.Series, formato: str | None = None) -> pd.Series:
+    """
+    Texto → datetime64 por columna: toda la Serie se parsea con el formato
+    dominante (el declarado, o el detectado si no lo cumple la mayoría) y
+    solo las filas que fallan se reintentan una por valor único con
+    dayfirst=True. Las columnas ya tipadas como fecha pasan directo.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    texto     = serie.astype(DTYPE_TEXTO).str.strip()
+    presentes = texto.notna() & (texto != "")
+    formato   = detectar_formato_fecha(texto, preferido=formato)
+
+    if formato:
+        fechas = pd.to_datetime(texto, format=formato, errors="coerce")
+    else:
+        fechas = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+
+    fallidas = fechas.isna() & presentes
+    if fallidas.any():
+        reintento = {valor: _fecha_flexible(valor) for valor in texto[fallidas].unique()}
+        fechas[fallidas] = pd.to_datetime(texto[fallidas].map(reintento), errors="coerce")
+
+    sin_fecha = int((fechas.isna() & presentes).sum())
+    if sin_fecha:
+        logger.warning(f"Columna '{serie.name}': {sin_fecha} fecha(s) no interpretables → NaT")
+    return fechas
+
+
+def _a_fecha(serie: pd.Series, formato: str) -> pd.Series:
+    """Parseo con el formato declarado (ver parsear_fechas)."""
+    return parsear_fechas(serie, formato)
+
+
+def parsear_montos(serie: pd.Series) -> pd.Series:
+    """
+    Montos de Wispro a float, con operaciones de Serie. El separador
+    decimal es el último de "," y "." que aparezca, si aparece una sola
+    vez; el otro (o uno repetido) es de miles:
+        "$ 12.345,67"  →  12345.67     (latino: punto de miles, coma decimal)
+        "12345,5"      →  12345.5
+        "12,345.67"    →  12345.67
+        "1.234.567"    →  1234567.0
+        "12345 COP"    →  12345.0
+    Vacíos y valores sin número → 0.0 (estos últimos se cuentan en el log).
+    """
+    texto    = serie.astype(DTYPE_TEXTO).str.strip()
+    invalido = texto.isna() | texto.str.lower().isin(["", "nan", "none"])
+
+    texto = (
+        texto.str.replace("$", "", regex=False)
+        .str.replace("COP", "", regex=False)
+        .str.replace(" ", "", regex=False)
+        .str.strip()
+    )
+    comas  = texto.str.count(",")
+    puntos = texto.str.count(r"\.")
+
+    ultima_coma  = texto.str.rfind(",")
+    ultimo_punto = texto.str.rfind(".")
+
+    coma_decimal  = (ultima_coma > ultimo_punto) & (comas == 1)
+    punto_decimal = (ultimo_punto > ultima_coma) & (puntos == 1)
+    sin_miles = texto.str.replace(",", "", regex=False).str.replace(".", "", regex=False)
+    texto = (
+        sin_miles
+        .mask(punto_decimal, texto.str.replace(",", "", regex=False))
+        .mask(coma_decimal, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    )
+
+    numero = texto.str.extract(_NUMERO, expand=False).astype(float)
+
+    no_interpretables = int((numero.isna() & ~invalido).sum())
+    if no_interpretables:
+        logger.warning(f"Columna '{serie.name}': {no_interpretables} monto(s) no interpretables → 0.0")
+    return numero.fillna(0.0).astype(float)
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: dict) -> pd.DataFrame:
+    """
+    Convierte las columnas presentes en `esquema` a su tipo declarado.
+    Las demás columnas quedan intactas. Su salida se cachea: si cambia
+    este parseo (o el de fechas/enteros), subir VERSION_PARSEO en
+    procesadores/cache_columnar.py.
+    """
+    for col, tipo in esquema.items():
+        if col not in df.columns:
+            continue
+
+        if tipo == "categoria":
+            df[col] = df[col].astype(DTYPE_TEXTO).str.strip().astype("category")
+        elif tipo == "texto":
+            df[col] = df[col].astype(DTYPE_TEXTO)
+        elif tipo == "entero":
+            df[col] = _a_entero(df[col])
+        elif isinstance(tipo, tuple) and tipo[0] == "fecha":
+            df[col] = _a_fecha(df[col], tipo[1])
+        else:
+            raise ValueError(f"Tipo de esquema desconocido para '{col}': {tipo}")
+
+    return df
+
+
+# ------------------------------------------------------------------
+# BLOQUE 4: HELPERS PARA JOINS Y SALIDAS
+# ------------------------------------------------------------------
+def es_texto(serie: pd.Series) -> bool:
+    """True para columnas object o string (no category, número ni fecha)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+
+
+def alinear_claves(dfs: list, columna: str) -> list:
+    """
+    Garantiza que la columna llave tenga el mismo tipo en todos los
+    DataFrames antes de un JOIN. Si todas son Int64 se conservan; si
+    alguna quedó como texto (IDs sucios), todas pasan a texto.
+    """
+    series = [df[columna] for df in dfs if columna in df.columns]
+    if all(pd.api.types.is_integer_dtype(s) for s in series):
+        return dfs
+
+    for df in dfs:
+        if columna in df.columns:
+            df[columna] = df[columna].astype(DTYPE_TEXTO).str.strip()
+    return dfs
+
+
+def texto_plano(serie: pd.Series) -> pd.Series:
+    """
+    Convierte una columna tipada (Int64, category o texto) a texto plano
+    para agrupar y exportar: faltantes → "", sin espacios.
+    """
+    return serie.astype("string").fillna("").str.strip().astype(str)
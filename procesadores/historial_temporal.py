@@ -0,0 +1,369 @@
+# procesadores/historial_temporal.py
+"""
+Historial temporal (SCD tipo 2) de contratos y clientes de Wispro.
+
+Cada snapshot fechado (wispro_contratos_YYYY-MM-DD.csv, ...) es una foto
+completa. Recorriendo todas las fotos en orden se arma una tabla de
+versiones: cada fila es el estado de una entidad durante un intervalo
+
+    [VALIDO_DESDE, VALIDO_HASTA)      (valid_from / valid_to)
+
+VALIDO_HASTA vacío (NaT) = versión vigente en el último snapshot. Una
+versión se cierra cuando cambia alguno de los campos seguidos
+(COLUMNAS_HISTORIAL) o cuando la entidad desaparece del export.
+
+La tabla se guarda en datos/procesados/historial/ y se actualiza de forma
+incremental: solo se leen los snapshots que aún no estaban aplicados. Las
+consultas ("estado del contrato X el día D", "contratos suspendidos en el
+mes M") trabajan sobre esa tabla, sin volver a leer ningún CSV.
+
+Precisión: la granularidad es la de los snapshots. Un cambio se fecha el
+día del primer snapshot que lo muestra.
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.catalogo_entradas import fecha_en_nombre, obtener_catalogo
+from procesadores.cdc_snapshots import (
+    ESTADO_SUSPENDIDO,
+    CAMPO_ESTADO,
+    LLAVES,
+    PATRONES,
+    RUTA_ENTRADA,
+    hash_filas,
+    preparar_snapshot,
+)
+from procesadores.lector_csv import leer_csv
+from procesadores.persistencia import guardar_tabla, leer_meta, leer_tabla, ruta_tabla
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_HISTORIAL = Path("datos/procesados/historial")
+
+DESDE = "VALIDO_DESDE"
+HASTA = "VALIDO_HASTA"
+HASH  = "HASH_FILA"
+
+# Campos seguidos por tipo: {nombre_canonico: [alias, ...]}.
+# ULTIMA MODIFICACION no se sigue: cambia sin que cambie el contrato.
+COLUMNAS_HISTORIAL = {
+    "contratos": {
+        "ID CONTRATO":            ["ID CONTRATO"],
+        "ID CLIENTE":             ["ID CLIENTE"],
+        "NOMBRE CLIENTE":         ["NOMBRE CLIENTE"],
+        "IDENTIFICADOR NACIONAL": ["IDENTIFICADOR NACIONAL", "DOCUMENTO/CÉDULA"],
+        "NOMBRE PLAN":            ["NOMBRE PLAN"],
+        "ESTADO":                 ["ESTADO"],
+        "ESTADO DE FACTURACIÓN":  ["ESTADO DE FACTURACIÓN"],
+        "DIRRECIÓN DEL CONTRATO": ["DIRRECIÓN DEL CONTRATO", "DIRECCIÓN DEL CONTRATO"],
+        "ESTRATO SOCIAL":         ["ESTRATO SOCIAL"],
+        "FECHA DE ALTA":          ["FECHA DE ALTA"],
+        "MAC-ADDRESS":            ["MAC-ADDRESS", "MAC"],
+    },
+    "clientes": {
+        "ID CLIENTE":             ["ID CLIENTE"],
+        "NOMBRE":                 ["NOMBRE"],
+        "DOCUMENTO/CÉDULA":       ["DOCUMENTO/CÉDULA", "IDENTIFICADOR NACIONAL"],
+        "EMAIL":                  ["EMAIL"],
+        "TELÉFONO":               ["TELÉFONO"],
+        "TELÉFONO CELULAR":       ["TELÉFONO CELULAR"],
+        "DIRECCIÓN":              ["DIRECCIÓN"],
+        "BARRIO":                 ["BARRIO"],
+        "ZONA":                   ["ZONA"],
+        "FACTURACIÓN HABILITADA": ["FACTURACIÓN HABILITADA"],
+    },
+}
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: FECHAS Y PERÍODOS
+# ------------------------------------------------------------------
+def fecha_snapshot(ruta: Path) -> pd.Timestamp:
+    """Fecha del snapshot según el nombre (ver procesadores/catalogo_entradas.py)."""
+    fecha = fecha_en_nombre(Path(ruta).name)
+    if fecha is None:
+        raise ValueError(f"El nombre del snapshot no tiene fecha: {Path(ruta).name}")
+    return pd.Timestamp(fecha)
+
+
+def _rango_mes(mes) -> tuple:
+    """'YYYY-MM' (o Period/Timestamp) → (inicio, inicio del mes siguiente)."""
+    periodo = pd.Period(mes, freq="M")
+    return periodo.start_time, (periodo + 1).start_time
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: HISTORIAL
+# ------------------------------------------------------------------
+class HistorialTemporal:
+    """
+    Tabla de versiones de un tipo de export ("contratos" o "clientes").
+
+    Uso:
+        historial = HistorialTemporal("contratos").cargar()
+        historial.estado_en(32, "2026-04-01")
+        historial.suspendidos_en_mes("2026-04")
+    """
+
+    def __init__(
+        self,
+        tipo: str,
+        ruta_entrada:   Path = RUTA_ENTRADA,
+        ruta_historial: Path = RUTA_HISTORIAL,
+    ):
+        if tipo not in COLUMNAS_HISTORIAL:
+            raise ValueError(f"Tipo sin historial: {tipo}. Opciones: {list(COLUMNAS_HISTORIAL)}")
+
+        self.tipo           = tipo
+        self.llave          = LLAVES[tipo]
+        self.columnas       = COLUMNAS_HISTORIAL[tipo]
+        self.campos         = [c for c in self.columnas if c != self.llave]
+        self.ruta_entrada   = Path(ruta_entrada)
+        self.ruta_historial = Path(ruta_historial)
+
+        self.versiones = self._tabla_vacia()
+        self.snapshots = []          # [{"archivo": ..., "hash": ...}] ya aplicados
+        self._posiciones = {}        # llave → posiciones en self.versiones
+
+    # -- persistencia ----------------------------------------------
+    @property
+    def _ruta_tabla(self) -> Path:
+        return ruta_tabla(self.ruta_historial, self.tipo)
+
+    @property
+    def _ruta_meta(self) -> Path:
+        return self.ruta_historial / f"{self.tipo}_snapshots.json"
+
+    def _tabla_vacia(self) -> pd.DataFrame:
+        tabla = pd.DataFrame(columns=[self.llave] + self.campos, dtype="string")
+        tabla[DESDE] = pd.Series(dtype="datetime64[ns]")
+        tabla[HASTA] = pd.Series(dtype="datetime64[ns]")
+        tabla[HASH]  = pd.Series(dtype="uint64")
+        return tabla
+
+    def _leer_guardado(self) -> bool:
+        if not (self._ruta_tabla.exists() and self._ruta_meta.exists()):
+            return False
+        try:
+            meta = leer_meta(self._ruta_meta)
+            if meta.get("columnas") != list(self.columnas):
+                logger.info(f"Historial {self.tipo}: cambiaron los campos seguidos, se reconstruye")
+                return False
+            versiones = leer_tabla(self._ruta_tabla, meta)
+        except Exception as e:
+            logger.warning(f"Historial {self.tipo} ilegible ({e}), se reconstruye")
+            return False
+
+        self.versiones = versiones
+        self.snapshots = meta["snapshots"]
+        return True
+
+    def _guardar(self):
+        meta = {"columnas": list(self.columnas), "snapshots": self.snapshots}
+        guardar_tabla(self.versiones, self._ruta_tabla, meta, self._ruta_meta)
+
+    # -- construcción ----------------------------------------------
+    def _snapshots_disponibles(self) -> list:
+        # El catálogo también acepta contratos .xlsx, pero los snapshots
+        # se leen con leer_csv: solo entran los CSV fechados
+        catalogo = obtener_catalogo(self.ruta_entrada)
+        fechados = [e for e in catalogo.archivos(self.tipo) if e["fecha"] is not None]
+        omitidos = [e["nombre"] for e in fechados if Path(e["nombre"]).suffix.lower() != ".csv"]
+        if omitidos:
+            logger.warning(f"Historial {self.tipo}: snapshots que no son CSV, se omiten: {omitidos}")
+        return [
+            {"archivo": e["nombre"], "hash": e["sha256"]}
+            for e in fechados
+            if e["nombre"] not in omitidos
+        ]
+
+    def _leer_snapshot(self, ruta: Path) -> pd.DataFrame:
+        df = leer_csv(ruta, columnas=self.columnas, dtype=str)
+        df = df.reindex(columns=list(self.columnas))
+        return preparar_snapshot(df, self.llave, self.campos)
+
+    def _aplicar_snapshot(self, cerradas: list, abiertas: pd.DataFrame, ruta: Path) -> pd.DataFrame:
+        """
+        Aplica una foto sobre las versiones abiertas (indexadas por llave).
+        Las versiones que cambian o desaparecen se cierran en la fecha del
+        snapshot y se agregan a `cerradas`. Retorna las nuevas abiertas.
+        """
+        fecha  = fecha_snapshot(ruta)
+        actual = self._leer_snapshot(ruta)
+        hashes = hash_filas(actual)
+
+        comunes   = actual.index.intersection(abiertas.index, sort=False)
+        distintas = comunes[hashes.loc[comunes].to_numpy() != abiertas.loc[comunes, HASH].to_numpy()]
+        retiradas = abiertas.index.difference(actual.index, sort=False)
+        nuevas    = actual.index.difference(abiertas.index, sort=False)
+
+        a_cerrar = distintas.append(retiradas)
+        if len(a_cerrar):
+            cerradas.append(abiertas.loc[a_cerrar].assign(**{HASTA: fecha}))
+
+        a_abrir = distintas.append(nuevas)
+        versiones_nuevas = actual.loc[a_abrir].assign(**{
+            DESDE: fecha,
+            HASTA: pd.NaT,
+            HASH:  hashes.loc[a_abrir].to_numpy(),
+        })
+
+        logger.info(
+            f"Historial {self.tipo} {ruta.name}: {len(nuevas)} nuevas | "
+            f"{len(distintas)} con cambios | {len(retiradas)} retiradas"
+        )
+        return pd.concat([abiertas.drop(index=a_cerrar), versiones_nuevas])
+
+    def _aplicar(self, pendientes: list):
+        versiones = self.versiones
+        abiertas  = versiones[versiones[HASTA].isna()].set_index(self.llave)
+        cerradas  = [versiones[versiones[HASTA].notna()].set_index(self.llave)]
+
+        for snapshot in pendientes:
+            abiertas = self._aplicar_snapshot(cerradas, abiertas, self.ruta_entrada / snapshot["archivo"])
+            self.snapshots.append(snapshot)
+
+        versiones = pd.concat(cerradas + [abiertas])
+        versiones.index.name = self.llave
+        self.versiones = versiones.reset_index().sort_values(
+            [self.llave, DESDE], kind="stable", ignore_index=True
+        )
+
+    def cargar(self, reconstruir: bool = False) -> "HistorialTemporal":
+        """
+        Carga el historial guardado y aplica solo los snapshots nuevos.
+        Si un snapshot ya aplicado cambió o desapareció, o si se pide
+        reconstruir, se rehace desde el primer snapshot.
+        """
+        disponibles = self._snapshots_disponibles()
+        if not disponibles:
+            raise FileNotFoundError(
+                f"No hay snapshots con patrón {PATRONES[self.tipo]} en {self.ruta_entrada}"
+            )
+
+        if reconstruir or not self._leer_guardado() or disponibles[:len(self.snapshots)] != self.snapshots:
+            if self.snapshots:
+                logger.info(f"Historial {self.tipo}: los snapshots aplicados cambiaron, se reconstruye")
+            self.versiones = self._tabla_vacia()
+            self.snapshots = []
+
+        pendientes = disponibles[len(self.snapshots):]
+        if pendientes:
+            self._aplicar(pendientes)
+            self._guardar()
+
+        self._posiciones = self.versiones.groupby(self.llave, sort=False).indices
+        logger.info(
+            f"Historial {self.tipo}: {len(self.versiones)} versiones de "
+            f"{len(self._posiciones)} entidades ({len(self.snapshots)} snapshots, "
+            f"{len(pendientes)} nuevos)"
+        )
+        return self
+
+    # ------------------------------------------------------------------
+    # BLOQUE 4: CONSULTAS
+    # ------------------------------------------------------------------
+    def _vigentes(self, versiones: pd.DataFrame, desde, hasta) -> pd.Series:
+        """Máscara de versiones cuyo intervalo se cruza con [desde, hasta)."""
+        return (versiones[DESDE] < hasta) & (versiones[HASTA].isna() | (versiones[HASTA] > desde))
+
+    def versiones_de(self, id_entidad) -> pd.DataFrame:
+        """Todas las versiones de una entidad, en orden cronológico."""
+        posiciones = self._posiciones.get(str(id_entidad).strip())
+        if posiciones is None:
+            return self.versiones.iloc[0:0]
+        return self.versiones.iloc[posiciones]
+
+    def estado_en(self, id_entidad, fecha):
+        """Versión vigente de la entidad en la fecha (Series) o None si no existía."""
+        fecha     = pd.Timestamp(fecha)
+        versiones = self.versiones_de(id_entidad)
+        vigente   = versiones[self._vigentes(versiones, fecha, fecha + pd.Timedelta(1, "ns"))]
+        if vigente.empty:
+            return None
+        return vigente.iloc[-1]
+
+    def foto_en(self, fecha) -> pd.DataFrame:
+        """Estado de todas las entidades vigentes en la fecha."""
+        fecha = pd.Timestamp(fecha)
+        mascara = self._vigentes(self.versiones, fecha, fecha + pd.Timedelta(1, "ns"))
+        return self.versiones[mascara].reset_index(drop=True)
+
+    def en_estado_durante_mes(self, mes, campo: str, valor: str) -> pd.DataFrame:
+        """
+        Entidades que tuvieron `campo == valor` en algún momento del mes
+        (sin distinguir mayúsculas). Se retorna la última de esas versiones.
+        """
+        desde, hasta = _rango_mes(mes)
+        versiones = self.versiones
+        mascara = self._vigentes(versiones, desde, hasta)
+        mascara &= versiones[campo].str.lower() == valor.lower()
+        return (
+            versiones[mascara]
+            .drop_duplicates(self.llave, keep="last")
+            .reset_index(drop=True)
+        )
+
+    def _exigir_contratos(self, consulta: str):
+        """Las consultas por ESTADO solo existen en el historial de contratos."""
+        if self.tipo != "contratos":
+            raise ValueError(
+                f"{consulta} solo aplica al historial de contratos (este es de {self.tipo})"
+            )
+
+    def suspendidos_en_mes(self, mes) -> pd.DataFrame:
+        """Contratos que estuvieron Deshabilitados en algún momento del mes."""
+        self._exigir_contratos("suspendidos_en_mes")
+        return self.en_estado_durante_mes(mes, CAMPO_ESTADO, ESTADO_SUSPENDIDO)
+
+    def activos_en(self, fecha) -> pd.DataFrame:
+        """Contratos habilitados en la fecha (predios activos)."""
+        self._exigir_contratos("activos_en")
+        foto = self.foto_en(fecha)
+        return foto[foto[CAMPO_ESTADO].str.lower() != ESTADO_SUSPENDIDO.lower()].reset_index(drop=True)
+
+    def altas_en_mes(self, mes) -> pd.DataFrame:
+        """Entidades cuya primera versión aparece en el mes."""
+        desde, hasta = _rango_mes(mes)
+        primeras = self.versiones.drop_duplicates(self.llave, keep="first")
+        return primeras[(primeras[DESDE] >= desde) & (primeras[DESDE] < hasta)].reset_index(drop=True)
+
+    def retirados_en_mes(self, mes) -> pd.DataFrame:
+        """
+        Entidades que salieron del export durante el mes (usuarios
+        retirados): su última versión se cerró en el mes y no hay otra.
+        """
+        desde, hasta = _rango_mes(mes)
+        ultimas = self.versiones.drop_duplicates(self.llave, keep="last")
+        mascara = ultimas[HASTA].notna() & (ultimas[HASTA] >= desde) & (ultimas[HASTA] < hasta)
+        return ultimas[mascara].reset_index(drop=True)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 5: RESUMEN PARA EL INFORME MENSUAL
+# ------------------------------------------------------------------
+def resumen_usuarios_mes(historial: HistorialTemporal, mes) -> dict:
+    """
+    Conteos del bloque modelo["usuarios"] del informe mensual, tomados
+    del historial de contratos al cierre del mes (último día).
+    """
+    historial._exigir_contratos("resumen_usuarios_mes")
+    _, hasta = _rango_mes(mes)
+    cierre = hasta - pd.Timedelta(days=1)
+    foto   = historial.foto_en(cierre)
+
+    suspendidos = foto[CAMPO_ESTADO].str.lower() == ESTADO_SUSPENDIDO.lower()
+    return {
+        "total_registrados": int(len(foto)),
+        "activos":           int((~suspendidos).sum()),
+        "suspendidos":       int(suspendidos.sum()),
+        "retirados":         int(len(historial.retirados_en_mes(mes))),
+    }
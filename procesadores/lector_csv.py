@@ -0,0 +1,382 @@
+# procesadores/lector_csv.py
+"""
+Lector compartido de CSVs exportados desde Wispro.
+
+Detecta BOM, codificación y separador leyendo SOLO una muestra inicial
+del archivo (no el archivo completo), guarda el resultado en memoria por
+(ruta, tamaño, mtime) y luego parsea una única vez con el motor C de pandas.
+El resultado parseado pasa por el caché columnar (procesadores/cache_columnar.py):
+una segunda lectura del mismo contenido, en esta u otra corrida, es una
+carga Parquet. Con `columnas=` solo se parsean las columnas declaradas
+por la etapa (ver procesadores/columnas.py) y con `filtros=` el archivo se
+lee por bloques descartando las filas que no cumplen, así solo las filas
+sobrevivientes llegan a memoria. iterar_csv entrega esos mismos bloques
+sin acumularlos, para procesar tablas de hechos por partes.
+Lo usan csv_merger.py, tickets_merger.py y reporte_facturacion_clientes.py.
+"""
+
+import codecs
+import csv
+import io
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.cache_columnar import guardar_en_cache, huella_archivo, leer_desde_cache
+from procesadores.columnas import registrar_encabezado, resolver_columnas
+from procesadores.esquemas import aplicar_esquema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+TAMANO_MUESTRA         = 64 * 1024          # bytes leídos para detectar formato
+SEPARADORES_CANDIDATOS = [",", ";", "\t", "|"]
+TAMANO_BLOQUE          = 50_000             # filas por bloque en lectura con filtros
+TAMANO_LECTURA_BYTES   = 1024 * 1024        # bytes por lectura al confirmar la codificación
+
+# Huella del archivo → formato detectado
+# {(ruta_absoluta, tamaño, mtime_ns): {"encoding", "sep", "bom", "encabezado"}}
+_CACHE_FORMATO: dict = {}
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: DETECCIÓN DE CODIFICACIÓN Y SEPARADOR
+# ------------------------------------------------------------------
+def _detectar_codificacion(muestra: bytes) -> tuple:
+    """
+    Retorna (encoding, bom) a partir de los primeros bytes.
+    Orden equivalente al anterior: utf-8-sig → utf-8 → latin1.
+    """
+    if muestra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig", True
+    if muestra.startswith(codecs.BOM_UTF16_LE) or muestra.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16", True
+
+    # Decodificador incremental: la muestra puede cortar un carácter
+    # multibyte al final, eso no debe contarse como error.
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(muestra, final=False)
+        return "utf-8", False
+    except UnicodeDecodeError:
+        return "latin1", False
+
+
+def _detectar_separador(texto: str) -> str:
+    """
+    Detecta el separador sobre las líneas completas de la muestra.
+    Si csv.Sniffer no decide, se usa el candidato más frecuente
+    en la línea de encabezados.
+    """
+    lineas = texto.splitlines()
+    if len(lineas) > 1:
+        lineas = lineas[:-1]    # la última puede venir cortada
+    muestra = "\n".join(lineas)
+
+    try:
+        return csv.Sniffer().sniff(muestra, delimiters="".join(SEPARADORES_CANDIDATOS)).delimiter
+    except csv.Error:
+        encabezado = lineas[0] if lineas else ""
+        conteos = {sep: encabezado.count(sep) for sep in SEPARADORES_CANDIDATOS}
+        sep = max(conteos, key=conteos.get)
+        return sep if conteos[sep] > 0 else ","
+
+
+def detectar_formato(ruta: Path) -> dict:
+    """
+    Lee solo la cabeza del archivo y detecta BOM, codificación, separador
+    y la lista de columnas del encabezado.
+    El resultado se guarda por huella: una segunda llamada sobre el mismo
+    archivo sin cambios no vuelve a tocar el disco.
+    """
+    ruta  = Path(ruta)
+    clave = huella_archivo(ruta)
+
+    if clave in _CACHE_FORMATO:
+        return _CACHE_FORMATO[clave]
+
+    with open(ruta, "rb") as f:
+        muestra = f.read(TAMANO_MUESTRA)
+
+    encoding, bom = _detectar_codificacion(muestra)
+    texto = muestra.decode(encoding, errors="ignore")
+    sep   = _detectar_separador(texto)
+    encabezado = next(csv.reader(io.StringIO(texto), delimiter=sep), [])
+
+    formato = {"encoding": encoding, "sep": sep, "bom": bom, "encabezado": encabezado}
+    _CACHE_FORMATO[clave] = formato
+    registrar_encabezado(ruta.name, encabezado)
+
+    logger.info(
+        f"Formato detectado {ruta.name}: encoding={encoding} "
+        f"sep={sep!r} bom={'sí' if bom else 'no'}"
+    )
+    return formato
+
+
+def _confirmar_codificacion(ruta: Path) -> dict:
+    """
+    La muestra solo cubre los primeros TAMANO_MUESTRA bytes. Para leer
+    en streaming (donde un bloque ya entregado no se puede repetir) se
+    decodifica todo el archivo una vez: si aparecen bytes no utf-8 más
+    adelante, el formato guardado pasa a latin1 antes del primer bloque.
+    """
+    formato = detectar_formato(ruta)
+    if formato.get("confirmada") or not formato["encoding"].startswith("utf-8"):
+        return formato
+
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(TAMANO_LECTURA_BYTES), b""):
+                decodificador.decode(bloque, final=False)
+            decodificador.decode(b"", final=True)
+    except UnicodeDecodeError:
+        logger.warning(f"{Path(ruta).name}: bytes no utf-8 después de la muestra, se lee con latin1")
+        formato["encoding"] = "latin1"
+
+    formato["confirmada"] = True
+    return formato
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: LECTURA
+# ------------------------------------------------------------------
+def leer_csv(
+    ruta: Path,
+    usar_cache: bool = True,
+    columnas: dict = None,
+    filtros: list = None,
+    esquema: dict = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Lee un CSV de Wispro en una sola pasada con el motor C de pandas.
+    Los kwargs se pasan tal cual a pd.read_csv (dtype, ...).
+
+    columnas: {nombre_canonico: [alias, ...]}. Si se indica, solo se
+    parsean las columnas resueltas contra el encabezado y el resultado
+    sale con los nombres canónicos, en el orden declarado.
+
+    filtros: lista de predicados (columna_canonica, "en" | "no_en", [valores]).
+    La comparación es sobre el texto sin espacios y en minúsculas. El
+    archivo se lee por bloques de TAMANO_BLOQUE filas y cada bloque se
+    filtra antes de acumularse.
+
+    esquema: {columna_real: tipo} (ver procesadores/esquemas.py). Las
+    columnas declaradas se parsean como texto y, ya filtradas, se convierten
+    a category / string Arrow / Int64 / datetime. El caché conserva esos tipos.
+
+    Columnas, filtros, esquema y kwargs forman la clave del caché columnar.
+
+    Si la muestra era utf-8 válido pero el resto del archivo no lo es,
+    se reintenta una vez con latin1 y se corrige el formato guardado.
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        raise FileNotFoundError(f"No encontrado: {ruta}")
+
+    opciones = dict(kwargs, columnas=columnas, filtros=filtros, esquema=esquema)
+
+    if usar_cache:
+        df = leer_desde_cache(ruta, opciones)
+        if df is not None:
+            return df
+
+    resueltas = None
+    if columnas is not None:
+        encabezado = detectar_formato(ruta)["encabezado"]
+        resueltas  = resolver_columnas(encabezado, columnas)
+        kwargs["usecols"] = list(dict.fromkeys(resueltas.values()))
+        logger.info(
+            f"{ruta.name}: se leen {len(kwargs['usecols'])} "
+            f"de {len(encabezado)} columnas"
+        )
+
+    esquema = _preparar_esquema(esquema, resueltas, kwargs)
+
+    if filtros:
+        df = _leer_filtrado(ruta, resueltas, filtros, **kwargs)
+    else:
+        df = _proyectar(_parsear(ruta, **kwargs), resueltas)
+
+    if esquema:
+        df = aplicar_esquema(df, esquema)
+
+    if usar_cache:
+        guardar_en_cache(ruta, opciones, df)
+    return df
+
+
+def iterar_csv(
+    ruta: Path,
+    columnas: dict = None,
+    filtros: list = None,
+    esquema: dict = None,
+    tamano_bloque: int = TAMANO_BLOQUE,
+    **kwargs,
+):
+    """
+    Versión en streaming de leer_csv: genera el archivo en bloques de
+    `tamano_bloque` filas ya proyectados, filtrados y tipados, sin
+    acumularlos. Para tablas de hechos que no deben cargarse completas
+    (ver CsvMerger con por_bloques=True). No pasa por el caché columnar.
+    La codificación se confirma sobre todo el archivo antes del primer
+    bloque (no hay reintento posible a mitad de la generación).
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        raise FileNotFoundError(f"No encontrado: {ruta}")
+    _confirmar_codificacion(ruta)
+
+    resueltas = None
+    if columnas is not None:
+        resueltas = resolver_columnas(detectar_formato(ruta)["encabezado"], columnas)
+        kwargs["usecols"] = list(dict.fromkeys(resueltas.values()))
+
+    esquema = _preparar_esquema(esquema, resueltas, kwargs)
+
+    total      = 0
+    entregadas = 0
+    for bloque, leidas in _iterar_bloques(ruta, resueltas, filtros, tamano_bloque, **kwargs):
+        total += leidas
+        if bloque.empty:
+            continue
+        if esquema:
+            bloque = aplicar_esquema(bloque, esquema)
+        entregadas += len(bloque)
+        yield bloque
+
+    logger.info(f"{ruta.name}: lectura por bloques → {entregadas} de {total} filas")
+
+
+def _preparar_esquema(esquema: dict | None, resueltas: dict | None, kwargs: dict) -> dict | None:
+    """
+    Sin inferencia sobre las columnas declaradas (se parsean como texto):
+    la conversión la hace aplicar_esquema una vez, sobre las filas que
+    sobreviven. Retorna el esquema traducido a nombres canónicos.
+    """
+    if not esquema:
+        return esquema
+    if kwargs.get("dtype") is None:
+        kwargs["dtype"] = {col: str for col in esquema}
+    if resueltas is None:
+        return esquema
+    return {
+        canonica: esquema[real]
+        for canonica, real in resueltas.items() if real in esquema
+    }
+
+
+def _proyectar(df: pd.DataFrame, resueltas: dict | None) -> pd.DataFrame:
+    """
+    Renombra a nombres canónicos (en el orden declarado). Su salida se
+    cachea: si cambia, subir VERSION_PARSEO en procesadores/cache_columnar.py.
+    """
+    if resueltas is None:
+        return df
+    return pd.DataFrame(
+        {canonica: df[real] for canonica, real in resueltas.items()},
+        index=df.index,
+    )
+
+
+def _mascara_filtros(df: pd.DataFrame, filtros: list) -> pd.Series:
+    """Combina (AND) los predicados declarados sobre un bloque."""
+    mascara = pd.Series(True, index=df.index)
+
+    for columna, operador, valores in filtros:
+        if columna not in df.columns:
+            logger.warning(f"Filtro sobre columna inexistente '{columna}', se ignora")
+            continue
+        valores_norm = [str(v).strip().lower() for v in valores]
+        coincide = df[columna].astype("string").str.strip().str.lower().isin(valores_norm)
+        coincide = coincide.fillna(False).astype(bool)
+        mascara &= coincide if operador == "en" else ~coincide
+
+    return mascara
+
+
+def _iterar_bloques(
+    ruta: Path,
+    resueltas: dict | None,
+    filtros: list | None,
+    tamano_bloque: int = TAMANO_BLOQUE,
+    **kwargs,
+):
+    """Genera (bloque_proyectado_y_filtrado, filas_leídas) por cada bloque."""
+    with _parsear(ruta, chunksize=tamano_bloque, **kwargs) as lector:
+        for bloque in lector:
+            leidas = len(bloque)
+            bloque = _proyectar(bloque, resueltas)
+            if filtros:
+                bloque = bloque[_mascara_filtros(bloque, filtros)]
+            yield bloque, leidas
+
+
+def _acumular_bloques(ruta: Path, resueltas: dict | None, filtros: list, **kwargs) -> tuple:
+    bloques = []
+    total   = 0
+
+    for bloque, leidas in _iterar_bloques(ruta, resueltas, filtros, **kwargs):
+        total += leidas
+        bloques.append(bloque)
+
+    return bloques, total
+
+
+def _leer_filtrado(ruta: Path, resueltas: dict | None, filtros: list, **kwargs) -> pd.DataFrame:
+    """
+    Lectura en streaming: cada bloque se proyecta y se filtra antes de
+    guardarse, de modo que la memoria pico depende de TAMANO_BLOQUE y
+    de las filas que sobreviven, no del tamaño del archivo.
+    """
+    try:
+        bloques, total = _acumular_bloques(ruta, resueltas, filtros, **kwargs)
+    except UnicodeDecodeError:
+        formato = detectar_formato(ruta)
+        if formato["encoding"] == "latin1":
+            raise
+        logger.warning(f"{ruta.name}: bytes no utf-8 en un bloque, se reintenta con latin1")
+        formato["encoding"] = "latin1"
+        bloques, total = _acumular_bloques(ruta, resueltas, filtros, **kwargs)
+
+    if bloques:
+        df = pd.concat(bloques)
+    else:
+        df = _proyectar(_parsear(ruta, nrows=0, **kwargs), resueltas)
+
+    logger.info(f"{ruta.name}: filtro en lectura → {len(df)} de {total} filas")
+    return df
+
+
+def _parsear(ruta: Path, **kwargs) -> pd.DataFrame:
+    formato = detectar_formato(ruta)
+
+    try:
+        return pd.read_csv(
+            ruta,
+            sep=formato["sep"],
+            encoding=formato["encoding"],
+            engine="c",
+            **kwargs,
+        )
+    except UnicodeDecodeError:
+        if formato["encoding"] == "latin1":
+            raise
+        logger.warning(
+            f"{ruta.name}: bytes no utf-8 después de la muestra, "
+            "se reintenta con latin1"
+        )
+        formato["encoding"] = "latin1"
+        return pd.read_csv(
+            ruta,
+            sep=formato["sep"],
+            encoding="latin1",
+            engine="c",
+            **kwargs,
+        )
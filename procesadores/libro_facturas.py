@@ -0,0 +1,143 @@
+# procesadores/libro_facturas.py
+"""
+Libro de facturas: todas las facturas vistas en los exports de Wispro.
+
+Cada export wispro_facturas_*.csv trae una ventana de facturas que se
+solapa con la anterior; si el reporte usa solo el último export, el
+historial de pagos que ya salió de la ventana se pierde. El libro guarda
+UNA fila por factura con la versión más nueva vista y se alimenta de
+todos los exports del catálogo (reglas de ingreso y de fecha en
+procesadores/almacen_exports.py):
+
+  - llave: ID CLIENTE | ID CONTRATO | PERIODO_FACTURADO |
+           PRIMER VENCIMIENTO | SEGUNDO VENCIMIENTO
+  - Pendiente → Pagado es una actualización de la misma fila, no una
+    factura nueva; reingresar un export viejo corregido no devuelve a
+    Pendiente lo que un export más nuevo ya trae Pagado
+  - las anuladas se conservan (un cambio a Anulado también es una
+    actualización); el reporte las excluye. Si un mismo export trae una
+    anulada y una vigente con la misma llave, queda la vigente
+
+Las columnas se guardan como texto, tal como vienen en el export, junto
+con PERIODO_FACTURADO. La tabla vive en datos/procesados/facturacion/
+(Parquet o pickle) junto con facturas_exports.json.
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.almacen_exports import EXPORT, FECHA, HASH, AlmacenExports
+from procesadores.esquemas import parsear_fechas
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_ENTRADA = Path("datos/entrada/wispro")
+RUTA_LIBRO   = Path("datos/procesados/facturacion")
+
+LLAVE   = "LLAVE_FACTURA"
+PERIODO = "PERIODO_FACTURADO"
+ESTADO  = "ESTADO FACTURA"
+
+# Columnas propias del libro (no vienen del export)
+COLUMNAS_INTERNAS = [LLAVE, HASH, EXPORT, FECHA]
+
+# Cambia si cambia la forma de calcular la llave o el período
+VERSION_LLAVE = 1
+
+_PATRON_PERIODO = r"(\d{4}-\d{2})-\d{2}"
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: LLAVE DE FACTURA
+# ------------------------------------------------------------------
+def periodo_facturado(df: pd.DataFrame) -> pd.Series:
+    """
+    Mes facturado (YYYY-MM) desde DETALLES ('2026-04-01 - 2026-04-30');
+    si no trae período, el mes de FECHA EMISIÓN; "" si no hay ninguno.
+    """
+    periodo = df["DETALLES"].astype(str).str.extract(_PATRON_PERIODO, expand=False)
+    emision = parsear_fechas(df["FECHA EMISIÓN"]).dt.strftime("%Y-%m")
+    return periodo.fillna(emision).fillna("").astype(object)
+
+
+def _fecha_llave(serie: pd.Series) -> pd.Series:
+    return parsear_fechas(serie).dt.strftime("%Y-%m-%d").fillna("").astype(object)
+
+
+def llave_factura(df: pd.DataFrame) -> pd.Series:
+    """ID CLIENTE|ID CONTRATO|YYYY-MM|primer venc.|segundo venc. (fechas ISO)."""
+    partes = [
+        df["ID CLIENTE"].astype(str).str.strip(),
+        df["ID CONTRATO"].astype(str).str.strip(),
+        df[PERIODO],
+        _fecha_llave(df["PRIMER VENCIMIENTO"]),
+        _fecha_llave(df["SEGUNDO VENCIMIENTO"]),
+    ]
+    return partes[0].str.cat(partes[1:], sep="|").astype(object)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: LIBRO
+# ------------------------------------------------------------------
+class LibroFacturas(AlmacenExports):
+    """
+    Uso:
+        libro = LibroFacturas(COLUMNAS_FACTURAS).cargar()
+        libro.ingerir(al="2026-04-30")     # facturas a esa fecha
+        libro.facturas                     # DataFrame, una fila por factura
+
+    `columnas` es {canónica: [alias]} y debe incluir las columnas de la
+    llave (ID CLIENTE, ID CONTRATO, vencimientos, DETALLES y FECHA EMISIÓN).
+    """
+
+    TIPO        = "facturas"
+    ARCHIVO     = "facturas"
+    DESCRIPCION = "Libro de facturas"
+    VERSION     = VERSION_LLAVE
+
+    def __init__(
+        self,
+        columnas: dict,
+        ruta_entrada: Path = RUTA_ENTRADA,
+        ruta_libro: Path = RUTA_LIBRO,
+    ):
+        requeridas = {"ID CLIENTE", "ID CONTRATO", "PRIMER VENCIMIENTO", "SEGUNDO VENCIMIENTO", "DETALLES", "FECHA EMISIÓN"}
+        faltantes  = requeridas - set(columnas)
+        if faltantes:
+            raise ValueError(f"Las columnas del libro de facturas deben incluir: {sorted(faltantes)}")
+        super().__init__(columnas, LLAVE, ruta_entrada=ruta_entrada, ruta_almacen=ruta_libro)
+
+    @property
+    def ruta_libro(self) -> Path:
+        return self.ruta_almacen
+
+    @property
+    def facturas(self) -> pd.DataFrame:
+        return self.tabla
+
+    def _preparar(self, df: pd.DataFrame, ruta: Path) -> pd.DataFrame:
+        """Texto sin espacios, PERIODO_FACTURADO y la llave de factura como primera columna."""
+        df = df.apply(lambda serie: serie.astype(str).str.strip()).astype(object)
+
+        sin_cliente = df["ID CLIENTE"] == ""
+        if sin_cliente.any():
+            logger.warning(f"{ruta.name}: {int(sin_cliente.sum())} factura(s) sin ID CLIENTE, se omiten")
+            df = df[~sin_cliente]
+
+        df[PERIODO] = periodo_facturado(df)
+        df.insert(0, LLAVE, llave_factura(df))
+
+        # Dentro de un mismo export, una anulada no tapa a la factura
+        # vigente con la misma llave (reversión + reemisión): las anuladas
+        # van primero y gana la última vigente
+        if ESTADO in df.columns:
+            anulada = df[ESTADO].str.upper() == "ANULADO"
+            df = pd.concat([df[anulada], df[~anulada]])
+        return df
@@ -0,0 +1,141 @@
+# procesadores/normalizacion.py
+"""
+Kernels de normalización compartidos por todas las etapas.
+
+Cada función recibe una columna completa (Series) y retorna otra del
+mismo índice, con texto plano (object) y "" para faltantes. Las regex se
+compilan una sola vez aquí; ningún módulo vuelve a escribir su propia
+limpieza de teléfonos, cédulas, emails o nombres fila por fila.
+
+Así el email / la cédula que guarda el informe semanal en el registro
+es exactamente la misma llave que buscan facturación y tickets.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: PATRONES COMPILADOS
+# ------------------------------------------------------------------
+_INVALIDOS        = ["", "nan", "none", "null", "nat", "<na>"]
+_SUFIJO_FLOAT     = re.compile(r"\.0$")
+_SEPARADOR_TELS   = re.compile(r"\s+-\s+|[/,;]")       # "3043721025 - +573188578152"
+_RUIDO_TELEFONO   = re.compile(r"[\s\-().+]")
+_PREFIJO_57       = re.compile(r"57\d{10}")
+_RUIDO_CEDULA     = re.compile(r"[\s.,\-]")
+_PREFIJO_CUENTA   = re.compile(r"^M-\d+\s*")
+_NO_ALFANUMERICO  = re.compile(r"[^A-Z0-9]+")
+_ESPACIOS         = re.compile(r"\s+")
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: TEXTO BASE
+# ------------------------------------------------------------------
+def texto_valido(serie: pd.Series) -> pd.Series:
+    """
+    Texto sin espacios en los extremos. NaN, "", "nan", "None", ... y los
+    ceros de columnas numéricas quedan como "".
+    """
+    texto    = serie.astype(str).str.strip()
+    invalido = serie.isna() | texto.str.lower().isin(_INVALIDOS)
+
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        invalido |= (serie == 0).fillna(False).astype(bool)
+
+    return texto.where(~invalido, "").fillna("").astype(object)
+
+
+def normalizar_texto(serie: pd.Series) -> pd.Series:
+    """Sin tildes, en mayúsculas, solo letras/dígitos y espacios simples."""
+    texto = texto_valido(serie).astype(str)
+    texto = texto.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    texto = texto.str.upper().str.replace(_NO_ALFANUMERICO, " ", regex=True)
+    return texto.str.replace(_ESPACIOS, " ", regex=True).str.strip().astype(object)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: KERNELS POR TIPO DE DATO
+# ------------------------------------------------------------------
+def normalizar_telefonos(serie: pd.Series) -> pd.Series:
+    """
+    Teléfonos colombianos a 10 dígitos:
+        573152158424.0   →  3152158424
+        57 315 215 8424  →  3152158424
+        +573152158424    →  3152158424
+        3152158424 - +573188578152  →  3152158424  (se toma el primero)
+    """
+    tel = texto_valido(serie).astype(str)
+    tel = tel.str.split(_SEPARADOR_TELS, n=1, regex=True).str[0].str.strip()
+    tel = tel.str.replace(_SUFIJO_FLOAT, "", regex=True)
+    tel = tel.str.replace(_RUIDO_TELEFONO, "", regex=True)
+
+    # Quitar prefijo 57 solo si el resultado tiene 12 dígitos (57 + 10)
+    con_prefijo = tel.str.fullmatch(_PREFIJO_57)
+    return tel.where(~con_prefijo, tel.str[2:]).astype(object)
+
+
+def normalizar_cedulas(serie: pd.Series) -> pd.Series:
+    """
+    Cédulas como texto de dígitos:
+        1085896121.0     →  1085896121
+        1.085.896.121    →  1085896121
+        nan              →  ""
+    """
+    ced = texto_valido(serie).astype(str)
+    ced = ced.str.replace(_SUFIJO_FLOAT, "", regex=True)
+    return ced.str.replace(_RUIDO_CEDULA, "", regex=True).astype(object)
+
+
+def normalizar_contratos(serie: pd.Series) -> pd.Series:
+    """
+    ID CONTRATO de Wispro como texto de dígitos:
+        1543.0           →  1543
+        " 1543 "         →  1543
+    """
+    return texto_valido(serie).astype(str).str.replace(_SUFIJO_FLOAT, "", regex=True).astype(object)
+
+
+def normalizar_emails(serie: pd.Series) -> pd.Series:
+    """Email sin espacios y en minúsculas ("" si falta)."""
+    return texto_valido(serie).astype(str).str.replace(_ESPACIOS, "", regex=True).str.lower().astype(object)
+
+
+def separar_nombres(serie: pd.Series) -> pd.DataFrame:
+    """
+    Separa "nombre completo" en NOMBRE / APELLIDO (sin prefijos M-XXXX):
+        1 palabra  → Nombre = palabra,  Apellido = ""
+        2 palabras → Nombre = [0],      Apellido = [1]
+        3 palabras → Nombre = [0][1],   Apellido = [2]
+        4+ palabras→ Nombre = [0][1],   Apellido = resto
+    """
+    limpio   = texto_valido(serie).astype(str).str.replace(_PREFIJO_CUENTA, "", regex=True)
+    palabras = limpio.str.split()
+    n        = palabras.str.len().to_numpy()
+
+    p0    = palabras.str[0].fillna("")
+    p1    = palabras.str[1].fillna("")
+    resto = palabras.str[2:].str.join(" ").fillna("")
+
+    nombre   = np.where(n <= 2, p0, p0 + " " + p1)
+    apellido = np.select([n <= 1, n == 2], ["", p1], default=resto)
+
+    return pd.DataFrame(
+        {"NOMBRE": nombre, "APELLIDO": apellido},
+        index=serie.index,
+        dtype=object,
+    )
+
+
+def normalizar_llaves(indice: dict, kernel) -> dict:
+    """Aplica un kernel a las llaves de un índice {llave: valor} del registro."""
+    if not indice:
+        return {}
+    llaves = kernel(pd.Series(list(indice.keys()), dtype=object))
+    return {
+        llave: valor
+        for llave, valor in zip(llaves, indice.values())
+        if llave
+    }
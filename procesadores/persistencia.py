@@ -0,0 +1,94 @@
+# procesadores/persistencia.py
+"""
+Tablas persistidas con su meta JSON (almacenes de exports, historial
+temporal, caché de facturación).
+
+Cada tabla se guarda como Parquet (o pickle si no hay pyarrow) junto a
+un <nombre>.json con lo que el módulo necesita para decidir si la tabla
+sigue sirviendo (columnas, firma, exports aplicados, ...). Las dos
+escrituras son atómicas (temporal + os.replace) y la meta lleva el hash
+de la tabla que describe: si una corrida se corta entre las dos, la meta
+vieja no coincide con la tabla nueva y la lectura falla en vez de
+confiar en huellas que no corresponden.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from procesadores.cache_columnar import PARQUET_DISPONIBLE, hash_contenido
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+EXTENSION    = "parquet" if PARQUET_DISPONIBLE else "pkl"
+CAMPO_HUELLA = "huella_tabla"      # sha256 de la tabla, dentro de la meta
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: ESCRITURA
+# ------------------------------------------------------------------
+def ruta_tabla(carpeta: Path, nombre: str) -> Path:
+    """<carpeta>/<nombre>.parquet (o .pkl sin pyarrow)."""
+    return Path(carpeta) / f"{nombre}.{EXTENSION}"
+
+
+def _reemplazar(ruta: Path, escribir):
+    """Escribe en un temporal único de la misma carpeta y lo renombra."""
+    with tempfile.NamedTemporaryFile(dir=ruta.parent, prefix=f"{ruta.name}.", suffix=".tmp", delete=False) as archivo:
+        temporal = Path(archivo.name)
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except BaseException:
+        temporal.unlink(missing_ok=True)
+        raise
+
+
+def guardar_tabla(tabla: pd.DataFrame, ruta: Path, meta: dict, ruta_meta: Path):
+    """
+    Guarda la tabla y después su meta (con el hash de la tabla). Si se
+    corta en medio, la meta que queda no coincide y leer_tabla falla.
+    """
+    ruta, ruta_meta = Path(ruta), Path(ruta_meta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    if PARQUET_DISPONIBLE:
+        _reemplazar(ruta, lambda temporal: tabla.to_parquet(temporal, index=False))
+    else:
+        _reemplazar(ruta, lambda temporal: tabla.to_pickle(temporal))
+
+    texto = json.dumps({**meta, CAMPO_HUELLA: hash_contenido(ruta)}, ensure_ascii=False, indent=2)
+    _reemplazar(ruta_meta, lambda temporal: temporal.write_text(texto, encoding="utf-8"))
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: LECTURA
+# ------------------------------------------------------------------
+def leer_meta(ruta_meta: Path) -> dict | None:
+    """Meta guardada, o None si no existe. Lanza excepción si es ilegible."""
+    ruta_meta = Path(ruta_meta)
+    if not ruta_meta.exists():
+        return None
+    return json.loads(ruta_meta.read_text(encoding="utf-8"))
+
+
+def leer_tabla(ruta: Path, meta: dict) -> pd.DataFrame:
+    """
+    Tabla guardada junto a `meta` (la de leer_meta). Lanza excepción si
+    falta, es ilegible o no es la que la meta describe.
+    """
+    ruta = Path(ruta)
+    if meta.get(CAMPO_HUELLA) != hash_contenido(ruta):
+        raise ValueError(f"{ruta.name} no corresponde a su meta (escritura interrumpida)")
+    if PARQUET_DISPONIBLE:
+        return pd.read_parquet(ruta)
+    return pd.read_pickle(ruta)
@@ -0,0 +1,67 @@
+# procesadores/reloj.py
+"""
+Reloj del pipeline ("as-of clock").
+
+Todos los módulos piden la fecha actual aquí en vez de usar
+datetime.now() / pd.Timestamp.today(). En una corrida normal es la hora
+del sistema; en un backfill (ver backfill.py) se fija la fecha de corte
+y todo el pipeline se comporta como si corriera ese día: nombres de
+archivo, estados por vencimiento y selección de exports en el catálogo.
+
+La fecha fijada es del proceso: el backfill corre cada fecha de corte
+en su propio proceso o en orden, nunca dos fechas en el mismo proceso
+a la vez.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: ESTADO
+# ------------------------------------------------------------------
+_FECHA_CORTE = None          # datetime fijado, o None = hora del sistema
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: CONSULTAS
+# ------------------------------------------------------------------
+def ahora() -> datetime:
+    """Fecha y hora "actual" del pipeline."""
+    if _FECHA_CORTE is None:
+        return datetime.now()
+    return _FECHA_CORTE
+
+
+def hoy() -> pd.Timestamp:
+    """Día actual del pipeline, normalizado a medianoche."""
+    return pd.Timestamp(ahora()).normalize()
+
+
+def fecha_de_corte():
+    """Fecha fijada (date) o None si el pipeline corre con la hora del sistema."""
+    if _FECHA_CORTE is None:
+        return None
+    return _FECHA_CORTE.date()
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: FIJAR LA FECHA
+# ------------------------------------------------------------------
+@contextmanager
+def corte_en(fecha):
+    """
+    Fija la fecha de corte mientras dure el bloque:
+
+        with corte_en("2026-04-13"):
+            generar_reporte_facturacion()
+    """
+    global _FECHA_CORTE
+    anterior = _FECHA_CORTE
+    _FECHA_CORTE = pd.Timestamp(fecha).normalize().to_pydatetime()
+    try:
+        yield _FECHA_CORTE
+    finally:
+        _FECHA_CORTE = anterior
@@ -0,0 +1,168 @@
+# procesadores/resolvedor_cuentas.py
+"""
+Resolución de ID CUENTA (A 0000#) por varias llaves.
+
+El informe semanal guarda en registro_procesados.json un índice
+{llave: ID CUENTA} por tipo de llave (email, cédula, ID CONTRATO,
+teléfono). Facturación y tickets construyen UN resolvedor por corrida
+con esos índices ya normalizados (procesadores/normalizacion.py) y le
+pasan el DataFrame completo de llaves candidatas: cada columna se cruza
+con su índice en una sola operación vectorizada, sin recorrer filas.
+
+Prioridad: email → cédula → ID CONTRATO → teléfono. Dentro de un tipo,
+las columnas en el orden dado; dentro de una columna, las filas en orden.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from procesadores.normalizacion import (
+    normalizar_cedulas,
+    normalizar_contratos,
+    normalizar_emails,
+    normalizar_llaves,
+    normalizar_telefonos,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 1: CONFIGURACIÓN
+# ------------------------------------------------------------------
+RUTA_REGISTRO = Path("datos/procesados/modelo_contrato/registro_procesados.json")
+
+# tipo de llave → (clave del índice en el registro, kernel de normalización)
+LLAVES = {
+    "email":    ("indice_email",    normalizar_emails),
+    "cedula":   ("indice_cedula",   normalizar_cedulas),
+    "contrato": ("indice_contrato", normalizar_contratos),
+    "telefono": ("indice_telefono", normalizar_telefonos),
+}
+
+COLUMNAS_RESULTADO = ["id_cuenta", "llave", "valor"]
+
+
+# ------------------------------------------------------------------
+# BLOQUE 2: RESOLVEDOR
+# ------------------------------------------------------------------
+class ResolvedorCuentas:
+    """
+    Uso:
+        resolvedor = ResolvedorCuentas.desde_registro(ruta_registro)
+
+        # una fila por ticket
+        resuelto = resolvedor.resolver(df, {"email": ["Email"], "telefono": ["Teléfono", "Movil"]})
+
+        # una fila por cliente (primera llave del grupo que resuelve)
+        resuelto = resolvedor.resolver(df, {"email": ["EMAIL"], "cedula": ["DOCUMENTO/CÉDULA"]},
+                                       por=df["ID CLIENTE"])
+
+        resuelto["id_cuenta"]   # "A 000123" o ""
+        resuelto["llave"]       # tipo que resolvió: "email", "cedula", ... o ""
+        resuelto["valor"]       # llave normalizada que coincidió
+    """
+
+    def __init__(self, indices: dict):
+        # Un índice hash (Series llave → ID CUENTA) por tipo de llave
+        self.indices = {
+            tipo: pd.Series(indices.get(tipo, {}), dtype=object)
+            for tipo in LLAVES
+        }
+
+    @classmethod
+    def desde_registro(cls, ruta_registro: Path = RUTA_REGISTRO) -> "ResolvedorCuentas":
+        """Lee los índices del registro una vez y normaliza sus llaves."""
+        ruta_registro = Path(ruta_registro)
+        if not ruta_registro.exists():
+            logger.warning(f"Registro no encontrado ({ruta_registro}): no se resolverán ID CUENTA")
+            return cls({})
+
+        with open(ruta_registro, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        indices = {
+            tipo: normalizar_llaves(data.get(clave, {}), kernel)
+            for tipo, (clave, kernel) in LLAVES.items()
+        }
+        resolvedor = cls(indices)
+        logger.info(
+            "Índices de ID CUENTA cargados: "
+            + " | ".join(f"{tipo}: {len(indice)}" for tipo, indice in resolvedor.indices.items())
+        )
+        return resolvedor
+
+    def firma(self) -> str:
+        """SHA-256 de los índices: cambia si cambia alguna llave o su ID CUENTA."""
+        contenido = {tipo: indice.sort_index().to_dict() for tipo, indice in self.indices.items()}
+        return hashlib.sha256(
+            json.dumps(contenido, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def cuentas(self) -> list:
+        """Todos los ID CUENTA presentes en algún índice, ordenados."""
+        return sorted(set().union(*(set(indice) for indice in self.indices.values())))
+
+    def resolver(self, df: pd.DataFrame, columnas: dict, por: pd.Series | None = None) -> pd.DataFrame:
+        """
+        Cruza en lote las columnas candidatas de `df` con los índices.
+
+        columnas: {tipo: [columna, ...]} con tipos de LLAVES; columnas
+        ausentes en df se ignoran. Los valores se normalizan aquí.
+        por: Series (mismo índice que df) con el grupo de cada fila; si
+        se indica, retorna una fila por grupo (en orden de aparición),
+        si no, una fila por fila de df (mismo índice).
+        """
+        grupos   = por.to_numpy() if por is not None else np.arange(len(df))
+        posicion = np.arange(len(df))
+
+        partes = []
+        rango  = 0
+        for tipo, (_, kernel) in LLAVES.items():
+            indice = self.indices[tipo]
+            for col in columnas.get(tipo, []):
+                if col not in df.columns or indice.empty:
+                    continue
+                valores   = kernel(df[col])
+                id_cuenta = valores.map(indice)
+                hallado   = id_cuenta.notna().to_numpy()
+                partes.append(pd.DataFrame({
+                    "grupo":     grupos[hallado],
+                    "rango":     rango,
+                    "posicion":  posicion[hallado],
+                    "id_cuenta": id_cuenta.to_numpy()[hallado],
+                    "llave":     tipo,
+                    "valor":     valores.to_numpy()[hallado],
+                }))
+                rango += 1
+
+        unicos = pd.unique(grupos) if por is not None else posicion
+        if partes:
+            largo = pd.concat(partes, ignore_index=True).sort_values(["rango", "posicion"], kind="stable")
+            resuelto = (
+                largo.drop_duplicates("grupo")
+                .set_index("grupo")[COLUMNAS_RESULTADO]
+                .reindex(unicos)
+                .fillna("")
+            )
+        else:
+            resuelto = pd.DataFrame("", index=unicos, columns=COLUMNAS_RESULTADO)
+
+        resuelto.index = pd.Index(unicos, name=por.name) if por is not None else df.index
+        return resuelto.astype(object)
+
+
+# ------------------------------------------------------------------
+# BLOQUE 3: RESUMEN PARA LOGS
+# ------------------------------------------------------------------
+def resumen_por_llave(resuelto: pd.DataFrame) -> str:
+    """"email: 40 | telefono: 3 | sin cuenta: 2" a partir de resolver()."""
+    conteo = resuelto["llave"].replace("", "sin cuenta").value_counts()
+    orden  = [tipo for tipo in [*LLAVES, "sin cuenta"] if tipo in conteo.index]
+    return " | ".join(f"{tipo}: {int(conteo[tipo])}" for tipo in orden)
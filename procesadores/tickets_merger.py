@@ -3,20 +3,26 @@
 # Genera el Excel contractual de PQRS (Calidad del Servicio).
 # Formato: INFORMACION-A-REGISTRAR-POR-EL-ISP — hoja "PQRS"
 # Estructura: filas = ID CUENTA | columnas = MES 1..24 × 5 subcategorías
-# Fuente: CSV exportado desde Wispro (mesa de ayuda)
+# Fuente: CSV exportados desde Wispro (mesa de ayuda), acumulados en el
+#         almacén de tickets (procesadores/almacen_tickets.py)
 # ------------------------------------------------------------------
 
 import json
 import logging
-import re
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
 from openpyxl.utils import get_column_letter
 
+from procesadores.almacen_tickets import AlmacenTickets
+from procesadores.cubo_pqrs import RUTA_CUBO, CuboPQRS
+from procesadores.reloj import ahora, fecha_de_corte
+from procesadores.resolvedor_cuentas import ResolvedorCuentas, resumen_por_llave
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,7 @@ logger = logging.getLogger(__name__)
 RUTA_ENTRADA_WISPRO = Path("datos/entrada/wispro")          # ← cambia
 RUTA_REGISTRO       = Path("datos/procesados/modelo_contrato/registro_procesados.json")
 RUTA_SALIDA         = Path("salidas/tickets")
+RUTA_ALMACEN        = Path("datos/procesados/tickets")
 
 # Fecha de inicio del contrato → MES 1
 CONTRATO_INICIO  = datetime(2025, 12, 1)
@@ -57,6 +64,22 @@ MAPA_CATEGORIA = {
     "cambio de dirección":     "traslado",
 }
 
+# Columnas del export de mesa de ayuda que usa este módulo {canónica: [alias]}
+COLUMNAS_TICKETS = {
+    "Número del ticket": ["Número del ticket", "Numero del ticket", "N° ticket"],
+    "Email":             ["Email", "Correo"],
+    "Teléfono":          ["Teléfono", "Telefono"],
+    "Movil":             ["Movil", "Móvil", "Celular"],
+    "Creado el":         ["Creado el", "Fecha de creación"],
+    "Categoria":         ["Categoria", "Categoría"],
+}
+
+# Llaves candidatas de cada ticket para el resolvedor de ID CUENTA
+LLAVES_TICKET = {
+    "email":    ["Email"],
+    "telefono": ["Teléfono", "Movil"],
+}
+
 SUBCOLS = ["pqr", "disponibilidad", "velocidad", "falla_cpe", "traslado"]
 
 SUBCOLS_LABELS = {
@@ -67,6 +90,11 @@ SUBCOLS_LABELS = {
     "traslado":       "Solicitud de\ntraslado",
 }
 
+# Columnas de la matriz PQRS en el orden del Excel: (mes, subcategoría)
+COLUMNAS_MATRIZ = pd.MultiIndex.from_product(
+    [range(1, CONTRATO_MESES + 1), SUBCOLS], names=["mes", "subcol"]
+)
+
 ENCABEZADO_INFO = {
     "razon_social":  "EMPRESA MUNICIPAL DE TELECOMUNICACIONES DE IPIALES UNIMOS S.A E.S.P",
     "municipio":     "IPIALES",
@@ -76,6 +104,87 @@ ENCABEZADO_INFO = {
 }
 
 
+# ---- Estilos del Excel PQRS (uno por tipo de celda, compartidos) ----
+AZUL_HEADER = "1F4E79"
+AZUL_MEDIO  = "2E75B6"
+AZUL_CLARO  = "DCE6F1"
+BLANCO      = "FFFFFF"
+
+_BORDE_FINO  = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+_ALIN_CENTRO = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_ALIN_IZQ    = Alignment(horizontal="left",   vertical="center", wrap_text=True)
+
+# nombre → (fuente, color de relleno o None, alineación)
+ESTILOS_PQRS = {
+    "pqrs_institucional":  (Font(bold=True, color="000000", size=9),  None,        _ALIN_IZQ),
+    "pqrs_titulo":         (Font(bold=True, color="FFFFFF", size=11), AZUL_HEADER, _ALIN_CENTRO),
+    "pqrs_cabecera_impar": (Font(bold=True, color="FFFFFF", size=9),  AZUL_HEADER, _ALIN_CENTRO),
+    "pqrs_cabecera_par":   (Font(bold=True, color="FFFFFF", size=9),  AZUL_MEDIO,  _ALIN_CENTRO),
+    "pqrs_cuenta_par":     (Font(bold=True, color="000000", size=9),  AZUL_CLARO,  _ALIN_CENTRO),
+    "pqrs_cuenta_impar":   (Font(bold=True, color="000000", size=9),  BLANCO,      _ALIN_CENTRO),
+    "pqrs_dato_par":       (Font(size=9),                             AZUL_CLARO,  _ALIN_CENTRO),
+    "pqrs_dato_impar":     (Font(size=9),                             BLANCO,      _ALIN_CENTRO),
+}
+
+
+def _registrar_estilos(wb: Workbook):
+    """Registra ESTILOS_PQRS como estilos con nombre del libro."""
+    for nombre, (fuente, relleno, alineacion) in ESTILOS_PQRS.items():
+        estilo = NamedStyle(name=nombre, font=fuente, alignment=alineacion, border=_BORDE_FINO)
+        if relleno:
+            estilo.fill = PatternFill("solid", fgColor=relleno)
+        wb.add_named_style(estilo)
+
+
+def _mes_del_contrato(creado: pd.Series) -> pd.Series:
+    """
+    Mes contractual (1..CONTRATO_MESES) de cada fecha "dd/mm/aaaa ...";
+    0 si falta, no es una fecha válida o cae fuera del contrato.
+    """
+    partes = creado.astype(str).str.extract(r"(\d{2})/(\d{2})/(\d{4})")
+    fechas = pd.to_datetime(
+        partes[2] + "-" + partes[1] + "-" + partes[0],
+        format="%Y-%m-%d", errors="coerce",
+    )
+    delta = (
+        (fechas.dt.year - CONTRATO_INICIO.year) * 12
+        + (fechas.dt.month - CONTRATO_INICIO.month) + 1
+    )
+    delta = delta.where(delta.between(1, CONTRATO_MESES))
+    return delta.fillna(0).astype(int)
+
+
+def derivar_columnas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columnas que el almacén calcula y guarda al ingresar cada ticket:
+    - mes_numero  : 1-24 según fecha de creación vs. inicio del contrato
+    - categoria   : una de las 5 subcategorías contractuales
+    """
+    # Mes del contrato: dd/mm/aaaa → meses desde CONTRATO_INICIO (+1)
+    mes_numero = _mes_del_contrato(df["Creado el"])
+
+    # Categoría contractual (default: disponibilidad)
+    categoria = (
+        df["Categoria"].astype(str).str.strip().str.lower()
+        .map(MAPA_CATEGORIA)
+        .fillna("disponibilidad")
+        .astype(object)
+    )
+    return pd.DataFrame({"mes_numero": mes_numero, "categoria": categoria}, index=df.index)
+
+
+# Si cambia el contrato o el mapa de categorías, el almacén recalcula las derivadas
+FIRMA_DERIVADOS = json.dumps(
+    [CONTRATO_INICIO.isoformat(), CONTRATO_MESES, sorted(MAPA_CATEGORIA.items())],
+    ensure_ascii=False,
+)
+
+
 class TicketsMerger:
 
     def __init__(
@@ -83,113 +192,62 @@ class TicketsMerger:
         ruta_entrada:  Path = RUTA_ENTRADA_WISPRO,          # ← cambia
         ruta_registro: Path = RUTA_REGISTRO,
         ruta_salida:   Path = RUTA_SALIDA,
+        ruta_almacen:  Path = RUTA_ALMACEN,
+        resolvedor:    ResolvedorCuentas | None = None,
     ):
         self.ruta_entrada  = Path(ruta_entrada)              # ← cambia
         self.ruta_registro = Path(ruta_registro)
+        self.resolvedor    = resolvedor
         self.ruta_salida   = Path(ruta_salida)
         self.ruta_salida.mkdir(parents=True, exist_ok=True)
-        self.ruta_csv = self._resolver_ruta_csv()            # ← nuevo
-
-    def _resolver_ruta_csv(self) -> Path:
-        """
-        Detecta automáticamente el CSV de tickets más reciente.
-        Acepta cualquier archivo con patrón: wispro_tickets_*.csv
-        El más reciente por nombre (fecha en sufijo) tiene prioridad.
-        """
-        candidatos = sorted(
-            self.ruta_entrada.glob("wispro_tickets_*.csv"),
-            reverse=True
+        self.almacen = AlmacenTickets(
+            COLUMNAS_TICKETS,
+            derivar_columnas,
+            firma_derivados=FIRMA_DERIVADOS,
+            ruta_entrada=self.ruta_entrada,
+            ruta_almacen=ruta_almacen,
         )
-        if candidatos:
-            logger.info(f"CSV de tickets detectado: {candidatos[0].name}")
-            return candidatos[0]
-
-        # Fallback nombre fijo
-        return self.ruta_entrada / "wispro_tickets.csv"
 
     # ------------------------------------------------------------------
-    # BLOQUE 2: CARGA DEL ÍNDICE EMAIL → ID CUENTA
+    # BLOQUE 2: RESOLVEDOR DE ID CUENTA
     # ------------------------------------------------------------------
-    def _cargar_indice_email(self) -> dict:
+    def _cargar_resolvedor(self) -> ResolvedorCuentas:
         """
-        Lee indice_email desde registro_procesados.json.
-        Retorna dict {email_lower: id_cuenta}.
+        Resolvedor compartido de la corrida (main.py lo pasa ya construido)
+        o, si no se indicó, uno nuevo con los índices del registro. Sin
+        registro, los tickets se generan sin ID CUENTA.
         """
-        if not self.ruta_registro.exists():
-            logger.warning(
-                "registro_procesados.json no encontrado. "
-                "Los tickets se generarán sin ID CUENTA."
-            )
-            return {}
-
-        with open(self.ruta_registro, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        indice = data.get("indice_email", {})
-        logger.info(f"Índice email cargado: {len(indice)} entradas")
-        return indice
+        if self.resolvedor is None:
+            self.resolvedor = ResolvedorCuentas.desde_registro(self.ruta_registro)
+        return self.resolvedor
 
     # ------------------------------------------------------------------
-    # BLOQUE 3: LECTURA DEL CSV
+    # BLOQUE 3: TICKETS DEL ALMACÉN
     # ------------------------------------------------------------------
-    def _leer_csv(self) -> pd.DataFrame:
+    def _cargar_tickets(self) -> pd.DataFrame:
         """
-        Lee el CSV de tickets exportado desde Wispro.
-        Normaliza columnas eliminando espacios extra.
+        Ingresa al almacén los exports de tickets nuevos o modificados
+        (hasta la fecha de corte) y retorna todos los tickets guardados,
+        con mes_numero y categoria ya calculados al ingresar.
         """
-        if not self.ruta_csv.exists():
-            raise FileNotFoundError(
-                f"CSV de tickets no encontrado: {self.ruta_csv}\n"
-                "Exporta desde Wispro → Mesa de ayuda → Exportar."
-            )
-
-        df = pd.read_csv(
-            self.ruta_csv,
-            encoding="utf-8",
-            sep=",",
-            dtype=str,
-        ).fillna("")
-
-        df.columns = [c.strip() for c in df.columns]
-        logger.info(f"CSV cargado: {len(df)} tickets")
+        df = self.almacen.cargar().ingerir(al=fecha_de_corte())
+        logger.info(f"Tickets en el almacén: {len(df)}")
         return df
 
     # ------------------------------------------------------------------
-    # BLOQUE 4: ENRIQUECIMIENTO (ID CUENTA + MES + CATEGORÍA)
+    # BLOQUE 4: ENRIQUECIMIENTO (ID CUENTA)
     # ------------------------------------------------------------------
-    def _enriquecer(self, df: pd.DataFrame, indice_email: dict) -> pd.DataFrame:
+    def _enriquecer(self, df: pd.DataFrame, resolvedor: ResolvedorCuentas) -> pd.DataFrame:
         """
-        Agrega tres columnas calculadas:
-        - id_cuenta   : cruzado por email desde el índice
-        - mes_numero  : 1-24 según fecha de creación vs. inicio del contrato
-        - categoria   : una de las 5 subcategorías contractuales
+        Agrega id_cuenta: email del ticket y, si no resuelve, sus teléfonos
+        (un solo cruce en lote con los índices del registro).
+        mes_numero y categoria vienen del almacén (derivar_columnas).
         Tickets sin ID CUENTA o fuera del rango 1-24 se incluyen con advertencia.
         """
-        # ID CUENTA
-        df["id_cuenta"] = df["Email"].str.strip().str.lower().map(
-            lambda e: indice_email.get(e, "")
-        )
-
-        # Mes del contrato
-        def calcular_mes(fecha_str: str) -> int:
-            if not fecha_str:
-                return 0
-            match = re.search(r"(\d{2})/(\d{2})/(\d{4})", fecha_str)
-            if not match:
-                return 0
-            dia, mes, anio = int(match.group(1)), int(match.group(2)), int(match.group(3))
-            fecha = datetime(anio, mes, dia)
-            delta = (fecha.year - CONTRATO_INICIO.year) * 12 + (fecha.month - CONTRATO_INICIO.month) + 1
-            return delta if 1 <= delta <= CONTRATO_MESES else 0
-
-        df["mes_numero"] = df["Creado el"].apply(calcular_mes)
-
-        # Categoría contractual
-        def resolver_categoria(cat: str) -> str:
-            cat_norm = cat.strip().lower()
-            return MAPA_CATEGORIA.get(cat_norm, "disponibilidad")  # default: disponibilidad
-
-        df["categoria"] = df["Categoria"].apply(resolver_categoria)
+        df = df.copy()
+        resuelto = resolvedor.resolver(df, LLAVES_TICKET)
+        df["id_cuenta"] = resuelto["id_cuenta"]
+        logger.info(f"ID CUENTA de tickets por llave — {resumen_por_llave(resuelto)}")
 
         # Logs de advertencia
         sin_id  = df[df["id_cuenta"] == ""]
@@ -204,95 +262,122 @@ class TicketsMerger:
     # ------------------------------------------------------------------
     # BLOQUE 5: CONSTRUCCIÓN DE LA MATRIZ
     # ------------------------------------------------------------------
-    def _construir_matriz(self, df: pd.DataFrame) -> dict:
+    def _construir_matriz(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Construye un dict anidado:
-          matriz[id_cuenta][mes_numero][subcol] = [lista de N° ticket]
-        Solo incluye tickets con id_cuenta y mes_numero válidos.
+        Construye la matriz cuenta × (mes, subcategoría) en un solo groupby:
+          matriz.loc[id_cuenta, (mes_numero, subcol)] = "N° ticket, N° ticket"
+        Cada ticket cuenta en "pqr" y en su categoría. Solo incluye tickets
+        con id_cuenta y mes_numero válidos; las celdas sin tickets quedan "".
         """
-        matriz = {}
-
         df_valido = df[(df["id_cuenta"] != "") & (df["mes_numero"] > 0)]
 
-        for _, row in df_valido.iterrows():
-            cuenta  = row["id_cuenta"]
-            mes     = int(row["mes_numero"])
-            cat     = row["categoria"]
-            ticket  = row["Número del ticket"].strip()
-
-            if cuenta not in matriz:
-                matriz[cuenta] = {}
-            if mes not in matriz[cuenta]:
-                matriz[cuenta][mes] = {s: [] for s in SUBCOLS}
+        tickets = pd.DataFrame({
+            "id_cuenta": df_valido["id_cuenta"],
+            "mes":       df_valido["mes_numero"].astype(int),
+            "ticket":    df_valido["Número del ticket"].astype(str).str.strip(),
+        })
+        largo = pd.concat(
+            [tickets.assign(subcol="pqr"), tickets.assign(subcol=df_valido["categoria"])],
+            ignore_index=True,
+        )
 
-            matriz[cuenta][mes]["pqr"].append(ticket)
-            matriz[cuenta][mes][cat].append(ticket)
+        # Concatenación de texto con sum() (bucle en C) en vez de ", ".join por grupo
+        separados = largo["ticket"].astype(object) + ", "
+        celdas = (
+            separados.groupby([largo["id_cuenta"], largo["mes"], largo["subcol"]], sort=False)
+            .sum()
+            .str[:-2]
+        )
+        if celdas.empty:
+            matriz = pd.DataFrame(index=pd.Index([], name="id_cuenta"), columns=COLUMNAS_MATRIZ)
+        else:
+            matriz = celdas.unstack(["mes", "subcol"])
+        matriz = matriz.reindex(columns=COLUMNAS_MATRIZ).fillna("").astype(object)
 
         logger.info(f"Matriz construida: {len(matriz)} cuentas con tickets")
         return matriz
 
+    def _guardar_cubo(self, df: pd.DataFrame) -> Path:
+        """
+        Persiste los conteos cuenta × mes × categoría (procesadores/cubo_pqrs.py)
+        junto al almacén, para el informe mensual y los indicadores de calidad.
+        """
+        cubo = CuboPQRS.desde_tickets(df, SUBCOLS, CONTRATO_MESES)
+        return cubo.guardar(self.almacen.ruta_almacen / RUTA_CUBO.name)
+
     # ------------------------------------------------------------------
     # BLOQUE 6: LISTA DE TODAS LAS CUENTAS REGISTRADAS
     # ------------------------------------------------------------------
-    def _cargar_todas_las_cuentas(self) -> list:
+    def _cargar_todas_las_cuentas(self, resolvedor: ResolvedorCuentas) -> list:
         """
-        Carga la lista completa de ID CUENTA desde registro_procesados.json
-        para que TODAS las filas del contrato aparezcan en el Excel,
-        incluso las que no tienen tickets ese periodo.
+        Lista completa de ID CUENTA del registro para que TODAS las filas
+        del contrato aparezcan en el Excel, incluso las que no tienen
+        tickets ese periodo. Sale de los mismos índices con que se
+        resuelven los tickets (email, cédula, contrato, teléfono).
         """
-        if not self.ruta_registro.exists():
-            return []
-
-        with open(self.ruta_registro, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        # indice_email: {email: id_cuenta} → extraer valores únicos ordenados
-        indice = data.get("indice_email", {})
-        cuentas = sorted(set(indice.values()))
+        cuentas = resolvedor.cuentas()
         logger.info(f"Total cuentas registradas: {len(cuentas)}")
         return cuentas
 
     # ------------------------------------------------------------------
     # BLOQUE 7: GENERACIÓN DEL EXCEL CONTRACTUAL
     # ------------------------------------------------------------------
-    def _generar_excel(self, matriz: dict, todas_las_cuentas: list) -> Path:
+    def _generar_excel(self, matriz: pd.DataFrame, todas_las_cuentas: list) -> Path:
         """
         Crea el Excel con el formato contractual:
-        Filas 1-6  → Encabezado institucional
-        Fila 7     → "CALIDAD DEL SERVICIO"
-        Fila 8     → MES 1 | ... | MES 24  (celdas combinadas cada 5 cols)
-        Fila 9     → ID CUENTA | PQR | Disp | Vel | Falla | Traslado | ...
-        Fila 10+   → Datos por cuenta
+        Filas 1-5  → Encabezado institucional
+        Fila 6     → "CALIDAD DEL SERVICIO"
+        Fila 7     → MES 1 | ... | MES 24  (celdas combinadas cada 5 cols)
+        Fila 8     → ID CUENTA | PQR | Disp | Vel | Falla | Traslado | ...
+        Fila 9+    → Datos por cuenta
+
+        El libro se escribe en modo write-only: las filas salen al disco en
+        orden y cada celda apunta a un estilo con nombre compartido (no un
+        Font/Fill/Border por celda), así la memoria no crece con el número
+        de cuentas. Anchos, alturas, paneles congelados y celdas combinadas
+        se declaran antes de la primera fila.
         """
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "PQRS"
-
-        # ---- Estilos ----
-        AZUL_HEADER  = "1F4E79"
-        AZUL_MEDIO   = "2E75B6"
-        AZUL_CLARO   = "DCE6F1"
-        BLANCO       = "FFFFFF"
-        GRIS_CLARO   = "F2F2F2"
-
-        font_blanco_bold  = Font(bold=True, color="FFFFFF", size=9)
-        font_negro_bold   = Font(bold=True, color="000000", size=9)
-        font_normal       = Font(size=9)
-
-        borde_fino = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-
-        alin_centro = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        alin_izq    = Alignment(horizontal="left",   vertical="center", wrap_text=True)
+        wb = Workbook(write_only=True)
+        _registrar_estilos(wb)
+        ws = wb.create_sheet("PQRS")
 
         # Total columnas: 1 (ID CUENTA) + 24 meses × 5 subcols
         total_cols = 1 + CONTRATO_MESES * len(SUBCOLS)
+        ultima     = get_column_letter(total_cols)
+
+        def celda(valor, estilo: str) -> WriteOnlyCell:
+            c = WriteOnlyCell(ws, value=valor)
+            c.style = estilo
+            return c
+
+        # ---- Dimensiones, combinadas y paneles (antes de escribir filas) ----
+        ws.column_dimensions["A"].width = 16
+        for j in range(total_cols - 1):
+            ws.column_dimensions[get_column_letter(2 + j)].width = (
+                18 if SUBCOLS[j % len(SUBCOLS)] == "pqr" else 14
+            )
 
-        # ---- FILAS 1-6: Encabezado institucional ----
+        for fila in range(1, 7):
+            ws.merged_cells.add(f"A{fila}:{ultima}{fila}")
+            ws.row_dimensions[fila].height = 16
+        ws.row_dimensions[6].height = 20
+        ws.row_dimensions[7].height = 30
+        ws.row_dimensions[8].height = 50
+
+        ws.merged_cells.add("A7:A8")
+        for mes in range(1, CONTRATO_MESES + 1):
+            col_inicio = 2 + (mes - 1) * len(SUBCOLS)
+            col_fin    = col_inicio + len(SUBCOLS) - 1
+            ws.merged_cells.add(f"{get_column_letter(col_inicio)}7:{get_column_letter(col_fin)}7")
+
+        # Filas de datos: altura 15 por defecto en vez de una dimensión por fila
+        ws.sheet_format.defaultRowHeight = 15
+        ws.sheet_format.customHeight     = True
+
+        # Congelar encabezados y primera columna
+        ws.freeze_panes = "B9"
+
+        # ---- FILAS 1-5: Encabezado institucional ----
         encabezados_inst = [
             f"RAZÓN SOCIAL DEL ISP: {ENCABEZADO_INFO['razon_social']}",
             f"MUNICIPIO: {ENCABEZADO_INFO['municipio']}",
@@ -300,42 +385,16 @@ class TicketsMerger:
             f"CONTRATO DE FOMENTO No.: {ENCABEZADO_INFO['contrato']}",
             f"FECHA DEL CONTRATO DE FOMENTO: {ENCABEZADO_INFO['fecha']}",
         ]
-        for i, texto in enumerate(encabezados_inst, start=1):
-            ws.merge_cells(
-                start_row=i, start_column=1,
-                end_row=i,   end_column=total_cols,
-            )
-            celda = ws.cell(row=i, column=1, value=texto)
-            celda.font      = font_negro_bold
-            celda.alignment = alin_izq
-            celda.border    = borde_fino
-            ws.row_dimensions[i].height = 16
+        for texto in encabezados_inst:
+            ws.append([celda(texto, "pqrs_institucional")])
 
         # ---- FILA 6: "CALIDAD DEL SERVICIO" ----
-        ws.merge_cells(
-            start_row=6, start_column=1,
-            end_row=6,   end_column=total_cols,
-        )
-        celda = ws.cell(row=6, column=1, value="CALIDAD DEL SERVICIO")
-        celda.font      = Font(bold=True, color="FFFFFF", size=11)
-        celda.fill      = PatternFill("solid", fgColor=AZUL_HEADER)
-        celda.alignment = alin_centro
-        celda.border    = borde_fino
-        ws.row_dimensions[6].height = 20
-
-        # ---- FILA 7: Cabecera de meses (MES 1 … MES 24) ----
-        # Celda vacía bajo "ID CUENTA" (col 1)
-        ws.merge_cells(start_row=7, start_column=1, end_row=8, end_column=1)
-        celda_id = ws.cell(row=7, column=1, value="ID CUENTA\n(Número único)")
-        celda_id.font      = font_blanco_bold
-        celda_id.fill      = PatternFill("solid", fgColor=AZUL_HEADER)
-        celda_id.alignment = alin_centro
-        celda_id.border    = borde_fino
+        ws.append([celda("CALIDAD DEL SERVICIO", "pqrs_titulo")])
 
+        # ---- FILAS 7-8: Cabecera de meses y subcabeceras ----
+        fila_meses = [celda("ID CUENTA\n(Número único)", "pqrs_cabecera_impar")]
+        fila_subs  = [None]
         for mes in range(1, CONTRATO_MESES + 1):
-            col_inicio = 2 + (mes - 1) * len(SUBCOLS)
-            col_fin    = col_inicio + len(SUBCOLS) - 1
-
             # Calcular nombre del mes (MES 1 = Dic 2025, MES 2 = Ene 2026 …)
             fecha_mes = datetime(
                 CONTRATO_INICIO.year + (CONTRATO_INICIO.month + mes - 2) // 12,
@@ -343,69 +402,31 @@ class TicketsMerger:
                 1,
             )
             nombre_mes = fecha_mes.strftime("%b %Y").upper()
-            etiqueta   = f"MES {mes}\n{nombre_mes}"
+            estilo     = "pqrs_cabecera_impar" if mes % 2 != 0 else "pqrs_cabecera_par"
 
-            ws.merge_cells(
-                start_row=7, start_column=col_inicio,
-                end_row=7,   end_column=col_fin,
-            )
-            celda = ws.cell(row=7, column=col_inicio, value=etiqueta)
-            color = AZUL_HEADER if mes % 2 != 0 else AZUL_MEDIO
-            celda.font      = font_blanco_bold
-            celda.fill      = PatternFill("solid", fgColor=color)
-            celda.alignment = alin_centro
-            celda.border    = borde_fino
-
-            # ---- FILA 8: Subcabeceras ----
-            for j, subcol in enumerate(SUBCOLS):
-                col = col_inicio + j
-                c   = ws.cell(row=8, column=col, value=SUBCOLS_LABELS[subcol])
-                c.font      = font_blanco_bold
-                c.fill      = PatternFill("solid", fgColor=color)
-                c.alignment = alin_centro
-                c.border    = borde_fino
-                ws.column_dimensions[get_column_letter(col)].width = (
-                    18 if subcol == "pqr" else 14
-                )
+            fila_meses.append(celda(f"MES {mes}\n{nombre_mes}", estilo))
+            fila_meses.extend([None] * (len(SUBCOLS) - 1))
+            fila_subs.extend(celda(SUBCOLS_LABELS[subcol], estilo) for subcol in SUBCOLS)
 
-        ws.row_dimensions[7].height = 30
-        ws.row_dimensions[8].height = 50
-
-        # Ancho columna ID CUENTA
-        ws.column_dimensions["A"].width = 16
+        ws.append(fila_meses)
+        ws.append(fila_subs)
 
         # ---- FILAS DE DATOS ----
+        vacia = [""] * len(COLUMNAS_MATRIZ)
+        filas = dict(zip(matriz.index, matriz.to_numpy().tolist()))
+
         for fila_idx, cuenta in enumerate(todas_las_cuentas, start=9):
-            color_fila = AZUL_CLARO if fila_idx % 2 == 0 else BLANCO
-
-            # Columna ID CUENTA
-            c = ws.cell(row=fila_idx, column=1, value=cuenta)
-            c.font      = font_negro_bold
-            c.fill      = PatternFill("solid", fgColor=color_fila)
-            c.alignment = alin_centro
-            c.border    = borde_fino
-
-            # Rellenar cada mes
-            for mes in range(1, CONTRATO_MESES + 1):
-                col_inicio = 2 + (mes - 1) * len(SUBCOLS)
-                datos_mes  = matriz.get(cuenta, {}).get(mes, {})
-
-                for j, subcol in enumerate(SUBCOLS):
-                    col    = col_inicio + j
-                    valor  = ", ".join(datos_mes.get(subcol, [])) if datos_mes else ""
-                    c      = ws.cell(row=fila_idx, column=col, value=valor)
-                    c.font      = font_normal
-                    c.fill      = PatternFill("solid", fgColor=color_fila)
-                    c.alignment = alin_centro
-                    c.border    = borde_fino
-
-            ws.row_dimensions[fila_idx].height = 15
+            paridad = "par" if fila_idx % 2 == 0 else "impar"
+            cuenta_estilo = f"pqrs_cuenta_{paridad}"
+            dato_estilo   = f"pqrs_dato_{paridad}"
 
-        # Congelar encabezados y primera columna
-        ws.freeze_panes = ws.cell(row=9, column=2)
+            ws.append(
+                [celda(cuenta, cuenta_estilo)]
+                + [celda(valor, dato_estilo) for valor in filas.get(cuenta, vacia)]
+            )
 
         # Guardar
-        fecha_str  = datetime.now().strftime("%Y-%m-%d")
+        fecha_str  = ahora().strftime("%Y-%m-%d")
         nombre     = f"pqrs_calidad_servicio_{fecha_str}.xlsx"
         ruta_excel = self.ruta_salida / nombre
         wb.save(ruta_excel)
@@ -419,34 +440,31 @@ class TicketsMerger:
     def generar(self) -> Path | None:
         """
         Orquesta la generación del Excel contractual de PQRS.
-        Retorna None (sin error) si:
-        - El CSV no existe → no hubo tickets esta semana
-        - El CSV está vacío → ídem
+        Los tickets salen del almacén (todos los exports ingresados), no
+        solo del último CSV.
+        Retorna None (sin error) si no hay ningún ticket: ni CSV ni almacén.
         El informe semanal de instalaciones se genera independientemente.
         """
-        # --- Guardia: CSV inexistente o vacío → semana sin PQRS ---
-        if not self.ruta_csv.exists():
+        # --- Guardia: sin exports ni tickets guardados → semana sin PQRS ---
+        df_raw = self._cargar_tickets()
+
+        if df_raw.empty:
             logger.info(
-                "CSV de tickets no encontrado — "
+                "Sin tickets (no hay CSV de tickets ni tickets en el almacén) — "
                 "semana sin PQRS. No se genera Excel."
             )
             return None
 
-        df_raw = self._leer_csv()
-
-        if df_raw.empty:
-            logger.info("CSV de tickets vacío — semana sin PQRS. No se genera Excel.")
-            return None
-
         # --- Flujo normal ---
         logger.info(f"Iniciando generación PQRS contractual — {len(df_raw)} tickets...")
 
-        indice_email   = self._cargar_indice_email()
-        df_enriquecido = self._enriquecer(df_raw, indice_email)
+        resolvedor     = self._cargar_resolvedor()
+        df_enriquecido = self._enriquecer(df_raw, resolvedor)
+        self._guardar_cubo(df_enriquecido)
         matriz         = self._construir_matriz(df_enriquecido)
-        todas_cuentas  = self._cargar_todas_las_cuentas()
+        todas_cuentas  = self._cargar_todas_las_cuentas(resolvedor)
 
-        cuentas_extra = sorted(set(matriz.keys()) - set(todas_cuentas))
+        cuentas_extra = sorted(set(matriz.index) - set(todas_cuentas))
         if cuentas_extra:
             logger.warning(
                 f"{len(cuentas_extra)} cuenta(s) con tickets no encontradas "
@@ -456,7 +474,7 @@ class TicketsMerger:
 
         ruta_excel = self._generar_excel(matriz, todas_cuentas)
 
-        con_tickets = len([c for c in todas_cuentas if c in matriz])
+        con_tickets = int(pd.Index(todas_cuentas).isin(matriz.index).sum())
         sin_tickets = len(todas_cuentas) - con_tickets
 
         logger.info(
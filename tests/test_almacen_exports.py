@@ -0,0 +1,78 @@
+# tests/test_almacen_exports.py
+"""
+Almacén de exports (procesadores/almacen_exports.py) con exports de
+tickets chicos escritos en una carpeta temporal.
+"""
+
+import pandas as pd
+import pytest
+
+import procesadores.catalogo_entradas as catalogo_entradas
+from procesadores.almacen_exports import HASH
+from procesadores.almacen_tickets import LLAVE, AlmacenTickets
+from procesadores.cdc_snapshots import hash_filas
+
+COLUMNAS = {LLAVE: [LLAVE], "Asunto": ["Asunto"]}
+
+
+def _derivar(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({"CATEGORIA": df["Asunto"].str.upper()}, index=df.index)
+
+
+@pytest.fixture
+def entrada(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(catalogo_entradas, "_CATALOGOS", {})
+    ruta = tmp_path / "entrada"
+    ruta.mkdir()
+    return ruta
+
+
+def _escribir(ruta, fecha, filas):
+    df = pd.DataFrame(filas, columns=[LLAVE, "Asunto"])
+    df.to_csv(ruta / f"wispro_tickets_{fecha}.csv", index=False)
+
+
+def _almacen(entrada):
+    return AlmacenTickets(COLUMNAS, _derivar, ruta_entrada=entrada, ruta_almacen=entrada.parent / "almacen").cargar()
+
+
+def test_hash_guardado_igual_al_recalculado(entrada):
+    filas = [[str(i), f"asunto {i}"] for i in range(1, 41)]
+    _escribir(entrada, "2026-04-06", filas)
+
+    tabla = _almacen(entrada).ingerir()
+
+    assert tabla[HASH].dtype == "uint64"
+    assert (tabla[HASH].to_numpy() == hash_filas(tabla[list(COLUMNAS)]).to_numpy()).all()
+
+
+def test_filas_sin_cambio_no_cuentan_como_cambiadas(entrada):
+    filas = [[str(i), f"asunto {i}"] for i in range(1, 41)]
+    _escribir(entrada, "2026-04-06", filas)
+    almacen = _almacen(entrada)
+    almacen.ingerir()
+
+    # Ventana solapada: 20 repetidas, 1 cambiada y 5 nuevas
+    siguiente = filas[20:] + [[str(i), f"asunto {i}"] for i in range(41, 46)]
+    siguiente[0] = [siguiente[0][0], "cambiado"]
+    _escribir(entrada, "2026-04-13", siguiente)
+
+    almacen = _almacen(entrada)
+    assert almacen._ingerir_export(entrada / "wispro_tickets_2026-04-13.csv", "2026-04-13") == (5, 1)
+
+    tabla = almacen.tickets.set_index(LLAVE)
+    assert tabla.loc["21", "EXPORT"] == "wispro_tickets_2026-04-13.csv"
+    assert tabla.loc["22", "EXPORT"] == "wispro_tickets_2026-04-06.csv"
+    assert (tabla[HASH].to_numpy() == hash_filas(almacen.tickets[list(COLUMNAS)]).to_numpy()).all()
+
+
+def test_vista_al_conserva_el_hash(entrada):
+    _escribir(entrada, "2026-03-30", [[str(i), f"asunto {i}"] for i in range(1, 21)])
+    _escribir(entrada, "2026-04-27", [[str(i), f"nuevo {i}"] for i in range(1, 21)])
+    _almacen(entrada).ingerir()
+
+    vista = _almacen(entrada).ingerir(al="2026-04-01")
+
+    assert set(vista["FECHA_EXPORT"]) == {"2026-03-30"}
+    assert (vista[HASH].to_numpy() == hash_filas(vista[list(COLUMNAS)]).to_numpy()).all()
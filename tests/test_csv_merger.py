@@ -0,0 +1,41 @@
+# tests/test_csv_merger.py
+"""
+Detección de registros nuevos de CsvMerger contra registro_procesados.json.
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from procesadores.csv_merger import CsvMerger
+
+CONFIG     = Path(__file__).resolve().parents[1] / "config" / "entorno.yaml"
+COL_CEDULA = "DOCUMENTO O CÉDULA DE IDENTIDAD CLIENTE"
+
+
+@pytest.fixture
+def merger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return CsvMerger(config_path=CONFIG, ruta_registro=tmp_path / "registro_procesados.json")
+
+
+def test_registro_con_formato_anterior(merger):
+    # Cédulas guardadas con .astype(str).str.strip(), antes de normalizar_cedulas
+    registro = {"cedulas_procesadas": ["1085896121.0", "1.086.418.924", " 87716266 ", "", "nan"]}
+    merger.ruta_registro.write_text(json.dumps(registro), encoding="utf-8")
+
+    ordenes = pd.DataFrame({COL_CEDULA: ["1085896121", "1086418924", "87716266", "1234567"]})
+    ordenes[COL_CEDULA] = merger._cedulas(ordenes[COL_CEDULA])
+
+    nuevos = merger._filtrar_nuevos(ordenes)
+
+    assert nuevos[COL_CEDULA].tolist() == ["1234567"]
+
+
+def test_registro_vacio_o_inexistente(merger):
+    assert merger._cargar_registro() == set()
+
+    merger.ruta_registro.write_text(json.dumps({"cedulas_procesadas": []}), encoding="utf-8")
+    assert merger._cargar_registro() == set()
@@ -0,0 +1,83 @@
+# tests/test_libro_facturas.py
+"""
+Libro de facturas (procesadores/libro_facturas.py): conteos de cambios
+por export, con exports de facturas chicos en una carpeta temporal.
+"""
+
+import pandas as pd
+import pytest
+
+import procesadores.catalogo_entradas as catalogo_entradas
+from procesadores.almacen_exports import HASH
+from procesadores.cdc_snapshots import hash_filas
+from procesadores.libro_facturas import LibroFacturas
+
+COLUMNAS = {
+    "ID CLIENTE":          ["ID CLIENTE"],
+    "ID CONTRATO":         ["ID CONTRATO"],
+    "PRIMER VENCIMIENTO":  ["PRIMER VENCIMIENTO"],
+    "SEGUNDO VENCIMIENTO": ["SEGUNDO VENCIMIENTO"],
+    "DETALLES":            ["DETALLES"],
+    "ESTADO FACTURA":      ["ESTADO"],
+    "MONTO":               ["MONTO"],
+    "FECHA EMISIÓN":       ["EMITIDA EL"],
+}
+
+
+def _factura(cliente: int, mes: int, estado: str = "Pendiente") -> dict:
+    return {
+        "ID CLIENTE":          str(cliente),
+        "ID CONTRATO":         str(cliente + 1000),
+        "PRIMER VENCIMIENTO":  f"03/{mes:02d}/2026",
+        "SEGUNDO VENCIMIENTO": f"05/{mes:02d}/2026",
+        "DETALLES":            f"Plan HOGAR (2026-{mes:02d}-01 - 2026-{mes:02d}-28)",
+        "ESTADO":              estado,
+        "MONTO":               "19900.0",
+        "EMITIDA EL":          f"01/{mes:02d}/2026 08:00:00",
+    }
+
+
+@pytest.fixture
+def entrada(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(catalogo_entradas, "_CATALOGOS", {})
+    ruta = tmp_path / "entrada"
+    ruta.mkdir()
+    return ruta
+
+
+def _escribir(ruta, fecha, facturas) -> str:
+    nombre = f"wispro_facturas_{fecha}.csv"
+    pd.DataFrame(facturas).to_csv(ruta / nombre, index=False)
+    return nombre
+
+
+def _libro(entrada):
+    return LibroFacturas(COLUMNAS, ruta_entrada=entrada, ruta_libro=entrada.parent / "libro").cargar()
+
+
+def test_reexport_sin_cambios_no_reprocesa(entrada):
+    facturas = [_factura(cliente, mes) for cliente in range(1, 31) for mes in (3, 4)]
+    _escribir(entrada, "2026-04-06", facturas)
+    _libro(entrada).ingerir()
+
+    nombre = _escribir(entrada, "2026-04-13", facturas)
+    libro  = _libro(entrada)
+
+    assert libro._ingerir_export(entrada / nombre, "2026-04-13") == (0, 0)
+    assert set(libro.facturas["FECHA_EXPORT"]) == {"2026-04-06"}
+    assert (libro.facturas[HASH].to_numpy() == hash_filas(libro.facturas[list(COLUMNAS)]).to_numpy()).all()
+
+
+def test_solo_cuentan_las_facturas_cambiadas(entrada):
+    facturas = [_factura(cliente, 4) for cliente in range(1, 31)]
+    _escribir(entrada, "2026-04-06", facturas)
+    _libro(entrada).ingerir()
+
+    # Dos pagos y una factura nueva; el resto llega igual
+    siguiente = [dict(f) for f in facturas] + [_factura(31, 4)]
+    siguiente[0]["ESTADO"] = "Pagado"
+    siguiente[1]["ESTADO"] = "Pagado"
+    nombre = _escribir(entrada, "2026-04-13", siguiente)
+
+    assert _libro(entrada)._ingerir_export(entrada / nombre, "2026-04-13") == (1, 2)
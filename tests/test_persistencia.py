@@ -0,0 +1,40 @@
+# tests/test_persistencia.py
+"""
+Tabla + meta de procesadores/persistencia.py: una meta que no describe
+la tabla guardada no se acepta.
+"""
+
+import pandas as pd
+import pytest
+
+from procesadores.persistencia import guardar_tabla, leer_meta, leer_tabla, ruta_tabla
+
+
+def test_guardar_y_leer(tmp_path):
+    tabla = pd.DataFrame({"ID CLIENTE": ["1", "2"], "MONTO": [19900.0, 39800.0]})
+    ruta  = ruta_tabla(tmp_path, "clientes")
+
+    guardar_tabla(tabla, ruta, {"firma": "x"}, tmp_path / "clientes_meta.json")
+    meta = leer_meta(tmp_path / "clientes_meta.json")
+
+    assert meta["firma"] == "x"
+    pd.testing.assert_frame_equal(leer_tabla(ruta, meta), tabla, check_dtype=False)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_meta_de_otra_tabla(tmp_path):
+    ruta      = ruta_tabla(tmp_path, "clientes")
+    ruta_meta = tmp_path / "clientes_meta.json"
+    guardar_tabla(pd.DataFrame({"ID CLIENTE": ["1"]}), ruta, {"firma": "x"}, ruta_meta)
+    meta_vieja = ruta_meta.read_text(encoding="utf-8")
+
+    # Corrida cortada después de escribir la tabla nueva y antes de su meta
+    guardar_tabla(pd.DataFrame({"ID CLIENTE": ["1", "2"]}), ruta, {"firma": "x"}, ruta_meta)
+    ruta_meta.write_text(meta_vieja, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        leer_tabla(ruta, leer_meta(ruta_meta))
+
+
+def test_sin_meta(tmp_path):
+    assert leer_meta(tmp_path / "no_existe.json") is None